@@ -0,0 +1,100 @@
+"""
+Measure the throughput of compiling many small programs in a thread pool
+with different numbers of threads.
+
+Usage: python benchmarks/compile_threads.py [--programs <count>]
+[--runs <count>] [<threads>...]
+
+Every program includes the standard library, which is parsed once before
+the runs so that the threads share it through the module cache. The best of
+a number of runs is reported for each number of threads, which defaults to
+1, 2, 4, and 8. Threads only run in parallel on free-threaded Python builds.
+"""
+
+import os
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_PATH: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+""" The root directory of this checkout. """
+
+sys.path.insert(0, ROOT_PATH)
+
+from funcy.core import compile, compile_many
+
+PROGRAMS: int = 64
+""" The default number of programs compiled by each run. """
+
+RUNS: int = 3
+""" The default number of runs for each number of threads. """
+
+def get_source(index: int) -> str:
+    """ Get the source code of a small program from its index. """
+    
+    return (
+            'include "//std.fy";'
+            f"func square(x) {{ return x * x + {index}; }}"
+            "func main() {"
+            f"    printIntLn(square({index}));"
+            f'    printStrLn("{"x" * (index % 16)}");'
+            "}")
+
+
+def measure(sources: list[str], threads: int) -> float:
+    """
+    Compile sources in a thread pool of a number of threads and return
+    the time taken in seconds.
+    """
+    
+    with ThreadPoolExecutor(threads) as executor:
+        start: float = time.perf_counter()
+        compile_many(sources, executor)
+        return time.perf_counter() - start
+
+
+def main(args: list[str]) -> int:
+    """ Run the compile throughput benchmark with command line arguments. """
+    
+    count: int = PROGRAMS
+    runs: int = RUNS
+    
+    while len(args) >= 2 and args[0] in ("--programs", "--runs"):
+        if not args[1].isdigit():
+            print(f"Expected a count for '{args[0]}'!")
+            return 1
+        
+        if args[0] == "--programs":
+            count = max(int(args[1]), 1)
+        else:
+            runs = max(int(args[1]), 1)
+        
+        args = args[2:]
+    
+    if not all(arg.isdigit() for arg in args):
+        print("Expected numbers of threads!")
+        return 1
+    
+    thread_counts: list[int] = [max(int(arg), 1) for arg in args]
+    thread_counts = thread_counts or [1, 2, 4, 8]
+    sources: list[str] = [get_source(index) for index in range(count)]
+    compile(sources[0])
+    print(
+            f"Compiling {count} programs on {os.cpu_count()} CPUs, "
+            f"best of {runs}:")
+    serial_rate: float = 0.0
+    
+    for threads in thread_counts:
+        elapsed: float = min(measure(sources, threads) for _ in range(runs))
+        rate: float = count / elapsed
+        serial_rate = serial_rate or rate
+        print(
+                f"  threads={threads:<3} {rate:8.1f} programs/s "
+                f"{rate / serial_rate:6.2f}x")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
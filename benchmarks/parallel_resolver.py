@@ -0,0 +1,160 @@
+"""
+Measure resolving a synthetic project of many modules with different
+numbers of parsing jobs.
+
+Usage: python benchmarks/parallel_resolver.py [--modules <count>]
+[--runs <count>] [<jobs>...]
+
+The project's modules include each other as a binary tree, and each module
+declares functions with nested expressions and loops so that parsing
+dominates. The module cache and include index are cleared before every run,
+so every module is read and parsed. The best of a number of runs is reported
+for each number of jobs, which defaults to 1, 2, and 4.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+ROOT_PATH: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+""" The root directory of this checkout. """
+
+sys.path.insert(0, ROOT_PATH)
+
+from funcy.ast.nodes import RootNode
+from funcy.io.log import Log
+from funcy.parser.include_index import IncludeIndex
+from funcy.parser.module_cache import ModuleCache
+from funcy.parser.resolver import Resolver
+
+MODULES: int = 500
+""" The default number of modules in the synthetic project. """
+
+RUNS: int = 3
+""" The default number of runs for each number of jobs. """
+
+FUNCTIONS: int = 8
+""" The number of functions declared by each module. """
+
+def get_module_source(index: int, count: int) -> str:
+    """
+    Get the source code of a synthetic module from its index and the
+    number of modules in the project.
+    """
+    
+    lines: list[str] = [
+        f'include "m{child}.fy";'
+        for child in (index * 2 + 1, index * 2 + 2) if child < count]
+    
+    for function in range(FUNCTIONS):
+        lines.append(
+                f"func f{index}_{function}(x, y) {{\n"
+                "    let mut i = 0;\n"
+                "    let mut total = 0;\n"
+                "    while (i < x) {\n"
+                "        if (i % 3 == 0 && y != 0) {\n"
+                f"            total = total + (i * {function} - y) / 2;\n"
+                "        } else {\n"
+                f"            total = total - ((i + {index}) * (y + 1));\n"
+                "        }\n"
+                "        i = i + 1;\n"
+                "    }\n"
+                "    return total;\n"
+                "}")
+    
+    return "\n".join(lines) + "\n"
+
+
+def generate_project(dir_path: str, count: int) -> str:
+    """
+    Generate a synthetic project of a number of modules in a directory
+    and return its main module's path.
+    """
+    
+    for index in range(count):
+        with open(os.path.join(dir_path, f"m{index}.fy"), "wt") as file:
+            file.write(get_module_source(index, count))
+    
+    main_path: str = os.path.join(dir_path, "main.fy")
+    
+    with open(main_path, "wt") as file:
+        file.write('include "m0.fy"; func main() { return f0_0(10, 2); }')
+    
+    return main_path
+
+
+def resolve(path: str, jobs: int) -> tuple[float, list[str]]:
+    """
+    Resolve a project from its main module's path with a number of jobs
+    and cold caches. Return the time taken in seconds and the names of
+    the resolved modules.
+    """
+    
+    Resolver.module_cache = ModuleCache()
+    Resolver.include_index = IncludeIndex()
+    log: Log = Log()
+    start: float = time.perf_counter()
+    root_node: RootNode = Resolver(log, jobs).resolve_path(path)
+    elapsed: float = time.perf_counter() - start
+    
+    if log.has_records():
+        log.print_records()
+    
+    return elapsed, [module.span.start.name for module in root_node.modules]
+
+
+def main(args: list[str]) -> int:
+    """ Run the parallel resolver benchmark with command line arguments. """
+    
+    count: int = MODULES
+    runs: int = RUNS
+    
+    while len(args) >= 2 and args[0] in ("--modules", "--runs"):
+        if not args[1].isdigit():
+            print(f"Expected a count for '{args[0]}'!")
+            return 1
+        
+        if args[0] == "--modules":
+            count = max(int(args[1]), 1)
+        else:
+            runs = max(int(args[1]), 1)
+        
+        args = args[2:]
+    
+    if not all(arg.isdigit() for arg in args):
+        print("Expected numbers of jobs!")
+        return 1
+    
+    job_counts: list[int] = [max(int(arg), 1) for arg in args] or [1, 2, 4]
+    print(
+            f"Resolving {count} modules on {os.cpu_count()} CPUs, "
+            f"best of {runs}:")
+    
+    with tempfile.TemporaryDirectory() as dir_path:
+        main_path: str = generate_project(dir_path, count)
+        serial_names: list[str] = None
+        serial_time: float = 0.0
+        
+        for jobs in job_counts:
+            results: list[tuple[float, list[str]]] = [
+                resolve(main_path, jobs) for _ in range(runs)]
+            elapsed: float = min(result[0] for result in results)
+            names: list[str] = results[0][1]
+            
+            if serial_names is None:
+                serial_names = names
+                serial_time = elapsed
+            elif names != serial_names:
+                print(f"Module order differs with {jobs} jobs!")
+                return 1
+            
+            print(
+                    f"  jobs={jobs:<3} {elapsed * 1000.0:10.1f} ms "
+                    f"{serial_time / elapsed:6.2f}x")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
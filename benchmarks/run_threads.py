@@ -0,0 +1,117 @@
+"""
+Measure the throughput of running a compiled program many times in a
+thread pool with different numbers of threads.
+
+Usage: python benchmarks/run_threads.py [--tasks <count>] [--runs <count>]
+[<threads>...]
+
+Each task runs a recursive Fibonacci program with `Program.run_many`, so
+concurrent tasks take their own FVMs from the program's pool. The output of
+every task is checked against a serial run. The best of a number of runs is
+reported for each number of threads, which defaults to 1, 2, 4, and 8.
+Threads only run in parallel on free-threaded Python builds.
+"""
+
+import os
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_PATH: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+""" The root directory of this checkout. """
+
+sys.path.insert(0, ROOT_PATH)
+
+from funcy.core import compile_program
+from funcy.program import Program
+from funcy.result import ExecResult
+
+SOURCE: str = (
+        'include "//print.fy";'
+        "func fib(n) { if (n < 2) { return n; }"
+        "    return fib(n - 1) + fib(n - 2); }"
+        "func main(x) { printIntLn(fib(x)); }")
+""" The source code of the program that is run. """
+
+ARGUMENT: int = 15
+""" The argument of the Fibonacci function in each task. """
+
+TASKS: int = 32
+""" The default number of tasks run by each run. """
+
+RUNS: int = 3
+""" The default number of runs for each number of threads. """
+
+def measure(
+        program: Program, args: list[list[int]],
+        threads: int) -> tuple[float, list[bytes]]:
+    """
+    Run a program with lists of arguments in a thread pool of a number of
+    threads. Return the time taken in seconds and the outputs.
+    """
+    
+    with ThreadPoolExecutor(threads) as executor:
+        start: float = time.perf_counter()
+        results: list[ExecResult] = program.run_many(args, executor)
+        return (
+                time.perf_counter() - start,
+                [result.output for result in results])
+
+
+def main(args: list[str]) -> int:
+    """ Run the run throughput benchmark with command line arguments. """
+    
+    count: int = TASKS
+    runs: int = RUNS
+    
+    while len(args) >= 2 and args[0] in ("--tasks", "--runs"):
+        if not args[1].isdigit():
+            print(f"Expected a count for '{args[0]}'!")
+            return 1
+        
+        if args[0] == "--tasks":
+            count = max(int(args[1]), 1)
+        else:
+            runs = max(int(args[1]), 1)
+        
+        args = args[2:]
+    
+    if not all(arg.isdigit() for arg in args):
+        print("Expected numbers of threads!")
+        return 1
+    
+    thread_counts: list[int] = [max(int(arg), 1) for arg in args]
+    thread_counts = thread_counts or [1, 2, 4, 8]
+    program: Program = compile_program(SOURCE)
+    task_args: list[list[int]] = [[ARGUMENT] for _ in range(count)]
+    expected: list[bytes] = [
+        result.output for result in program.run_many(task_args)]
+    print(
+            f"Running fib({ARGUMENT}) {count} times on {os.cpu_count()} "
+            f"CPUs, best of {runs}:")
+    serial_rate: float = 0.0
+    
+    for threads in thread_counts:
+        elapsed: float = float("inf")
+        
+        for _ in range(runs):
+            run_time, outputs = measure(program, task_args, threads)
+            
+            if outputs != expected:
+                print(f"Output differs with {threads} threads!")
+                return 1
+            
+            elapsed = min(elapsed, run_time)
+        
+        rate: float = count / elapsed
+        serial_rate = serial_rate or rate
+        print(
+                f"  threads={threads:<3} {rate:8.2f} tasks/s "
+                f"{rate / serial_rate:6.2f}x")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
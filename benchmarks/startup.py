@@ -0,0 +1,115 @@
+"""
+Measure the startup cost of running prebuilt FVM bytecode as the summed
+`-X importtime` self times of every module that is imported.
+
+Usage: python benchmarks/startup.py [--runs <count>] [<checkout>...]
+
+Each checkout is the root directory of a copy of this repository, such as a
+`git worktree` of an older commit, and defaults to this checkout. A hello
+world program is built by each checkout and run with `python -m funcy run`,
+and with `python -m funcy.runtime` if the checkout has it. The best of a
+number of runs is reported.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT_PATH: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+""" The root directory of this checkout. """
+
+HELLO_SOURCE: str = (
+        'include "//print.fy"; func main() { printStrLn("Hello, world!"); }')
+""" The source code of the program that is run. """
+
+RUNS: int = 15
+""" The default number of runs of each command. """
+
+def measure_imports(root_path: str, args: list[str]) -> tuple[float, int]:
+    """
+    Run Python with arguments in a checkout and return the summed self
+    import time in milliseconds and the number of imported modules.
+    """
+    
+    result: subprocess.CompletedProcess = subprocess.run(
+            [sys.executable, "-X", "importtime", *args], cwd=root_path,
+            capture_output=True, text=True)
+    total: int = 0
+    count: int = 0
+    
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        
+        total += int(line[len("import time:"):].split("|")[0])
+        count += 1
+    
+    return total / 1000.0, count
+
+
+def measure_best(
+        root_path: str, args: list[str], runs: int) -> tuple[float, int]:
+    """
+    Measure the imports of a command like `measure_imports` a number of
+    times and return the fastest measurement.
+    """
+    
+    return min(measure_imports(root_path, args) for _ in range(runs))
+
+
+def build_hello(root_path: str, dir_path: str, index: int) -> str:
+    """
+    Build the hello world program with a checkout to a directory and
+    return the bytecode's path.
+    """
+    
+    source_path: str = os.path.join(dir_path, "hello.fy")
+    bytecode_path: str = os.path.join(dir_path, f"hello-{index}.fyc")
+    
+    with open(source_path, "wt") as file:
+        file.write(HELLO_SOURCE)
+    
+    subprocess.run(
+            [sys.executable, "-m", "funcy", "build", source_path,
+            bytecode_path], cwd=root_path, check=True,
+            stdout=subprocess.DEVNULL)
+    return bytecode_path
+
+
+def main(args: list[str]) -> int:
+    """ Run the startup benchmark with command line arguments. """
+    
+    runs: int = RUNS
+    
+    if len(args) >= 2 and args[0] == "--runs" and args[1].isdigit():
+        runs = max(int(args[1]), 1)
+        args = args[2:]
+    
+    root_paths: list[str] = [os.path.abspath(path) for path in args]
+    root_paths = root_paths or [ROOT_PATH]
+    
+    print(f"Summed -X importtime self times, best of {runs} runs:")
+    time, count = measure_best(ROOT_PATH, ["-c", "pass"], runs)
+    print(f"  {'python -c pass':<40} {time:8.1f} ms {count:4} modules")
+    
+    with tempfile.TemporaryDirectory() as dir_path:
+        for index, root_path in enumerate(root_paths):
+            bytecode_path: str = build_hello(root_path, dir_path, index)
+            commands: list[list[str]] = [["-m", "funcy", "run", bytecode_path]]
+            
+            if os.path.isfile(os.path.join(root_path, "funcy", "runtime.py")):
+                commands.append(["-m", "funcy.runtime", bytecode_path])
+            
+            print(f"{root_path}:")
+            
+            for command in commands:
+                time, count = measure_best(root_path, command, runs)
+                name: str = f"python {' '.join(command[:-1])} hello.fyc"
+                print(f"  {name:<40} {time:8.1f} ms {count:4} modules")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
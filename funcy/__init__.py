@@ -9,21 +9,59 @@ interface.
 Classes
 -------
 * `FVM` - An implementation of the Funcy Virtual Machine.
+* `CompileResult` - The result of compiling a program with its errors.
+* `ExecResult` - The result of executing a program with captured output.
+* `Program` - FVM bytecode that may be run many times with arguments.
+* `Scheduler` - Runs many FVM instances in one thread.
 
 Methods
 -------
 * `funcy.cli(args: list[str]) -> int` - Run the Funcy CLI.
 * `funcy.repl() -> None` - Run the Funcy REPL.
-* `funcy.build(in_path: str, out_path: str) -> None` - Build Funcy
+* `funcy.build(in_path: str, out_path: str, coverage: bool = False,
+object_dir: str = None, library_path: str = None) -> None` - Build Funcy
 source code from an input path to FVM bytecode at an output path.
+* `funcy.build_many(in_paths: list[str], out_dir: str,
+jobs: int = None) -> bool` - Build Funcy source code from many input
+paths to FVM bytecode in an output directory with a process pool.
+* `funcy.build_library(in_path: str, out_path: str,
+object_dir: str = None) -> None` - Build a shared library of FVM
+bytecode from an input path to an output path.
 * `funcy.compile(source: str) -> bytes` - Compile Funcy source code to
 FVM bytecode.
-* `funcy.compile_path(path: str) -> bytes` - Compile Funcy source code
-to FVM bytecode from a path.
-* `funcy.exec(source: str | bytes) -> int` - Execute Funcy source code
-or FVM bytecode and return an exit code.
-* `funcy.exec_path(path: str) -> int` - Execute Funcy source code or FVM
-bytecode from a path and return an exit code.
+* `funcy.compile_path(path: str, jobs: int = 1) -> bytes` - Compile
+Funcy source code to FVM bytecode from a path.
+* `funcy.compile_many(sources: list[str],
+executor: Executor = None) -> list[CompileResult]` - Compile many Funcy
+sources to FVM bytecode, sharing parsed modules between them.
+* `funcy.compile_many_paths(paths: list[str],
+executor: Executor = None) -> list[CompileResult]` - Compile Funcy
+source code from many paths to FVM bytecode, sharing parsed modules
+between them.
+* `funcy.compile_program(source: str | bytes) -> Program` - Compile
+Funcy source code or load FVM bytecode to a program.
+* `funcy.compile_program_path(path: str) -> Program` - Compile Funcy
+source code or load FVM bytecode from a path to a program.
+* `funcy.exec(source: str | bytes, native: bool = False,
+trace_size: int = 0, stats: bool = False) -> int` - Execute Funcy source
+code or FVM bytecode and return an exit code.
+* `funcy.exec_path(path: str, native: bool = False,
+trace_size: int = 0, stats: bool = False,
+cache: bool = False) -> int` - Execute Funcy source code or FVM bytecode
+from a path and return an exit code.
+* `funcy.run(source: str | bytes, step_limit: int = -1,
+args: list[int] = None, trace_size: int = 0,
+stats: bool = False) -> ExecResult` - Execute
+Funcy source code or FVM bytecode with captured output and return a
+result.
+* `funcy.run_path(path: str, step_limit: int = -1,
+args: list[int] = None, trace_size: int = 0, cache: bool = False,
+stats: bool = False) -> ExecResult` - Execute
+Funcy source code or FVM bytecode from a path with captured output and
+return a result.
+* `funcy.run_many(sources: list[str | bytes], executor: Executor = None,
+step_limit: int = -1) -> list[ExecResult]` - Execute many Funcy sources
+or FVM bytecode with captured output, each in its own FVM.
 
 Command Line Interface
 ----------------------
@@ -31,8 +69,22 @@ The command line interface is accessed with
 `python -m funcy <subcommand>`.
 
 The following subcommands are available:
-* `build <in> <out>` - Build to code at <in> to <out>.
-* `run <path>` - Run the code at <path>.
+* `build [--coverage] [--memprofile] [--objects <dir>] [--library <lib>]
+[--daemon <socket>] <in> <out>` - Build to code at <in> to <out>.
+* `build [--jobs <count>] <in>... -o <dir>` - Build the code at each
+<in> to <dir>.
+* `watch <in> <out>` - Build the code at <in> to <out> whenever it
+changes.
+* `library [--objects <dir>] <in> <out>` - Build a shared library from
+the code at <in> to <out>.
+* `run [--native] [--capture] [--output <file>] [--trace <size>]
+[--coverage <lcov>] [--stats] [--memprofile] [--server <socket>]
+[--no-cache] <path>` - Run the code at <path>.
+* `serve [--workers <count>] <socket>` - Serve run jobs at <socket>.
+* `daemon [--stats] <socket>` - Serve compile requests at <socket>.
+
+FVM bytecode may also be run with `python -m funcy.runtime <path>`, which
+does not import the compiler.
 
 License
 -------
@@ -61,17 +113,68 @@ SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
 from .cli import cli
-from .core import build, compile, compile_path, exec, exec_path
-from .fvm import FVM
 from .repl import repl
 
+LAZY_EXPORTS: dict[str, str] = {
+    "FVM": "fvm",
+    "CompileResult": "result",
+    "ExecResult": "result",
+    "Program": "program",
+    "Scheduler": "scheduler",
+    "build": "core",
+    "build_library": "core",
+    "build_many": "builder",
+    "compile": "core",
+    "compile_path": "core",
+    "compile_many": "core",
+    "compile_many_paths": "core",
+    "compile_program": "core",
+    "compile_program_path": "core",
+    "exec": "core",
+    "exec_path": "core",
+    "run": "core",
+    "run_path": "core",
+    "run_many": "core",
+}
+""" The package's lazily imported exports and their modules. """
+
+def __getattr__(name: str) -> object:
+    """
+    Import a lazy export when it is first accessed. The compiler is only
+    imported when it is needed, so running FVM bytecode starts quickly.
+    """
+    
+    if not name in LAZY_EXPORTS:
+        raise AttributeError(f"module 'funcy' has no attribute '{name}'")
+    
+    from importlib import import_module
+    
+    value: object = getattr(
+            import_module(f".{LAZY_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
 __all__: list[str] = [
     "FVM",
+    "CompileResult",
+    "ExecResult",
+    "Program",
+    "Scheduler",
     "cli",
     "repl",
     "build",
+    "build_library",
+    "build_many",
     "compile",
     "compile_path",
+    "compile_many",
+    "compile_many_paths",
+    "compile_program",
+    "compile_program_path",
     "exec",
     "exec_path",
+    "run",
+    "run_path",
+    "run_many",
 ]
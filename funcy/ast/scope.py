@@ -36,6 +36,9 @@ class Symbol:
     str_value: str = ""
     """ The symbol's string value. """
     
+    is_used: bool = False
+    """ Whether the symbol has been looked up by name. """
+    
     def __init__(self, name: str, access: SymbolAccess) -> None:
         """ Initialize the symbol's name and access. """
         
@@ -115,7 +118,9 @@ class ScopeStack:
             scope: Scope = self.scopes[i]
             
             if name in scope.symbols:
-                return scope.symbols[name]
+                symbol: Symbol = scope.symbols[name]
+                symbol.is_used = True
+                return symbol
         
         return Symbol(name, SymbolAccess.UNDEFINED)
     
@@ -51,9 +51,12 @@ def get_node_children(node: Node) -> list[Node]:
     return []
 
 
-def print_ast(node: Node, flags: list[bool] = []) -> None:
+def print_ast(node: Node, flags: list[bool] = None) -> None:
     """ Recursively print an AST node and its children as a tree. """
     
+    if flags is None:
+        flags = []
+    
     for i, v in enumerate(flags):
         if i == len(flags) - 1:
             print("└───" if v else "├───", end="")
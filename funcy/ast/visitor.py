@@ -41,6 +41,42 @@ class Visitor:
         return code
     
     
+    def generate_module(
+            self, ast: ModuleNode,
+            imports: list[Symbol]) -> tuple[Code, list[Symbol], list[str]]:
+        """
+        Generate unlinked IR code, exported function symbols, and the
+        names of used imported functions from a module's abstract syntax
+        tree and imported function symbols. Imported functions are
+        referenced by labels of the form '@name' that must be resolved by
+        linking. The IR code is not optimized.
+        """
+        
+        self.scope_stack.clear()
+        self.scope_stack.push()
+        
+        for symbol in imports:
+            if symbol.access == SymbolAccess.INTRINSIC:
+                self.scope_stack.define_intrinsic(
+                        symbol.name, f"@{symbol.name}", symbol.int_value)
+            else:
+                self.scope_stack.define_func(
+                        symbol.name, f"@{symbol.name}", symbol.int_value)
+        
+        code: Code = Code()
+        self.visit(ast, code)
+        symbols: list[Symbol] = list(
+                self.scope_stack.scopes[-1].symbols.values())
+        exports: list[Symbol] = [
+            symbol for symbol in symbols
+            if not symbol.str_value.startswith("@")]
+        uses: list[str] = [
+            symbol.name for symbol in symbols
+            if symbol.str_value.startswith("@") and symbol.is_used]
+        self.scope_stack.pop()
+        return code, exports, uses
+    
+    
     def log_error(self, message: str, span: Span | Node = None) -> None:
         """ Log an error message at a span. """
         
@@ -67,6 +103,15 @@ class Visitor:
     def visit(self, node: Node, code: Code) -> None:
         """ Visit an abstract syntax tree node. """
         
+        parent_span: Span = code.span
+        code.span = node.span
+        self.visit_node(node, code)
+        code.span = parent_span
+    
+    
+    def visit_node(self, node: Node, code: Code) -> None:
+        """ Visit an abstract syntax tree node by its type. """
+        
         if isinstance(node, RootNode):
             self.visit_root(node, code)
         elif isinstance(node, ModuleNode):
@@ -136,6 +181,8 @@ class Visitor:
         main_symbol: Symbol = self.scope_stack.get("main")
         
         if main_symbol.access == SymbolAccess.FUNC:
+            # Default arguments. These must be the first operations of the
+            # entry point so that 'FVM.begin' can replace them.
             for i in range(main_symbol.int_value):
                 code.make_push_int(0)
             
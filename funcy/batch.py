@@ -0,0 +1,480 @@
+import numpy as np
+
+from .fvm import FVM, Opcode
+
+class BatchGroup:
+    """
+    A group of batch FVM lanes that share their registers and execute in
+    lock-step. Each column of the group's stack memory belongs to a lane.
+    """
+    
+    lanes: np.ndarray
+    """ The group's lane indices. """
+    
+    sm: np.ndarray
+    """ The group's stack memory with a row for each word. """
+    
+    sp: int
+    """ The group's stack pointer. """
+    
+    ip: int
+    """ The group's instruction pointer. """
+    
+    fp: int
+    """ The group's frame pointer. """
+    
+    def __init__(
+            self, lanes: np.ndarray, sm: np.ndarray, sp: int, ip: int,
+            fp: int) -> None:
+        """ Initialize the group's lanes, stack memory, and registers. """
+        
+        self.lanes = lanes
+        self.sm = sm
+        self.sp = sp
+        self.ip = ip
+        self.fp = fp
+    
+    
+    def get_key(self) -> tuple[int, int, int]:
+        """ Get the registers that must match to merge groups. """
+        
+        return (self.ip, self.fp, self.sp)
+    
+    
+    def reserve(self, amount: int) -> None:
+        """ Reserve stack memory for pushing an amount of words. """
+        
+        if self.sp + amount <= len(self.sm):
+            return
+        
+        sm: np.ndarray = np.zeros(
+                (max(len(self.sm) * 2, self.sp + amount, 16),
+                len(self.lanes)), dtype=np.int64)
+        sm[:self.sp] = self.sm[:self.sp]
+        self.sm = sm
+    
+    
+    def push(self, value: np.ndarray | int) -> None:
+        """ Push a word to each lane. """
+        
+        self.reserve(1)
+        self.sm[self.sp] = value
+        self.sp += 1
+    
+    
+    def pop(self) -> np.ndarray:
+        """ Pop a word from each lane. """
+        
+        self.sp -= 1
+        return self.sm[self.sp].copy()
+    
+    
+    def select(self, mask: np.ndarray, ip: int) -> "BatchGroup":
+        """ Create a new group from the masked lanes at an address. """
+        
+        return BatchGroup(
+                self.lanes[mask], self.sm[:self.sp, mask].copy(), self.sp, ip,
+                self.fp)
+    
+    
+    def merge(self, other: "BatchGroup") -> None:
+        """ Merge another group with the same registers into the group. """
+        
+        self.lanes = np.concatenate((self.lanes, other.lanes))
+        self.sm = np.concatenate(
+                (self.sm[:self.sp], other.sm[:self.sp]), axis=1)
+
+
+class BatchFVM:
+    """
+    Executes many instances of an FVM program in lock-step. Each instance
+    is a lane with its own arguments for `main`. Lanes with the same
+    registers are grouped so that each instruction is executed for a
+    whole group with vectorized operations. Groups are split when their
+    lanes diverge and merged when their registers match again.
+
+    Unlike the FVM, stack words are 64-bit integers that wrap on
+    overflow.
+    """
+    
+    ef: bool = False
+    """ The batch FVM's execution flag. """
+    
+    ec: np.ndarray
+    """ The batch FVM's exit code for each lane. """
+    
+    pm: bytes
+    """ The batch FVM's program memory. """
+    
+    pm_array: np.ndarray
+    """ The batch FVM's program memory as an array. """
+    
+    groups: list[BatchGroup]
+    """ The batch FVM's running lane groups. """
+    
+    output_lanes: list[np.ndarray]
+    """ The lanes of each group that put characters. """
+    
+    output_values: list[np.ndarray]
+    """ The characters put by each group. """
+    
+    def __init__(self) -> None:
+        """ Initialize the batch FVM's memory. """
+        
+        self.ec = np.zeros(0, dtype=np.int64)
+        self.groups = []
+        self.output_lanes = []
+        self.output_values = []
+        self.load_flat(bytes([Opcode.PUSH_U8.value, 0x00, Opcode.HALT.value]))
+    
+    
+    def load(self, bytecode: bytes) -> bool:
+        """
+        Load an FVM bytecode file's data. Bytecode that is linked to a
+        shared library is not supported.
+        """
+        
+        fvm: FVM = FVM()
+        return fvm.load(bytecode) and fvm.entry == 0 and self.load_flat(
+                fvm.pm)
+    
+    
+    def load_flat(self, bytecode: bytes) -> bool:
+        """ Load flat FVM bytecode. """
+        
+        if self.ef:
+            return False
+        
+        self.pm = bytecode
+        self.pm_array = np.frombuffer(bytecode, dtype=np.uint8).astype(
+                np.int64)
+        return True
+    
+    
+    def begin(self, args: list[list[int]]) -> bool:
+        """
+        Begin execution with a lane for each list of arguments for
+        `main`. Every lane must have the same number of arguments.
+        """
+        
+        if self.ef or not args:
+            return False
+        
+        arg_rows: np.ndarray = np.array(args, dtype=np.int64).reshape(
+                len(args), len(args[0])).T
+        fvm: FVM = FVM()
+        fvm.load_flat(self.pm)
+        address: int = fvm.get_args_address(len(arg_rows))
+        
+        if address < 0:
+            return False
+        
+        self.ec = np.zeros(len(args), dtype=np.int64)
+        self.groups = [BatchGroup(
+                np.arange(len(args)), arg_rows.copy(), len(arg_rows), address,
+                0)]
+        self.output_lanes = []
+        self.output_values = []
+        self.ef = True
+        return True
+    
+    
+    def run(self) -> None:
+        """ Step the batch FVM until every lane has stopped. """
+        
+        while self.ef:
+            self.step()
+    
+    
+    def get_outputs(self) -> list[str]:
+        """ Get the output of each lane. """
+        
+        outputs: list[list[str]] = [[] for i in range(len(self.ec))]
+        
+        if self.output_lanes:
+            lanes: np.ndarray = np.concatenate(self.output_lanes)
+            values: np.ndarray = np.concatenate(self.output_values)
+            
+            for lane, value in zip(lanes.tolist(), values.tolist()):
+                outputs[lane].append(chr(value))
+        
+        return ["".join(output) for output in outputs]
+    
+    
+    def step(self) -> None:
+        """ Step the group of lanes with the lowest instruction pointer. """
+        
+        if not self.ef:
+            return
+        
+        group: BatchGroup = min(self.groups, key=lambda group: group.ip)
+        self.step_group(group)
+        self.merge_groups()
+        self.ef = len(self.groups) > 0
+    
+    
+    def step_group(self, group: BatchGroup) -> None:
+        """ Step a group of lanes by one instruction. """
+        
+        start_ip: int = group.ip
+        
+        if not self.validate_fetch(group, 1):
+            return
+        
+        opcode_value: int = self.fetch_int(group, 1, False)
+        
+        if not opcode_value in FVM.LEGAL_OPCODES:
+            self.crash(group)
+            return
+        
+        opcode: Opcode = Opcode(opcode_value)
+        
+        if opcode == Opcode.HALT and self.validate_pop(group, 1):
+            self.ec[group.lanes] = group.pop()
+            self.groups.remove(group)
+        elif opcode == Opcode.NO_OPERATION:
+            pass
+        elif opcode == Opcode.JUMP and self.validate_pop(group, 1):
+            if not self.split(group, start_ip, 1):
+                group.ip = int(group.pop()[0])
+        elif(
+                opcode in (Opcode.JUMP_NOT_ZERO, Opcode.JUMP_ZERO)
+                and self.validate_pop(group, 2)):
+            if self.split(group, start_ip, 1):
+                return
+            
+            jump_address: int = int(group.pop()[0])
+            mask: np.ndarray = group.pop() != 0
+            
+            if opcode == Opcode.JUMP_ZERO:
+                mask = ~mask
+            
+            if mask.all():
+                group.ip = jump_address
+            elif mask.any():
+                self.groups.remove(group)
+                self.groups.append(group.select(mask, jump_address))
+                self.groups.append(group.select(~mask, group.ip))
+        elif opcode == Opcode.CALL and self.validate_pop(group, 2):
+            if self.split(group, start_ip, 2):
+                return
+            
+            param_count: int = int(group.pop()[0])
+            call_address: int = int(group.pop()[0])
+            
+            if not self.validate_pop(group, param_count):
+                return
+            
+            base: int = group.sp - param_count
+            group.reserve(2)
+            group.sm[base + 2:group.sp + 2] = group.sm[base:group.sp].copy()
+            group.sm[base] = group.fp
+            group.sm[base + 1] = group.ip
+            group.fp = base
+            group.sp += 2
+            group.ip = call_address
+        elif opcode == Opcode.RETURN and self.validate_pop(group, 1):
+            old_fp: int = group.fp
+            
+            if old_fp + 1 >= group.sp:
+                self.crash(group)
+                return
+            
+            if self.split(group, start_ip, 0, [old_fp, old_fp + 1]):
+                return
+            
+            group.ip = int(group.sm[old_fp + 1][0])
+            group.fp = int(group.sm[old_fp][0])
+            group.sm[old_fp] = group.sm[group.sp - 1]
+            group.sp = old_fp + 1
+        elif opcode == Opcode.DROP and self.validate_pop(group, 1):
+            group.sp -= 1
+        elif opcode == Opcode.DUPLICATE and self.validate_pop(group, 1):
+            group.push(group.sm[group.sp - 1])
+        elif opcode == Opcode.PUSH_U8 and self.validate_fetch(group, 1):
+            group.push(self.fetch_int(group, 1, False))
+        elif opcode == Opcode.PUSH_S8 and self.validate_fetch(group, 1):
+            group.push(self.fetch_int(group, 1, True))
+        elif opcode == Opcode.PUSH_U16 and self.validate_fetch(group, 2):
+            group.push(self.fetch_int(group, 2, False))
+        elif opcode == Opcode.PUSH_S16 and self.validate_fetch(group, 2):
+            group.push(self.fetch_int(group, 2, True))
+        elif opcode == Opcode.PUSH_U32 and self.validate_fetch(group, 4):
+            group.push(self.fetch_int(group, 4, False))
+        elif opcode == Opcode.PUSH_S32 and self.validate_fetch(group, 4):
+            group.push(self.fetch_int(group, 4, True))
+        elif(
+                opcode in (Opcode.LOAD_LOCAL, Opcode.STORE_LOCAL)
+                and self.validate_pop(
+                        group, 1 if opcode == Opcode.LOAD_LOCAL else 2)):
+            if self.split(group, start_ip, 1):
+                return
+            
+            index: int = group.fp + int(group.pop()[0])
+            
+            if index < 0 or index >= group.sp:
+                self.crash(group)
+            elif opcode == Opcode.LOAD_LOCAL:
+                group.push(group.sm[index])
+            else:
+                group.sm[index] = group.sm[group.sp - 1]
+        elif(
+                opcode == Opcode.UNARY_DEREFERENCE
+                and self.validate_pop(group, 1)):
+            addresses: np.ndarray = group.sm[group.sp - 1].copy()
+            mask: np.ndarray = (addresses >= 0) & (addresses < len(self.pm))
+            group.sm[group.sp - 1][mask] = self.pm_array[addresses[mask]]
+            self.crash_lanes(group, ~mask)
+        elif opcode == Opcode.UNARY_NEGATE and self.validate_pop(group, 1):
+            np.negative(group.sm[group.sp - 1], out=group.sm[group.sp - 1])
+        elif opcode == Opcode.UNARY_NOT and self.validate_pop(group, 1):
+            group.sm[group.sp - 1] = group.sm[group.sp - 1] == 0
+        elif(
+                opcode.value >= Opcode.BINARY_ADD.value
+                and opcode.value <= Opcode.BINARY_OR.value
+                and self.validate_pop(group, 2)):
+            y: np.ndarray = group.pop()
+            x: np.ndarray = group.sm[group.sp - 1]
+            
+            if opcode in (Opcode.BINARY_DIVIDE, Opcode.BINARY_MODULO):
+                mask: np.ndarray = y == 0
+                
+                if mask.any():
+                    self.crash_lanes(group, mask)
+                    x = group.sm[group.sp - 1]
+                    y = y[~mask]
+            
+            group.sm[group.sp - 1] = self.binary(opcode, x, y)
+        elif opcode == Opcode.PUT_CHR and self.validate_pop(group, 1):
+            self.output_lanes.append(group.lanes.copy())
+            self.output_values.append(group.sm[group.sp - 1].copy())
+        else:
+            self.crash(group)
+    
+    
+    def binary(
+            self, opcode: Opcode, x: np.ndarray, y: np.ndarray
+            ) -> np.ndarray:
+        """ Perform a binary operation on the words of each lane. """
+        
+        if opcode == Opcode.BINARY_ADD:
+            return x + y
+        elif opcode == Opcode.BINARY_SUBTRACT:
+            return x - y
+        elif opcode == Opcode.BINARY_MULTIPLY:
+            return x * y
+        elif opcode == Opcode.BINARY_DIVIDE:
+            return np.floor_divide(x, y)
+        elif opcode == Opcode.BINARY_MODULO:
+            return np.mod(x, y)
+        elif opcode == Opcode.BINARY_EQUALS:
+            return x == y
+        elif opcode == Opcode.BINARY_NOT_EQUALS:
+            return x != y
+        elif opcode == Opcode.BINARY_GREATER:
+            return x > y
+        elif opcode == Opcode.BINARY_GREATER_EQUALS:
+            return x >= y
+        elif opcode == Opcode.BINARY_LESS:
+            return x < y
+        elif opcode == Opcode.BINARY_LESS_EQUALS:
+            return x <= y
+        elif opcode == Opcode.BINARY_AND:
+            return (x != 0) & (y != 0)
+        
+        return (x != 0) | (y != 0)
+    
+    
+    def split(
+            self, group: BatchGroup, start_ip: int, depth: int,
+            indices: list[int] = None) -> bool:
+        """
+        Split a group into groups that agree on the top words of their
+        stacks or on words at indices, and rewind the new groups to an
+        address. Return whether the group was split.
+        """
+        
+        if indices is None:
+            indices = list(range(group.sp - depth, group.sp))
+        
+        rows: np.ndarray = group.sm[indices].T
+        keys, inverse = np.unique(rows, axis=0, return_inverse=True)
+        
+        if len(keys) == 1:
+            return False
+        
+        self.groups.remove(group)
+        inverse = inverse.reshape(-1)
+        
+        for i in range(len(keys)):
+            self.groups.append(group.select(inverse == i, start_ip))
+        
+        return True
+    
+    
+    def merge_groups(self) -> None:
+        """ Merge groups with matching registers. """
+        
+        groups: dict[tuple[int, int, int], BatchGroup] = {}
+        
+        for group in self.groups:
+            key: tuple[int, int, int] = group.get_key()
+            
+            if key in groups:
+                groups[key].merge(group)
+            else:
+                groups[key] = group
+        
+        self.groups = list(groups.values())
+    
+    
+    def crash(self, group: BatchGroup) -> None:
+        """ Crash every lane of a group. """
+        
+        self.ec[group.lanes] = 1
+        
+        if group in self.groups:
+            self.groups.remove(group)
+    
+    
+    def crash_lanes(self, group: BatchGroup, mask: np.ndarray) -> None:
+        """ Crash the masked lanes of a group. """
+        
+        if not mask.any():
+            return
+        
+        self.ec[group.lanes[mask]] = 1
+        group.lanes = group.lanes[~mask]
+        group.sm = group.sm[:, ~mask]
+        
+        if not len(group.lanes):
+            self.groups.remove(group)
+    
+    
+    def validate_fetch(self, group: BatchGroup, amount: int) -> bool:
+        """ Validate whether a fetch operation can be performed. """
+        
+        if group.ip < 0 or group.ip + amount > len(self.pm):
+            self.crash(group)
+            return False
+        
+        return True
+    
+    
+    def validate_pop(self, group: BatchGroup, amount: int) -> bool:
+        """ Validate whether a pop operation can be performed. """
+        
+        if group.sp < amount:
+            self.crash(group)
+            return False
+        
+        return True
+    
+    
+    def fetch_int(self, group: BatchGroup, size: int, is_signed: bool) -> int:
+        """ Fetch an integer from program memory. """
+        
+        value: int = int.from_bytes(
+                self.pm[group.ip:group.ip + size], "little", signed=is_signed)
+        group.ip += size
+        return value
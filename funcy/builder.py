@@ -0,0 +1,123 @@
+import multiprocessing
+import os
+import time
+
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+
+from .core import compile, compile_result_path, get_error_bytecode
+from .result import CompileResult
+
+WARMUP_SOURCE: str = 'include "//std.fy"; func main() {}'
+""" Source code that parses the standard library before workers start. """
+
+def get_out_path(in_path: str, out_dir: str) -> str:
+    """ Get a batch build's output path from its input path. """
+    
+    name: str = os.path.splitext(os.path.basename(in_path))[0]
+    return os.path.join(out_dir, f"{name}.fvm")
+
+
+def build_entry(in_path: str, out_path: str) -> tuple[float, list[str]]:
+    """
+    Build Funcy source code from an input path to FVM bytecode at an
+    output path in a worker process. The output is replaced atomically.
+    Return the build time in seconds and the build's error messages.
+    """
+    
+    start: float = time.perf_counter()
+    result: CompileResult = compile_result_path(in_path)
+    errors: list[str] = result.errors
+    bytecode: bytes = result.bytecode
+    
+    if bytecode is None:
+        bytecode = get_error_bytecode()
+    
+    temp_path: str = f"{out_path}.{os.getpid()}.tmp"
+    
+    try:
+        with open(temp_path, "wb") as file:
+            file.write(bytecode)
+        
+        os.replace(temp_path, out_path)
+    except OSError:
+        errors.append(f"Failed to build to '{out_path}'!")
+    
+    return time.perf_counter() - start, errors
+
+
+def build_many(
+        in_paths: list[str], out_dir: str, jobs: int = None) -> bool:
+    """
+    Build Funcy source code from many input paths to FVM bytecode in an
+    output directory with a process pool of a number of jobs, and print
+    each input's build time. Each output is named after its input with a
+    '.fvm' suffix. The standard library is parsed before the workers are
+    forked so that they share it, and each worker keeps the modules it
+    has parsed for its later inputs. Defaults to one job per CPU. Return
+    whether every input was built without errors.
+    """
+    
+    start: float = time.perf_counter()
+    jobs = max(jobs or os.cpu_count() or 1, 1)
+    out_paths: dict[str, str] = {}
+    
+    for in_path in in_paths:
+        out_path: str = get_out_path(in_path, out_dir)
+        
+        if out_path in out_paths.values():
+            print(f"Inputs build to the same output '{out_path}'!")
+            return False
+        
+        out_paths[in_path] = out_path
+    
+    try:
+        os.makedirs(out_dir, exist_ok=True)
+    except OSError:
+        print(f"Failed to create output directory '{out_dir}'!")
+        return False
+    
+    compile(WARMUP_SOURCE)
+    context: multiprocessing.context.BaseContext = None
+    
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    
+    times: dict[str, float] = {}
+    failures: int = 0
+    
+    with ProcessPoolExecutor(jobs, mp_context=context) as executor:
+        futures: dict[Future, str] = {
+            executor.submit(build_entry, in_path, out_path): in_path
+            for in_path, out_path in out_paths.items()}
+        
+        for future in as_completed(futures):
+            in_path: str = futures[future]
+            
+            # A crashed build or worker only fails its own input.
+            try:
+                times[in_path], errors = future.result()
+            except Exception as error:
+                times[in_path] = None
+                errors: list[str] = [
+                    f"Build crashed with {type(error).__name__}: {error}"]
+            
+            if errors:
+                failures += 1
+                print(f"Failed to build '{in_path}':")
+                
+                for error in errors:
+                    print(f"  {error}")
+    
+    for in_path in in_paths:
+        if times[in_path] is None:
+            print(f"{'crashed':>13}  {in_path}")
+        else:
+            print(f"{times[in_path] * 1000.0:10.2f} ms  {in_path}")
+    
+    elapsed: float = time.perf_counter() - start
+    total: float = sum(value for value in times.values() if value is not None)
+    print(
+            f"Built {len(in_paths) - failures}/{len(in_paths)} programs in "
+            f"{elapsed:.2f} s with {jobs} jobs "
+            f"({total:.2f} s of build time).", flush=True)
+    return failures == 0
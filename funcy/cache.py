@@ -0,0 +1,292 @@
+import hashlib
+import json
+import os
+import threading
+
+from pathlib import Path
+
+from .fvm import FVM
+from .user_cache import get_cache_dir, make_private_dir
+from .version import get_compiler_version
+
+class CacheModule:
+    """ A module that a cached program was compiled from. """
+    
+    path: str
+    """ The cache module's absolute path. """
+    
+    size: int
+    """ The cache module's file size in bytes. """
+    
+    mtime: int
+    """ The cache module's modification time in nanoseconds. """
+    
+    digest: str
+    """ The cache module's content hash. """
+    
+    def __init__(self, path: str, size: int, mtime: int, digest: str) -> None:
+        """
+        Initialize the cache module's path, size, modification time, and
+        content hash.
+        """
+        
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.digest = digest
+    
+    
+    def is_fresh(self) -> bool:
+        """
+        Return whether the cache module's file still has the same
+        content. Files with the same size and modification time are not
+        hashed again. Files with the same content but a new size or
+        modification time have their new size and modification time
+        recorded.
+        """
+        
+        try:
+            stat: os.stat_result = os.stat(self.path)
+        except OSError:
+            return False
+        
+        if stat.st_size == self.size and stat.st_mtime_ns == self.mtime:
+            return True
+        
+        if get_digest_path(self.path) != self.digest:
+            return False
+        
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime_ns
+        return True
+
+
+class BytecodeCache:
+    """
+    An on-disk cache of compiled FVM bytecode. Bytecode is stored by a
+    hash of the compiler version and the content of every module in the
+    program, including standard library modules. Each main module path
+    has a manifest of its modules, so a cached program can be found
+    without parsing. The least recently used entries are evicted when
+    the cache exceeds its size limit. The cache's directory must be
+    private to the current user, so that programs planted by other
+    users are never run.
+    """
+    
+    SIZE_LIMIT: int = 64 << 20
+    """ The bytecode cache's default size limit in bytes. """
+    
+    path: str
+    """ The bytecode cache's directory path. """
+    
+    size_limit: int
+    """ The bytecode cache's size limit in bytes. """
+    
+    def __init__(self, path: str = None, size_limit: int = None) -> None:
+        """
+        Initialize the bytecode cache's directory path and size limit.
+        The defaults may be set with the `FUNCY_CACHE_DIR` and
+        `FUNCY_CACHE_SIZE` environment variables, and the directory
+        defaults to `funcy/bytecode` in the user's cache directory.
+        """
+        
+        if path is None:
+            path = os.environ.get("FUNCY_CACHE_DIR", "") or get_cache_dir(
+                    "bytecode")
+        
+        if size_limit is None:
+            size: str = os.environ.get("FUNCY_CACHE_SIZE", "")
+            size_limit = int(size) if size.isdigit() else self.SIZE_LIMIT
+        
+        self.path = path
+        self.size_limit = size_limit
+    
+    
+    def get_entry_path(self, key: str, suffix: str) -> str:
+        """ Get the path to a cache entry from its key and suffix. """
+        
+        return os.path.join(self.path, f"{key}.{suffix}")
+    
+    
+    def get_manifest_key(self, path: str) -> str:
+        """ Get a manifest's key from its main module's path. """
+        
+        return hashlib.sha256(
+                f"{get_compiler_version()}\0{Path(path).resolve()}"
+                .encode()).hexdigest()[:32]
+    
+    
+    def get_bytecode_key(self, modules: list[CacheModule]) -> str:
+        """ Get a bytecode entry's key from its modules. """
+        
+        hasher = hashlib.sha256(get_compiler_version().encode())
+        
+        for module in modules:
+            hasher.update(f"\0{module.path}\0{module.digest}".encode())
+        
+        return hasher.hexdigest()[:32]
+    
+    
+    def load(self, path: str) -> bytes:
+        """
+        Load cached FVM bytecode from its main module's path. Return None
+        if the program is not cached or any of its modules have changed.
+        """
+        
+        manifest_path: str = self.get_entry_path(
+                self.get_manifest_key(path), "json")
+        
+        try:
+            make_private_dir(self.path)
+            
+            with open(manifest_path, "rt") as file:
+                data: dict = json.load(file)
+            
+            modules: list[CacheModule] = [
+                CacheModule(
+                        str(module_path), int(size), int(mtime), str(digest))
+                for module_path, size, mtime, digest in data["modules"]]
+        except (IOError, ValueError, KeyError, TypeError):
+            return None
+        
+        stats: list[tuple[int, int]] = [
+            (module.size, module.mtime) for module in modules]
+        
+        for module in modules:
+            if not module.is_fresh():
+                return None
+        
+        bytecode_path: str = self.get_entry_path(
+                self.get_bytecode_key(modules), "fyc")
+        
+        try:
+            with open(bytecode_path, "rb") as file:
+                bytecode: bytes = file.read()
+            
+            # Mark the entry as recently used.
+            os.utime(manifest_path)
+            os.utime(bytecode_path)
+        except OSError:
+            return None
+        
+        if bytecode[:len(FVM.HEADER)] != FVM.HEADER:
+            return None
+        
+        # Record touched modules so that they are not hashed again.
+        if stats != [(module.size, module.mtime) for module in modules]:
+            try:
+                self.write_manifest(manifest_path, modules)
+            except OSError:
+                pass
+        
+        return bytecode
+    
+    
+    def save(self, path: str, paths: list[str], bytecode: bytes) -> bool:
+        """
+        Save FVM bytecode to the cache from its main module's path and
+        the paths of all of its modules.
+        """
+        
+        modules: list[CacheModule] = []
+        
+        for module_path in sorted(set(paths)):
+            try:
+                stat: os.stat_result = os.stat(module_path)
+            except OSError:
+                return False
+            
+            digest: str = get_digest_path(module_path)
+            
+            if not digest:
+                return False
+            
+            modules.append(CacheModule(
+                    module_path, stat.st_size, stat.st_mtime_ns, digest))
+        
+        try:
+            make_private_dir(self.path)
+            self.write_entry(
+                    self.get_entry_path(self.get_bytecode_key(modules), "fyc"),
+                    bytecode)
+            self.write_manifest(
+                    self.get_entry_path(self.get_manifest_key(path), "json"),
+                    modules)
+        except OSError:
+            return False
+        
+        self.evict()
+        return True
+    
+    
+    def write_manifest(self, path: str, modules: list[CacheModule]) -> None:
+        """ Write a manifest of a main module's modules to its path. """
+        
+        data: dict = {
+            "modules": [
+                [module.path, module.size, module.mtime, module.digest]
+                for module in modules],
+        }
+        
+        self.write_entry(path, json.dumps(data).encode())
+    
+    
+    def write_entry(self, path: str, data: bytes) -> None:
+        """
+        Write a cache entry's data atomically so that concurrent runs
+        never read a partial entry.
+        """
+        
+        temp_path: str = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        
+        os.replace(temp_path, path)
+    
+    
+    def evict(self) -> None:
+        """
+        Remove the least recently used cache entries until the cache is
+        within its size limit.
+        """
+        
+        entries: list[tuple[int, int, str]] = []
+        size: int = 0
+        
+        try:
+            with os.scandir(self.path) as scanner:
+                for entry in scanner:
+                    if entry.name.endswith((".fyc", ".json")):
+                        stat: os.stat_result = entry.stat()
+                        entries.append(
+                                (stat.st_mtime_ns, stat.st_size, entry.path))
+                        size += stat.st_size
+        except OSError:
+            return
+        
+        entries.sort()
+        
+        for _, entry_size, entry_path in entries:
+            if size <= self.size_limit:
+                break
+            
+            try:
+                os.remove(entry_path)
+            except OSError:
+                continue
+            
+            size -= entry_size
+
+
+def get_digest_path(path: str) -> str:
+    """
+    Get a hash of a file's content from its path. Return an empty string
+    if the file could not be read.
+    """
+    
+    try:
+        with open(path, "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except IOError:
+        return ""
@@ -1,4 +1,34 @@
-from .core import build, exec_path
+import sys
+
+def pop_flag(args: list[str], flag: str) -> bool:
+    """ Remove a flag from arguments and return whether it was present. """
+    
+    if not flag in args:
+        return False
+    
+    while flag in args:
+        args.remove(flag)
+    
+    return True
+
+
+def pop_option(args: list[str], option: str) -> str:
+    """
+    Remove an option and its value from arguments and return the value.
+    Return None if the option was not present or has no value.
+    """
+    
+    if not option in args:
+        return None
+    
+    index: int = args.index(option)
+    args.pop(index)
+    
+    if index >= len(args):
+        return None
+    
+    return args.pop(index)
+
 
 def cli(args: list[str]) -> int:
     """ Run the Funcy CLI (Command Line Interface). """
@@ -7,25 +37,234 @@ def cli(args: list[str]) -> int:
         print("Funcy CLI Usage:")
         print("  'python -m funcy <subcommand>'\n")
         print("  Subcommands:")
-        print("    'build <in> <out>' - Build to code at <in> to <out>.")
-        print("    'run <path>' - Run the code at <path>.")
+        print(
+                "    'build [--coverage] [--memprofile] [--objects <dir>] "
+                "[--library <lib>] [--daemon <socket>] <in> <out>' - "
+                "Build to code at <in> to <out>.")
+        print(
+                "    'build [--jobs <count>] <in>... -o <dir>' - "
+                "Build the code at each <in> to <dir>.")
+        print(
+                "    'watch <in> <out>' - "
+                "Build the code at <in> to <out> whenever it changes.")
+        print(
+                "    'library [--objects <dir>] <in> <out>' - "
+                "Build a shared library from the code at <in> to <out>.")
+        print(
+                "    'run [--native] [--capture] [--output <file>] "
+                "[--trace <size>] [--coverage <lcov>] [--stats] "
+                "[--memprofile] [--server <socket>] [--no-cache] <path>' - "
+                "Run the code at <path>.")
+        print(
+                "    'serve [--workers <count>] <socket>' - "
+                "Serve run jobs at <socket>.")
+        print(
+                "    'daemon [--stats] <socket>' - "
+                "Serve compile requests at <socket>.")
         return 1
     
     subcommand: str = args.pop(0)
     
     if subcommand == "build":
+        is_coverage: bool = pop_flag(args, "--coverage")
+        is_memprofile: bool = pop_flag(args, "--memprofile")
+        object_dir: str = pop_option(args, "--objects")
+        library_path: str = pop_option(args, "--library")
+        jobs: str = pop_option(args, "--jobs")
+        out_dir: str = pop_option(args, "-o")
+        daemon_path: str = pop_option(args, "--daemon")
+        
+        if out_dir is not None:
+            if not args:
+                print("Expected input path arguments!")
+                return 1
+            elif jobs is not None and not jobs.isdigit():
+                print("Expected a job count!")
+                return 1
+            elif(
+                    is_coverage or is_memprofile or object_dir is not None
+                    or library_path is not None):
+                print("Batch builds only support '--jobs'!")
+                return 1
+            
+            from .builder import build_many
+            
+            if jobs is None:
+                return 0 if build_many(args, out_dir) else 1
+            
+            return 0 if build_many(args, out_dir, int(jobs)) else 1
+        elif jobs is not None:
+            print("Expected an output directory!")
+            return 1
+        
         if len(args) != 2:
             print("Expected input and output path arguments!")
             return 1
         
-        build(args[0], args[1])
+        if is_memprofile:
+            from .memprofile import profile_build
+            
+            profile_build(args[0], args[1])
+            return 0
+        
+        if(
+                daemon_path is not None and not is_coverage
+                and object_dir is None and library_path is None):
+            from .daemon import build_daemon
+            
+            # Build locally if the daemon is not running.
+            if build_daemon(daemon_path, args[0], args[1]):
+                return 0
+        
+        from .core import build
+        
+        build(args[0], args[1], is_coverage, object_dir, library_path)
+        return 0
+    elif subcommand == "watch":
+        if len(args) != 2:
+            print("Expected input and output path arguments!")
+            return 1
+        
+        from .watch import watch
+        
+        watch(args[0], args[1])
+        return 0
+    elif subcommand == "library":
+        object_dir: str = pop_option(args, "--objects")
+        
+        if len(args) != 2:
+            print("Expected input and output path arguments!")
+            return 1
+        
+        from .core import build_library
+        
+        build_library(args[0], args[1], object_dir)
         return 0
     elif subcommand == "run":
+        is_native: bool = pop_flag(args, "--native")
+        is_capture: bool = pop_flag(args, "--capture")
+        output_path: str = pop_option(args, "--output")
+        trace: str = pop_option(args, "--trace")
+        lcov_path: str = pop_option(args, "--coverage")
+        is_stats: bool = pop_flag(args, "--stats")
+        is_memprofile: bool = pop_flag(args, "--memprofile")
+        server_path: str = pop_option(args, "--server")
+        is_cache: bool = not pop_flag(args, "--no-cache")
+        
         if len(args) != 1:
             print("Expected a path argument!")
             return 1
+        elif trace is not None and not trace.isdigit():
+            print("Expected a trace size!")
+            return 1
+        
+        trace_size: int = 0 if trace is None else int(trace)
+        
+        if server_path is not None:
+            from .server import submit_path
+            
+            exit_code, output = submit_path(server_path, args[0])
+            print(output, end="")
+            return exit_code
+        
+        if lcov_path is not None:
+            from .core import exec_coverage_path
+            
+            return exec_coverage_path(args[0], lcov_path)
+        
+        if is_memprofile:
+            from .memprofile import profile_exec_path
+            
+            return profile_exec_path(args[0])
+        
+        if is_capture or output_path is not None:
+            from .core import run_path
+            from .result import ExecResult
+            
+            result: ExecResult = run_path(
+                    args[0], trace_size=trace_size, cache=is_cache,
+                    stats=is_stats)
+            
+            if result.crash_report:
+                print(result.crash_report, file=sys.stderr)
+            
+            if is_stats:
+                print(result.stats, file=sys.stderr)
+            
+            if output_path is None:
+                sys.stdout.flush()
+                sys.stdout.buffer.write(result.output)
+                sys.stdout.buffer.flush()
+                return result.exit_code
+            
+            try:
+                with open(output_path, "wb") as file:
+                    file.write(result.output)
+            except IOError:
+                print(f"Failed to write output to '{output_path}'!")
+                return 1
+            
+            return result.exit_code
+        
+        from .runtime import exec_bytecode, load_bytecode_path
+        
+        # Bytecode and cached programs are run without the compiler.
+        bytecode: bytes | memoryview = load_bytecode_path(args[0])
+        
+        if bytecode is None and is_cache and not is_native:
+            from .cache import BytecodeCache
+            
+            bytecode = BytecodeCache().load(args[0])
+        
+        if bytecode is not None:
+            return exec_bytecode(bytecode, trace_size, is_stats)
+        
+        from .core import exec_path
+        
+        return exec_path(args[0], is_native, trace_size, is_stats, is_cache)
+    elif subcommand == "serve":
+        workers: str = pop_option(args, "--workers")
+        
+        if len(args) != 1:
+            print("Expected a socket path argument!")
+            return 1
+        elif workers is not None and not workers.isdigit():
+            print("Expected a worker count!")
+            return 1
+        
+        from .server import serve
+        
+        if workers is None:
+            serve(args[0])
+        else:
+            serve(args[0], int(workers))
+        
+        return 0
+    elif subcommand == "daemon":
+        is_stats: bool = pop_flag(args, "--stats")
+        
+        if len(args) != 1:
+            print("Expected a socket path argument!")
+            return 1
         
-        return exec_path(args[0])
+        if is_stats:
+            from .daemon import get_daemon_stats
+            
+            stats: dict | None = get_daemon_stats(args[0])
+            
+            if stats is None:
+                print(f"No compile daemon is running at '{args[0]}'!")
+                return 1
+            
+            for name, value in stats.items():
+                print(f"{name}: {value}")
+            
+            return 0
+        
+        from .daemon import serve_daemon
+        
+        serve_daemon(args[0])
+        return 0
     else:
         print(f"Invalid subcommand '{subcommand}'!")
         return 1
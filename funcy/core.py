@@ -1,10 +1,24 @@
+import functools
+
+from collections.abc import Callable
+from concurrent.futures import Executor
+from pathlib import Path
+
 from .ast.visitor import Visitor
-from .fvm import FVM
+from .cache import BytecodeCache
+from .coverage import CoverageMap, get_coverage_map
+from .fvm import FVM, StopReason
 from .io.input_wrapper import InputWrapper
 from .io.log import Log
 from .ir.code import Code
 from .ir.serializer import Serializer
+from .library import Library, load_library_path
+from .linker import ObjectBuilder
+from .native import NativeProgram, build_native
 from .parser.resolver import Resolver
+from .program import Program
+from .result import CompileResult, ExecResult
+from .runtime import exec_bytecode, save_bytecode_path
 
 def get_error_bytecode() -> bytes:
     """ Builds error FVM bytecode. """
@@ -15,60 +29,386 @@ def get_error_bytecode() -> bytes:
     return Serializer().serialize(code, False)
 
 
-def build(in_path: str, out_path: str) -> None:
+def build(
+        in_path: str, out_path: str, coverage: bool = False,
+        object_dir: str = None, library_path: str = None) -> None:
     """
     Build Funcy source code from an input path to FVM bytecode at an
-    output path.
+    output path. If coverage is requested, a coverage map is also built
+    to the output path with a '.cov' suffix. If an object directory is
+    given, each module is compiled to an object file in the directory
+    and only changed modules are compiled again. If a shared library
+    path is given, the bytecode is linked to the library.
     """
     
-    bytecode: bytes = compile_path(in_path)
+    if coverage:
+        bytecode, coverage_map = compile_coverage_path(in_path)
+        
+        if not coverage_map.save(f"{out_path}.cov"):
+            print(f"Failed to build coverage map to '{out_path}.cov'!")
+    elif library_path is not None:
+        bytecode: bytes = compile_linked_path(
+                in_path, library_path, object_dir or "")
+    elif object_dir is not None:
+        bytecode: bytes = compile_objects_path(in_path, object_dir)
+    else:
+        bytecode: bytes = compile_path(in_path)
     
-    try:
-        with open(out_path, "wb") as file:
-            file.write(bytecode)
-    except IOError:
+    if not save_bytecode_path(out_path, bytecode):
         print(f"Failed to build to '{out_path}'!")
 
 
+def build_library(
+        in_path: str, out_path: str, object_dir: str = None) -> None:
+    """
+    Build a shared library of FVM bytecode from the path of a module that
+    includes the library's modules to an output path. If an object
+    directory is given, object files are kept in the directory.
+    """
+    
+    log: Log = Log()
+    result: tuple[Code, dict] = ObjectBuilder(
+            log, object_dir or "").build_library(in_path)
+    
+    if result is None:
+        log.print_records()
+        return
+    
+    # Libraries are mapped to memory when they are loaded, so they are
+    # replaced atomically like bytecode.
+    if not save_bytecode_path(
+            out_path, Serializer().serialize_library(*result)):
+        print(f"Failed to build library to '{out_path}'!")
+
+
 def compile(source: str) -> bytes:
     """ Compile Funcy source code to FVM bytecode. """
     
+    code: Code = compile_code(source)
+    
+    if code is None:
+        return get_error_bytecode()
+    
+    return Serializer().serialize(code, False)
+
+
+def compile_path(path: str, jobs: int = 1) -> bytes:
+    """
+    Compile Funcy source code to FVM bytecode from a path. Modules are
+    parsed in parallel by a process pool if more than 1 job is given.
+    """
+    
+    code: Code = compile_code_path(path, jobs)
+    
+    if code is None:
+        return get_error_bytecode()
+    
+    return Serializer().serialize(code, False)
+
+
+def compile_result(source: str) -> CompileResult:
+    """
+    Compile Funcy source code to FVM bytecode and return the result with
+    any errors instead of printing them.
+    """
+    
     log: Log = Log()
     code: Code = Visitor(log).generate(Resolver(log).resolve_source(source))
+    return get_compile_result(code, log)
+
+
+def compile_result_path(path: str) -> CompileResult:
+    """
+    Compile Funcy source code to FVM bytecode from a path and return the
+    result with any errors instead of printing them.
+    """
+    
+    log: Log = Log()
+    code: Code = Visitor(log).generate(Resolver(log).resolve_path(path))
+    return get_compile_result(code, log)
+
+
+def get_compile_result(code: Code, log: Log) -> CompileResult:
+    """ Get a compile result from IR code and its log. """
+    
+    if log.has_records():
+        return CompileResult(None, [str(record) for record in log.records])
+    
+    return CompileResult(Serializer().serialize(code, False), [])
+
+
+def compile_many(
+        sources: list[str], executor: Executor = None) -> list[CompileResult]:
+    """
+    Compile many Funcy sources to FVM bytecode with an optional executor
+    and return a result for each source. Modules are parsed once through
+    the resolver's module cache and shared by every source compiled in
+    the same process. The first source is compiled before the others are
+    submitted, so the modules that it shares with them are already
+    cached. The sources are compiled serially if no executor is given.
+    """
+    
+    return map_compile_results(compile_result, sources, executor)
+
+
+def compile_many_paths(
+        paths: list[str], executor: Executor = None) -> list[CompileResult]:
+    """
+    Compile Funcy source code from many paths to FVM bytecode with an
+    optional executor and return a result for each path. Modules are
+    shared like they are by `compile_many`.
+    """
+    
+    return map_compile_results(compile_result_path, paths, executor)
+
+
+def map_compile_results(
+        function: Callable[[str], CompileResult], inputs: list[str],
+        executor: Executor = None) -> list[CompileResult]:
+    """
+    Map a compile function over inputs with an optional executor after
+    compiling the first input in the current thread.
+    """
+    
+    if not inputs:
+        return []
+    
+    results: list[CompileResult] = [function(inputs[0])]
+    
+    if executor is None:
+        results.extend(function(value) for value in inputs[1:])
+    else:
+        results.extend(executor.map(function, inputs[1:]))
+    
+    return results
+
+
+def compile_cached_path(path: str) -> bytes:
+    """
+    Compile Funcy source code to FVM bytecode from a path through the
+    bytecode cache. Lexing, parsing, and code generation are skipped if
+    the program and its modules have not changed since they were cached.
+    """
+    
+    cache: BytecodeCache = BytecodeCache()
+    bytecode: bytes = cache.load(path)
+    
+    if bytecode is not None:
+        return bytecode
+    
+    log: Log = Log()
+    resolver: Resolver = Resolver(log)
+    code: Code = Visitor(log).generate(resolver.resolve_path(path))
     
     if log.has_records():
         log.print_records()
         return get_error_bytecode()
     
-    return Serializer().serialize(code, False)
+    bytecode = Serializer().serialize(code, False)
+    cache.save(path, resolver.get_module_paths(), bytecode)
+    return bytecode
 
 
-def compile_path(path: str) -> bytes:
-    """ Compile Funcy source code to FVM bytecode from a path. """
+def compile_objects_path(path: str, object_dir: str) -> bytes:
+    """
+    Compile Funcy source code to FVM bytecode from a path by compiling
+    each module to an object file in a directory and linking the object
+    files. Modules are only compiled again if they have changed or the
+    functions that they import have changed.
+    """
     
     log: Log = Log()
-    code: Code = Visitor(log).generate(Resolver(log).resolve_path(path))
+    code: Code = ObjectBuilder(log, object_dir).build(path)
     
-    if log.has_records():
+    if code is None:
         log.print_records()
         return get_error_bytecode()
     
     return Serializer().serialize(code, False)
 
 
-def exec(source: str | bytes) -> int:
+def compile_linked_path(
+        path: str, library_path: str, object_dir: str = "") -> bytes:
+    """
+    Compile Funcy source code to FVM bytecode that is linked to a shared
+    library from a path and the library's path. Modules that are provided
+    by the library are not compiled. If an object directory is given,
+    object files are kept in the directory.
+    """
+    
+    library_path = str(Path(library_path).resolve())
+    library: Library = load_library_path(library_path)
+    
+    if library is None:
+        print(f"Failed to load library from '{library_path}'!")
+        return get_error_bytecode()
+    
+    log: Log = Log()
+    code: Code = ObjectBuilder(log, object_dir, library).build(path)
+    
+    if code is None:
+        log.print_records()
+        return get_error_bytecode()
+    
+    return Serializer().serialize_linked(code, library_path, library)
+
+
+def compile_code(source: str) -> Code:
+    """
+    Compile Funcy source code to IR code. Return None if the source code
+    could not be compiled.
+    """
+    
+    log: Log = Log()
+    code: Code = Visitor(log).generate(Resolver(log).resolve_source(source))
+    
+    if log.has_records():
+        log.print_records()
+        return None
+    
+    return code
+
+
+def compile_code_path(path: str, jobs: int = 1) -> Code:
+    """
+    Compile Funcy source code to IR code from a path. Modules are parsed
+    in parallel by a process pool if more than 1 job is given. Return
+    None if the source code could not be compiled.
+    """
+    
+    log: Log = Log()
+    code: Code = Visitor(log).generate(
+            Resolver(log, jobs).resolve_path(path))
+    
+    if log.has_records():
+        log.print_records()
+        return None
+    
+    return code
+
+
+def compile_coverage_path(path: str) -> tuple[bytes, CoverageMap]:
+    """
+    Compile Funcy source code to FVM bytecode and a coverage map from a
+    path.
+    """
+    
+    log: Log = Log()
+    resolver: Resolver = Resolver(log)
+    code: Code = Visitor(log).generate(resolver.resolve_path(path))
+    
+    if log.has_records():
+        log.print_records()
+        return get_error_bytecode(), CoverageMap()
+    
+    coverage_map: CoverageMap = get_coverage_map(code)
+    
+    for name in resolver.get_module_names():
+        coverage_map.paths[name] = resolver.get_module_path(name)
+    
+    return Serializer().serialize(code, False), coverage_map
+
+
+def exec(
+        source: str | bytes, native: bool = False, trace_size: int = 0,
+        stats: bool = False) -> int:
     """
     Execute Funcy source code or FVM bytecode and return an exit code.
+    Source code is compiled with the system C compiler if native
+    execution is requested and a compiler is available. If a trace size
+    is given, the last executed instructions are traced and reported to
+    standard error if the FVM crashes. If stats are requested, the FVM's
+    runtime counters are reported to standard error.
     """
     
     if isinstance(source, str):
+        if native and trace_size <= 0 and not stats:
+            return exec_native(compile_code(source))
+        
         source = compile(source)
-    elif not isinstance(source, bytes):
+    elif not isinstance(source, (bytes, memoryview)):
+        return 1
+    
+    return exec_bytecode(source, trace_size, stats)
+
+
+def exec_native(code: Code) -> int:
+    """
+    Execute IR code with the system C compiler and return an exit code.
+    Fall back to the FVM if the IR code cannot be executed natively.
+    """
+    
+    if code is None:
+        return exec(get_error_bytecode())
+    
+    program: NativeProgram = build_native(code)
+    
+    if program is not None:
+        exit_code: int = program.run()
+        
+        if exit_code is not None:
+            return exit_code
+    
+    return exec(Serializer().serialize(code, False))
+
+
+def exec_path(
+        path: str, native: bool = False, trace_size: int = 0,
+        stats: bool = False, cache: bool = False) -> int:
+    """
+    Execute Funcy source code or FVM bytecode from a path and return an
+    exit code. If a trace size is given, the last executed instructions
+    are traced and reported to standard error if the FVM crashes. If
+    stats are requested, the FVM's runtime counters are reported to
+    standard error. If caching is requested, source code is compiled
+    through the bytecode cache.
+    """
+    
+    input_wrapper: InputWrapper = InputWrapper()
+    input_wrapper.from_path(path)
+    
+    if not input_wrapper.is_ok:
+        print(f"Failed to execute from '{path}'!")
         return 1
     
+    if input_wrapper.is_binary:
+        return exec(input_wrapper.bytecode, False, trace_size, stats)
+    elif native and trace_size <= 0 and not stats:
+        return exec_native(compile_code_path(path))
+    elif cache:
+        return exec(compile_cached_path(path), False, trace_size, stats)
+    else:
+        return exec(compile_path(path), False, trace_size, stats)
+
+
+def exec_coverage_path(path: str, lcov_path: str) -> int:
+    """
+    Execute Funcy source code or FVM bytecode from a path while counting
+    executed blocks, write an LCOV tracefile to a path, and return an
+    exit code. FVM bytecode must have been built with a coverage map.
+    """
+    
+    input_wrapper: InputWrapper = InputWrapper()
+    input_wrapper.from_path(path)
+    
+    if not input_wrapper.is_ok:
+        print(f"Failed to execute from '{path}'!")
+        return 1
+    
+    if input_wrapper.is_binary:
+        bytecode: bytes = input_wrapper.bytecode
+        coverage_map: CoverageMap = CoverageMap()
+        
+        if not coverage_map.load(f"{path}.cov"):
+            print(f"Failed to load coverage map from '{path}.cov'!")
+            return 1
+    else:
+        bytecode, coverage_map = compile_coverage_path(path)
+    
     fvm: FVM = FVM()
+    fvm.enable_coverage(coverage_map.get_addresses())
     
-    if not fvm.load(source):
+    if not fvm.load(bytecode):
         print("Failed to load bytecode!")
         return 1
     
@@ -76,16 +416,91 @@ def exec(source: str | bytes) -> int:
         print("Failed to start FVM!")
         return 1
     
-    while fvm.ef:
-        fvm.step()
+    fvm.run()
+    
+    try:
+        with open(lcov_path, "wt") as file:
+            file.write(coverage_map.get_lcov(fvm.counters))
+    except IOError:
+        print(f"Failed to write coverage to '{lcov_path}'!")
     
     return fvm.ec
 
 
-def exec_path(path: str) -> int:
+def run(
+        source: str | bytes, step_limit: int = -1, args: list[int] = None,
+        trace_size: int = 0, stats: bool = False) -> ExecResult:
     """
-    Execute Funcy source code or FVM bytecode from a path and return an
-    exit code.
+    Execute Funcy source code or FVM bytecode with an optional step limit,
+    optional arguments for `main`, and an optional trace size. Capture
+    the output and return the result. If stats are requested, calls,
+    returns, characters, and peak depths are counted in the result's
+    runtime counters.
+    """
+    
+    if isinstance(source, str):
+        source = compile(source)
+    elif not isinstance(source, (bytes, memoryview)):
+        return ExecResult(1, bytes(), 0, StopReason.NONE)
+    
+    fvm: FVM = FVM()
+    fvm.capture()
+    
+    if trace_size > 0:
+        fvm.enable_trace(trace_size)
+    
+    if stats:
+        fvm.enable_stats()
+    
+    if not fvm.load(source):
+        print("Failed to load bytecode!")
+        return ExecResult(1, bytes(), 0, StopReason.NONE)
+    
+    if not fvm.begin(args):
+        print("Failed to start FVM!")
+        return ExecResult(1, bytes(), 0, StopReason.NONE)
+    
+    steps: int = fvm.run(step_limit)
+    
+    if fvm.ef:
+        fvm.stop()
+    
+    return ExecResult(
+            fvm.ec, fvm.get_output(), steps, fvm.sr, fvm.get_crash_report(),
+            fvm.stats)
+
+
+def run_many(
+        sources: list[str | bytes], executor: Executor = None,
+        step_limit: int = -1) -> list[ExecResult]:
+    """
+    Execute many Funcy sources or FVM bytecode with an optional executor
+    and an optional step limit, and return a result for each source.
+    Each source runs in its own FVM with its output captured, so sources
+    may be executed concurrently in a thread or process pool. The sources
+    are executed serially if no executor is given.
+    """
+    
+    function: Callable[[str | bytes], ExecResult] = functools.partial(
+            run, step_limit=step_limit)
+    
+    if executor is None:
+        return [function(source) for source in sources]
+    
+    return list(executor.map(function, sources))
+
+
+def run_path(
+        path: str, step_limit: int = -1, args: list[int] = None,
+        trace_size: int = 0, cache: bool = False,
+        stats: bool = False) -> ExecResult:
+    """
+    Execute Funcy source code or FVM bytecode from a path with an
+    optional step limit, optional arguments for `main`, and an optional
+    trace size. Capture the output and return the result. If caching is
+    requested, source code is compiled through the bytecode cache. If
+    stats are requested, calls, returns, characters, and peak depths are
+    counted in the result's runtime counters.
     """
     
     input_wrapper: InputWrapper = InputWrapper()
@@ -93,9 +508,53 @@ def exec_path(path: str) -> int:
     
     if not input_wrapper.is_ok:
         print(f"Failed to execute from '{path}'!")
-        return 1
+        return ExecResult(1, bytes(), 0, StopReason.NONE)
+    
+    if input_wrapper.is_binary:
+        source: bytes = input_wrapper.bytecode
+    elif cache:
+        source: bytes = compile_cached_path(path)
+    else:
+        source: bytes = compile_path(path)
+    
+    return run(source, step_limit, args, trace_size, stats)
+
+
+def compile_program(source: str | bytes) -> Program:
+    """
+    Compile Funcy source code or load FVM bytecode to a program that may
+    be run many times. Return None if the program could not be loaded.
+    """
+    
+    if isinstance(source, str):
+        source = compile(source)
+    elif not isinstance(source, (bytes, memoryview)):
+        return None
+    
+    program: Program = Program()
+    
+    if not program.load(source):
+        print("Failed to load bytecode!")
+        return None
+    
+    return program
+
+
+def compile_program_path(path: str) -> Program:
+    """
+    Compile Funcy source code or load FVM bytecode from a path to a
+    program that may be run many times. Return None if the program could
+    not be loaded.
+    """
+    
+    input_wrapper: InputWrapper = InputWrapper()
+    input_wrapper.from_path(path)
+    
+    if not input_wrapper.is_ok:
+        print(f"Failed to load from '{path}'!")
+        return None
     
     if input_wrapper.is_binary:
-        return exec(input_wrapper.bytecode)
+        return compile_program(input_wrapper.bytecode)
     else:
-        return exec(compile_path(path))
+        return compile_program(compile_path(path))
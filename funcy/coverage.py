@@ -0,0 +1,223 @@
+import json
+
+from array import array
+
+from .ir.code import Code, OpType
+from .ir.serializer import Serializer
+
+class CoverageBlock:
+    """ A basic block of FVM bytecode with a coverage counter slot. """
+    
+    address: int
+    """ The coverage block's start address. """
+    
+    labels: list[str]
+    """ The coverage block's IR block labels. """
+    
+    lines: list[tuple[str, int]]
+    """ The coverage block's module names and source lines. """
+    
+    def __init__(self, address: int) -> None:
+        """ Initialize the coverage block's address, labels, and lines. """
+        
+        self.address = address
+        self.labels = []
+        self.lines = []
+
+
+class CoverageMap:
+    """
+    A side table that maps FVM bytecode blocks to coverage counter slots
+    and source lines.
+    """
+    
+    FUNC_LABEL: str = "_func_"
+    """ The infix of IR block labels that start functions. """
+    
+    blocks: list[CoverageBlock]
+    """ The coverage map's blocks in counter slot order. """
+    
+    funcs: list[tuple[str, str, int, int]]
+    """
+    The coverage map's function names, module names, source lines, and
+    counter slots.
+    """
+    
+    paths: dict[str, str]
+    """ The coverage map's source paths by module name. """
+    
+    def __init__(self) -> None:
+        """ Initialize the coverage map's blocks, functions, and paths. """
+        
+        self.blocks = []
+        self.funcs = []
+        self.paths = {}
+    
+    
+    def get_addresses(self) -> list[int]:
+        """ Get the coverage map's block addresses in slot order. """
+        
+        return [block.address for block in self.blocks]
+    
+    
+    def save(self, path: str) -> bool:
+        """ Save the coverage map to a path. """
+        
+        data: dict = {
+            "blocks": [
+                [block.address, block.labels, block.lines]
+                for block in self.blocks],
+            "funcs": self.funcs,
+            "paths": self.paths,
+        }
+        
+        try:
+            with open(path, "wt") as file:
+                json.dump(data, file)
+        except IOError:
+            return False
+        
+        return True
+    
+    
+    def load(self, path: str) -> bool:
+        """ Load the coverage map from a path. """
+        
+        try:
+            with open(path, "rt") as file:
+                data: dict = json.load(file)
+        except (IOError, ValueError):
+            return False
+        
+        self.blocks = []
+        self.funcs = [tuple(func) for func in data.get("funcs", [])]
+        self.paths = dict(data.get("paths", {}))
+        
+        for address, labels, lines in data.get("blocks", []):
+            block: CoverageBlock = CoverageBlock(address)
+            block.labels = list(labels)
+            block.lines = [(name, line) for name, line in lines]
+            self.blocks.append(block)
+        
+        return True
+    
+    
+    def get_line_counts(self, counters: array) -> dict[str, dict[int, int]]:
+        """
+        Get source line hit counts by source path from coverage counters.
+        A line's hit count is the highest count of the blocks that
+        contain code from the line.
+        """
+        
+        line_counts: dict[str, dict[int, int]] = {}
+        
+        for block, count in zip(self.blocks, counters):
+            for name, line in block.lines:
+                if not name in self.paths:
+                    continue
+                
+                counts: dict[int, int] = line_counts.setdefault(
+                        self.paths[name], {})
+                counts[line] = max(counts.get(line, 0), count)
+        
+        return line_counts
+    
+    
+    def get_lcov(self, counters: array) -> str:
+        """ Get an LCOV tracefile from coverage counters. """
+        
+        funcs: dict[str, list[tuple[str, int, int]]] = {}
+        
+        for name, module, line, slot in self.funcs:
+            if module in self.paths:
+                funcs.setdefault(self.paths[module], []).append(
+                        (name, line, counters[slot]))
+        
+        lines: list[str] = []
+        
+        for path, counts in sorted(self.get_line_counts(counters).items()):
+            lines.append("TN:")
+            lines.append(f"SF:{path}")
+            path_funcs: list[tuple[str, int, int]] = funcs.get(path, [])
+            
+            for name, line, count in path_funcs:
+                lines.append(f"FN:{line},{name}")
+            
+            for name, line, count in path_funcs:
+                lines.append(f"FNDA:{count},{name}")
+            
+            lines.append(f"FNF:{len(path_funcs)}")
+            lines.append(
+                    f"FNH:{sum(1 for func in path_funcs if func[2] > 0)}")
+            
+            for line, count in sorted(counts.items()):
+                lines.append(f"DA:{line},{count}")
+            
+            lines.append(f"LF:{len(counts)}")
+            lines.append(
+                    f"LH:{sum(1 for count in counts.values() if count > 0)}")
+            lines.append("end_of_record")
+        
+        return "".join(f"{line}\n" for line in lines)
+
+
+def get_coverage_block(
+        coverage_map: CoverageMap, blocks: dict[int, CoverageBlock],
+        address: int) -> CoverageBlock:
+    """
+    Get a coverage block from a coverage map and its blocks by address.
+    Add the block if it does not exist.
+    """
+    
+    if not address in blocks:
+        blocks[address] = CoverageBlock(address)
+        coverage_map.blocks.append(blocks[address])
+    
+    return blocks[address]
+
+
+def get_coverage_map(code: Code) -> CoverageMap:
+    """
+    Get a coverage map from IR code. Basic blocks start at IR blocks and
+    after conditional jumps and calls. Blocks that start at the same
+    address share a counter slot.
+    """
+    
+    coverage_map: CoverageMap = CoverageMap()
+    serializer: Serializer = Serializer()
+    labels: dict[str, int] = serializer.get_labels(code)
+    blocks: dict[int, CoverageBlock] = {}
+    
+    for ir_block in code.blocks:
+        address: int = labels[ir_block.label]
+        block: CoverageBlock = get_coverage_block(
+                coverage_map, blocks, address)
+        block.labels.append(ir_block.label)
+        
+        if(
+                coverage_map.FUNC_LABEL in ir_block.label
+                and ir_block.span is not None):
+            name: str = ir_block.label[
+                    ir_block.label.index(coverage_map.FUNC_LABEL)
+                    + len(coverage_map.FUNC_LABEL):]
+            coverage_map.funcs.append((
+                    name, ir_block.span.start.name,
+                    ir_block.span.start.line,
+                    coverage_map.blocks.index(block)))
+        
+        for op in ir_block.ops:
+            address += serializer.get_op_size(op)
+            
+            if op.span is not None and op.span.start.name:
+                line: tuple[str, int] = (
+                        op.span.start.name, op.span.start.line)
+                
+                if not line in block.lines:
+                    block.lines.append(line)
+            
+            if op.type in (
+                    OpType.JUMP_NOT_ZERO_LABEL, OpType.JUMP_ZERO_LABEL,
+                    OpType.CALL_PARAMC):
+                block = get_coverage_block(coverage_map, blocks, address)
+    
+    return coverage_map
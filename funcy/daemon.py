@@ -0,0 +1,258 @@
+import json
+import os
+import socket
+import threading
+import time
+
+from .result import CompileResult
+from .server import recv_message, send_message
+
+class DaemonRequest:
+    """ The kinds of request that can be sent to a compile daemon. """
+    
+    BUILD: bytes = b"B"
+    """ Compile Funcy source code from a path. """
+    
+    STATS: bytes = b"S"
+    """ Get the compile daemon's statistics. """
+
+
+class Daemon:
+    """
+    A compile daemon that keeps the compiler loaded and its module cache
+    and include index warm between requests. Requests are accepted over
+    a Unix socket and handled concurrently in threads. Changed modules
+    are detected by the include index and parsed again.
+    """
+    
+    WARMUP_SOURCE: str = 'include "//std.fy"; func main() {}'
+    """ Source code compiled before requests are accepted. """
+    
+    path: str
+    """ The daemon's socket path. """
+    
+    listener: socket.socket
+    """ The daemon's listening socket. """
+    
+    lock: threading.Lock
+    """ The lock held while the daemon's statistics are changed. """
+    
+    build_count: int
+    """ The daemon's number of finished builds. """
+    
+    failure_count: int
+    """ The daemon's number of builds with errors. """
+    
+    total_latency: float
+    """ The daemon's total build latency in milliseconds. """
+    
+    max_latency: float
+    """ The daemon's maximum build latency in milliseconds. """
+    
+    def __init__(self, path: str) -> None:
+        """ Initialize the daemon's socket path and statistics. """
+        
+        self.path = path
+        self.lock = threading.Lock()
+        self.build_count = 0
+        self.failure_count = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+    
+    
+    def serve(self) -> None:
+        """ Serve requests until interrupted. """
+        
+        # The compiler is only imported by the daemon so that clients
+        # start quickly.
+        from .core import compile
+        
+        compile(self.WARMUP_SOURCE)
+        
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.path)
+        self.listener.listen(128)
+        print(f"Compile daemon listening on '{self.path}'.", flush=True)
+        
+        try:
+            while True:
+                connection, address = self.listener.accept()
+                threading.Thread(
+                        target=self.handle, args=(connection,),
+                        daemon=True).start()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+    
+    
+    def handle(self, connection: socket.socket) -> None:
+        """ Handle a request from a connection and close it. """
+        
+        with connection:
+            try:
+                request: bytes = recv_message(connection)
+                kind: bytes = request[:1]
+                
+                if kind == DaemonRequest.BUILD:
+                    header, bytecode = self.build(request[1:].decode())
+                    send_message(connection, json.dumps(header).encode())
+                    send_message(connection, bytecode)
+                elif kind == DaemonRequest.STATS:
+                    send_message(
+                            connection, json.dumps(self.get_stats()).encode())
+            except (ConnectionError, OSError, UnicodeDecodeError):
+                pass
+    
+    
+    def build(self, path: str) -> tuple[dict, bytes]:
+        """
+        Compile Funcy source code from a path and return a response
+        header with its errors and latency, and its FVM bytecode. Builds
+        that raise an exception fail with the exception as their error.
+        """
+        
+        from .core import compile_result_path
+        
+        start: float = time.perf_counter()
+        
+        try:
+            result: CompileResult = compile_result_path(path)
+        except Exception as error:
+            result: CompileResult = CompileResult(None, [
+                f"Build crashed with {type(error).__name__}: {error}"])
+        
+        latency: float = (time.perf_counter() - start) * 1000.0
+        
+        with self.lock:
+            self.build_count += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            
+            if result.errors:
+                self.failure_count += 1
+            
+            build_count: int = self.build_count
+        
+        print(
+                f"Build {build_count}: {latency:.2f} ms, '{path}'"
+                f"{', failed' if result.errors else ''}.", flush=True)
+        return (
+                {"errors": result.errors, "latency": latency},
+                result.bytecode or bytes())
+    
+    
+    def get_stats(self) -> dict:
+        """ Get the daemon's build and cache statistics. """
+        
+        from .parser.resolver import Resolver
+        
+        with self.lock:
+            return {
+                "builds": self.build_count,
+                "failures": self.failure_count,
+                "mean_latency": self.total_latency / max(self.build_count, 1),
+                "max_latency": self.max_latency,
+                "cache_hits": Resolver.module_cache.hits,
+                "cache_misses": Resolver.module_cache.misses,
+                "cached_modules": len(Resolver.module_cache.modules),
+                "indexed_modules": len(Resolver.include_index.modules),
+            }
+    
+    
+    def close(self) -> None:
+        """ Close the daemon's socket. """
+        
+        self.listener.close()
+        
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def request(path: str, data: bytes) -> socket.socket:
+    """
+    Send a request to the compile daemon listening at a socket path and
+    return the connection to receive its response from.
+    """
+    
+    sock: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    
+    try:
+        sock.connect(path)
+        send_message(sock, data)
+    except OSError:
+        sock.close()
+        raise
+    
+    return sock
+
+
+def compile_daemon_path(path: str, in_path: str) -> CompileResult | None:
+    """
+    Compile Funcy source code from an input path with the compile daemon
+    listening at a socket path. Return None if the daemon is not
+    running.
+    """
+    
+    try:
+        with request(
+                path, DaemonRequest.BUILD
+                + os.path.abspath(in_path).encode()) as sock:
+            header: dict = json.loads(recv_message(sock))
+            bytecode: bytes = recv_message(sock)
+        
+        errors: list[str] = [str(error) for error in header["errors"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    
+    return CompileResult(None if errors else bytecode, errors)
+
+
+def build_daemon(path: str, in_path: str, out_path: str) -> bool:
+    """
+    Build Funcy source code from an input path to FVM bytecode at an
+    output path with the compile daemon listening at a socket path.
+    Return False if the daemon is not running.
+    """
+    
+    result: CompileResult | None = compile_daemon_path(path, in_path)
+    
+    if result is None:
+        return False
+    
+    bytecode: bytes = result.bytecode
+    
+    if bytecode is None:
+        from .core import get_error_bytecode
+        
+        result.print_errors()
+        bytecode = get_error_bytecode()
+    
+    from .runtime import save_bytecode_path
+    
+    if not save_bytecode_path(out_path, bytecode):
+        print(f"Failed to build to '{out_path}'!")
+    
+    return True
+
+
+def get_daemon_stats(path: str) -> dict | None:
+    """
+    Get the statistics of the compile daemon listening at a socket path.
+    Return None if the daemon is not running.
+    """
+    
+    try:
+        with request(path, DaemonRequest.STATS) as sock:
+            return json.loads(recv_message(sock))
+    except (OSError, ValueError):
+        return None
+
+
+def serve_daemon(path: str) -> None:
+    """ Serve compile requests at a Unix socket path until interrupted. """
+    
+    Daemon(path).serve()
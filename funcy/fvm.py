@@ -1,6 +1,13 @@
 import sys
+import time
 
-from enum import Enum
+from array import array
+from collections.abc import Callable
+from enum import Enum, auto
+from typing import TextIO
+
+from .stats import FVMStats, StatsBlock
+from .trace import Trace
 
 class Opcode(Enum):
     """ An FVM bytecode opcode. """
@@ -41,8 +48,106 @@ class Opcode(Enum):
     PUT_CHR = 0x21
 
 
+class StopReason(Enum):
+    """ The reason that the FVM stopped executing. """
+    
+    NONE = auto()
+    """ FVM has not stopped. """
+    
+    HALT = auto()
+    """ FVM executed a halt opcode. """
+    
+    CRASH = auto()
+    """ FVM reached an illegal state. """
+    
+    LIMIT = auto()
+    """ FVM was stopped after reaching a step limit. """
+
+
+class CrashReason(Enum):
+    """ The reason that the FVM crashed. """
+    
+    NONE = auto()
+    """ FVM has not crashed. """
+    
+    ILLEGAL_OPCODE = auto()
+    """ FVM fetched an illegal opcode. """
+    
+    ILLEGAL_FETCH = auto()
+    """ FVM fetched from outside of program memory. """
+    
+    STACK_UNDERFLOW = auto()
+    """ FVM popped from a stack with too few values. """
+    
+    DIVIDE_BY_ZERO = auto()
+    """ FVM divided or took a modulo by zero. """
+    
+    ILLEGAL_DEREFERENCE = auto()
+    """ FVM dereferenced an address outside of program memory. """
+    
+    ILLEGAL_CHARACTER = auto()
+    """ FVM put a value that is not a character. """
+
+
+class HookEvent(Enum):
+    """ An event that calls FVM hooks. """
+    
+    INSTRUCTION = auto()
+    """ FVM is about to execute any instruction. """
+    
+    CALL = auto()
+    """ FVM is about to execute a call instruction. """
+    
+    RETURN = auto()
+    """ FVM is about to execute a return instruction. """
+
+
+class Instruction:
+    """ A decoded FVM instruction. """
+    
+    address: int
+    """ The instruction's address. """
+    
+    opcode: Opcode
+    """ The instruction's opcode. """
+    
+    operand: int = 0
+    """ The instruction's immediate operand. 0 if it has no operand. """
+    
+    size: int = 1
+    """ The instruction's size in bytes. """
+    
+    def __init__(self, address: int, opcode: Opcode) -> None:
+        """ Initialize the instruction's address and opcode. """
+        
+        self.address = address
+        self.opcode = opcode
+    
+    
+    def __str__(self) -> str:
+        """ Return the instruction's string. """
+        
+        if self.size > 1:
+            return f"0x{self.address:08x}: {self.opcode.name} {self.operand}"
+        
+        return f"0x{self.address:08x}: {self.opcode.name}"
+
+
+def predecode(bytecode: bytes) -> list[Opcode]:
+    """
+    Predecode the opcode at each address of flat FVM bytecode. Illegal
+    opcodes are predecoded as None.
+    """
+    
+    opcodes: dict[int, Opcode] = {opcode.value: opcode for opcode in Opcode}
+    return [opcodes.get(value) for value in bytecode]
+
+
 class FVM:
-    """ The Funcy Virtual Machine """
+    """
+    The Funcy Virtual Machine. Each FVM only uses its own state, so FVMs
+    may run concurrently in threads.
+    """
     
     HEADER: bytes = bytes([0x83, 0x46, 0x56, 0x4d, 0x0d, 0x0a, 0x1a, 0x0a])
     """ An FVM bytecode file's header. """
@@ -50,32 +155,324 @@ class FVM:
     FORMAT_VERSION: int = 2
     """ The FVM's format version. """
     
+    LINK_FORMAT_VERSION: int = 3
+    """
+    The FVM's format version for bytecode that is linked to a shared
+    library. A link table follows the code section.
+    """
+    
     LEGAL_OPCODES: set[int] = set(opcode.value for opcode in Opcode)
     """ The FVM's legal opcodes. """
     
-    ef: bool = False
+    ARG_PUSH: bytes = bytes([Opcode.PUSH_S32.value, 0x00, 0x00, 0x00, 0x00])
+    """ The entry point's push of a default argument for `main`. """
+    
+    OPERANDS: dict[Opcode, tuple[int, bool]] = {
+        Opcode.PUSH_U8: (1, False),
+        Opcode.PUSH_S8: (1, True),
+        Opcode.PUSH_U16: (2, False),
+        Opcode.PUSH_S16: (2, True),
+        Opcode.PUSH_U32: (4, False),
+        Opcode.PUSH_S32: (4, True),
+    }
+    """ Opcodes with immediate operands and their sizes and signedness. """
+    
+    BLOCK_ENDS: set[Opcode] = {
+        Opcode.HALT, Opcode.JUMP, Opcode.JUMP_NOT_ZERO, Opcode.JUMP_ZERO,
+        Opcode.CALL, Opcode.RETURN,
+    }
+    """ Opcodes that end straight-line blocks of instructions. """
+    
+    STACK_EFFECTS: dict[Opcode, int] = {
+        Opcode.HALT: -1,
+        Opcode.JUMP: -1,
+        Opcode.JUMP_NOT_ZERO: -2,
+        Opcode.JUMP_ZERO: -2,
+        Opcode.DROP: -1,
+        Opcode.DUPLICATE: 1,
+        Opcode.PUSH_U8: 1,
+        Opcode.PUSH_S8: 1,
+        Opcode.PUSH_U16: 1,
+        Opcode.PUSH_S16: 1,
+        Opcode.PUSH_U32: 1,
+        Opcode.PUSH_S32: 1,
+        Opcode.STORE_LOCAL: -1,
+        Opcode.BINARY_ADD: -1,
+        Opcode.BINARY_SUBTRACT: -1,
+        Opcode.BINARY_MULTIPLY: -1,
+        Opcode.BINARY_DIVIDE: -1,
+        Opcode.BINARY_MODULO: -1,
+        Opcode.BINARY_EQUALS: -1,
+        Opcode.BINARY_NOT_EQUALS: -1,
+        Opcode.BINARY_GREATER: -1,
+        Opcode.BINARY_GREATER_EQUALS: -1,
+        Opcode.BINARY_LESS: -1,
+        Opcode.BINARY_LESS_EQUALS: -1,
+        Opcode.BINARY_AND: -1,
+        Opcode.BINARY_OR: -1,
+    }
+    """
+    The changes in stack depth of opcodes that do not leave the stack's
+    depth unchanged. Calls leave the depth unchanged, and returns only
+    shrink the stack.
+    """
+    
+    ef: bool
     """ The FVM's execution flag. """
     
-    ec: int = 0
+    ec: int
     """ The FVM's exit code. """
     
+    sr: StopReason
+    """ The FVM's stop reason. """
+    
+    cr: CrashReason
+    """ The FVM's crash reason. """
+    
     pm: bytes
     """ The FVM's program memory. """
     
+    entry: int
+    """ The FVM's entry point address. """
+    
+    ops: list[Opcode]
+    """
+    The FVM's predecoded opcodes by address. Opcodes are decoded from
+    program memory on each step if the predecoded opcodes are None.
+    """
+    
     sm: list[int]
     """ The FVM's stack memory. """
     
-    ip: int = 0
+    ip: int
     """ The FVM's instruction pointer. """
     
-    fp: int = 0
+    fp: int
     """ The FVM's frame pointer. """
     
+    out: TextIO
+    """
+    The FVM's output stream. Standard output is used if the output
+    stream is None.
+    """
+    
+    ob: bytearray
+    """
+    The FVM's output buffer. Output is captured to the output buffer
+    instead of the output stream if the output buffer is not None.
+    """
+    
+    ol: list[str]
+    """
+    The FVM's pending output line. Output is written to the output
+    stream a line at a time if the pending output line is not None, and
+    a character at a time otherwise.
+    """
+    
+    oc: int
+    """ The FVM's output count in bytes. """
+    
+    trace: Trace
+    """
+    The FVM's trace of recently executed instructions. Instructions are
+    not traced if the trace is None.
+    """
+    
+    counters: array
+    """
+    The FVM's coverage counters by slot. Blocks are not counted if the
+    counters are None.
+    """
+    
+    slots: dict[int, int]
+    """ The FVM's coverage counter slots by block start address. """
+    
+    starts: bytearray
+    """ The FVM's flags for whether each address starts a block. """
+    
+    hooks: dict[HookEvent, list[Callable[["FVM", Instruction], bool]]]
+    """
+    The FVM's hooks by event. Hooks are called with the FVM and the
+    instruction that is about to be executed, and return whether to
+    pause execution.
+    """
+    
+    is_paused: bool
+    """ Whether a hook paused execution before the next instruction. """
+    
+    is_counting: bool
+    """
+    Whether calls, returns, characters, and peak depths are counted in
+    the FVM's stats while it is run.
+    """
+    
+    stats_blocks: list[StatsBlock]
+    """ The FVM's discovered stats blocks by slot. """
+    
+    stats_starts: dict[int, StatsBlock]
+    """ The FVM's discovered stats blocks by start address. """
+    
+    stats: FVMStats
+    """ The FVM's runtime counters since execution began. """
+    
     def __init__(self) -> None:
-        """ Initialize the FVM's memory. """
+        """
+        Initialize the FVM's registers, memory, output, and
+        instrumentation.
+        """
         
+        self.ef = False
+        self.ec = 0
+        self.sr = StopReason.NONE
+        self.cr = CrashReason.NONE
         self.pm = bytes([Opcode.PUSH_U8.value, 0x00, Opcode.HALT.value])
+        self.entry = 0
+        self.ops = None
         self.sm = []
+        self.ip = 0
+        self.fp = 0
+        self.out = None
+        self.ob = None
+        self.ol = None
+        self.oc = 0
+        self.trace = None
+        self.counters = None
+        self.slots = {}
+        self.starts = bytearray()
+        self.hooks = {event: [] for event in HookEvent}
+        self.is_paused = False
+        self.is_counting = False
+        self.stats_blocks = []
+        self.stats_starts = {}
+        self.stats = FVMStats()
+    
+    
+    def capture(self, size: int = 4096) -> None:
+        """
+        Capture output to a preallocated output buffer with an initial
+        size in bytes. The output buffer grows as needed.
+        """
+        
+        self.ob = bytearray(max(size, 1))
+        self.oc = 0
+    
+    
+    def buffer_lines(self) -> None:
+        """
+        Write output that is not captured to the output stream a line at
+        a time. FVMs that share an output stream across threads do not mix
+        their lines or contend for the stream on every character, but
+        partial lines are not written until they are finished or
+        execution stops.
+        """
+        
+        if self.ol is None:
+            self.ol = []
+    
+    
+    def enable_trace(self, size: int = 64) -> None:
+        """
+        Trace the last executed instructions in a ring buffer with a size
+        in entries. Instructions are traced while the FVM is run.
+        """
+        
+        self.trace = Trace(size)
+    
+    
+    def enable_stats(self) -> None:
+        """
+        Count calls, returns, characters, and peak stack and frame depths
+        in the FVM's stats while it is run. Instructions and wall time are
+        always counted. If execution has already begun, counting begins
+        from the next block.
+        """
+        
+        self.is_counting = True
+        self.stats.enable_counting(len(self.stats_blocks))
+    
+    
+    def add_hook(
+            self, event: HookEvent,
+            hook: Callable[["FVM", Instruction], bool]) -> None:
+        """
+        Add a hook to call on an event. The hook is called with the FVM
+        and the instruction that is about to be executed, and returns
+        whether to pause execution before the instruction.
+        """
+        
+        self.hooks[event].append(hook)
+    
+    
+    def remove_hook(
+            self, event: HookEvent,
+            hook: Callable[["FVM", Instruction], bool]) -> None:
+        """ Remove a hook from an event if it was added. """
+        
+        if hook in self.hooks[event]:
+            self.hooks[event].remove(hook)
+    
+    
+    def has_hooks(self) -> bool:
+        """ Return whether the FVM has any hooks. """
+        
+        for hooks in self.hooks.values():
+            if hooks:
+                return True
+        
+        return False
+    
+    
+    def decode(self, address: int) -> Instruction:
+        """
+        Decode the instruction at an address. Return None if the address
+        does not contain a legal instruction.
+        """
+        
+        if address < 0 or address >= len(self.pm):
+            return None
+        elif not self.pm[address] in self.LEGAL_OPCODES:
+            return None
+        
+        instruction: Instruction = Instruction(
+                address, Opcode(self.pm[address]))
+        
+        if instruction.opcode in self.OPERANDS:
+            size, is_signed = self.OPERANDS[instruction.opcode]
+            
+            if address + 1 + size > len(self.pm):
+                return None
+            
+            instruction.operand = int.from_bytes(
+                    self.pm[address + 1:address + 1 + size], "little",
+                    signed=is_signed)
+            instruction.size += size
+        
+        return instruction
+    
+    
+    def enable_coverage(self, addresses: list[int]) -> None:
+        """
+        Count executions of blocks from their start addresses in slot
+        order. Counts accumulate until coverage is enabled again.
+        """
+        
+        self.counters = array("Q", bytes(8 * len(addresses)))
+        self.slots = {}
+        self.starts = bytearray(max(addresses, default=-1) + 1)
+        
+        for slot, address in enumerate(addresses):
+            if address >= 0 and not address in self.slots:
+                self.slots[address] = slot
+                self.starts[address] = 1
+    
+    
+    def get_output(self) -> bytes:
+        """ Get the output captured to the output buffer as UTF-8. """
+        
+        if self.ob is None:
+            return bytes()
+        
+        return bytes(self.ob[:self.oc])
     
     
     def load(self, bytecode: bytes) -> bool:
@@ -85,9 +482,10 @@ class FVM:
             return False
         elif bytecode[0:8] != self.HEADER:
             return False
-        elif(
-                int.from_bytes(bytecode[8:12], "little", signed=False)
-                != self.FORMAT_VERSION):
+        
+        version: int = int.from_bytes(bytecode[8:12], "little", signed=False)
+        
+        if not version in (self.FORMAT_VERSION, self.LINK_FORMAT_VERSION):
             return False
         
         size: int = int.from_bytes(bytecode[12:16], "little", signed=False)
@@ -95,7 +493,48 @@ class FVM:
         if len(bytecode) < 16 + size:
             return False
         
-        return self.load_flat(bytecode[16:16 + size])
+        # Views of the code section avoid copying large bytecode files.
+        code: memoryview = memoryview(bytecode)[16:16 + size]
+        
+        if version == self.LINK_FORMAT_VERSION:
+            return self.load_linked(code, memoryview(bytecode)[16 + size:])
+        
+        return self.load_flat(code)
+    
+    
+    def load_linked(self, code: bytes, link_table: bytes) -> bool:
+        """
+        Load flat FVM code that is linked to a shared library by a link
+        table. The library's code is placed at address 0 and is shared
+        with every other FVM that loads the library.
+        """
+        
+        if self.ef:
+            return False
+        
+        from .library import (
+                Library, LinkedMemory, LinkTable, load_library_path)
+        
+        table: LinkTable = LinkTable()
+        
+        if not table.load(link_table):
+            return False
+        
+        library: Library = load_library_path(table.library)
+        
+        if library is None:
+            return False
+        
+        program: bytes = table.link(code, library)
+        
+        if program is None:
+            return False
+        
+        self.pm = LinkedMemory(library.code, program)
+        self.entry = len(library.code)
+        self.ops = None
+        self.clear_stats_blocks()
+        return True
     
     
     def load_flat(self, bytecode: bytes) -> bool:
@@ -105,40 +544,496 @@ class FVM:
             return False
         
         self.pm = bytecode
+        self.entry = 0
+        self.ops = None
+        self.clear_stats_blocks()
         return True
     
     
-    def begin(self) -> bool:
-        """ Begin execution. """
+    def load_decoded(
+            self, bytecode: bytes, ops: list[Opcode], entry: int = 0) -> bool:
+        """
+        Load flat FVM bytecode with its predecoded opcodes from
+        `predecode` and an optional entry point address.
+        """
+        
+        if self.ef or len(ops) != len(bytecode):
+            return False
+        
+        self.pm = bytecode
+        self.entry = entry
+        self.ops = ops
+        self.clear_stats_blocks()
+        return True
+    
+    
+    def clear_stats_blocks(self) -> None:
+        """ Clear the stats blocks discovered in loaded bytecode. """
+        
+        self.stats_blocks = []
+        self.stats_starts = {}
+    
+    
+    def get_args_address(self, count: int) -> int:
+        """
+        Get the address to begin execution from when passing a number of
+        arguments to `main`. Arguments replace the default arguments that
+        are pushed at the start of the entry point. Return -1 if the
+        program does not accept the number of arguments.
+        """
+        
+        size: int = len(self.ARG_PUSH)
+        start: int = self.entry
+        
+        for i in range(count):
+            address: int = start + i * size
+            
+            if self.pm[address:address + size] != self.ARG_PUSH:
+                return -1
+        
+        return start + count * size
+    
+    
+    def begin(self, args: list[int] = None) -> bool:
+        """ Begin execution with optional arguments for `main`. """
         
         if self.ef:
             return False
         
-        self.ip = 0
-        self.sm = []
+        address: int = self.entry
+        
+        if args:
+            address = self.get_args_address(len(args))
+            
+            if address < 0:
+                return False
+        
+        self.ip = address
+        self.sm = list(args) if args else []
         self.fp = 0
         self.ec = 0
+        self.sr = StopReason.NONE
+        self.cr = CrashReason.NONE
+        self.oc = 0
+        self.is_paused = False
+        self.stats = FVMStats()
+        
+        if self.is_counting:
+            self.stats.enable_counting(len(self.stats_blocks))
+        
+        if self.trace is not None:
+            self.trace.clear()
+        
         self.ef = True
         return True
     
     
+    def run(self, steps: int = -1) -> int:
+        """
+        Step the FVM until execution stops, an amount of steps has been
+        executed, or a hook pauses execution. Execution may be resumed by
+        running the FVM again. Return the amount of steps executed.
+        """
+        
+        start: float = time.perf_counter()
+        
+        # The loop is chosen once per run so that uninstrumented runs do
+        # not check for instrumentation on every step.
+        if(
+                self.trace is not None or self.counters is not None
+                or self.has_hooks()):
+            count: int = self.run_instrumented(steps)
+        elif self.is_counting:
+            count: int = self.run_counted(steps)
+        else:
+            count: int = 0
+            
+            while self.ef and count != steps:
+                self.step()
+                count += 1
+        
+        self.flush()
+        self.stats.steps += count
+        self.stats.time += time.perf_counter() - start
+        
+        if self.is_counting:
+            self.update_stats()
+        
+        return count
+    
+    
+    def run_counted(self, steps: int) -> int:
+        """
+        Step the FVM like `run` while counting executions of blocks for
+        the FVM's stats. Return the amount of steps executed.
+        """
+        
+        count: int = 0
+        stats: FVMStats = self.stats
+        counts: array = stats.blocks
+        starts: dict[int, StatsBlock] = self.stats_starts
+        
+        while self.ef and count != steps:
+            block: StatsBlock = starts.get(self.ip)
+            
+            if block is None:
+                block = self.get_stats_block(self.ip)
+            
+            depth: int = len(self.sm)
+            size: int = block.size
+            
+            if steps >= 0 and steps - count < size:
+                size = steps - count
+            
+            executed: int = 0
+            
+            while self.ef and executed != size:
+                self.step()
+                executed += 1
+            
+            count += executed
+            
+            # Complete blocks are counted inline because they are the
+            # common case.
+            if executed != block.size or self.cr != CrashReason.NONE:
+                self.count_block(block, executed, depth)
+                continue
+            
+            counts[block.slot] += 1
+            
+            if depth + block.rise > stats.peak_stack:
+                stats.peak_stack = depth + block.rise
+            
+            if block.calls:
+                stats.frames += 1
+                
+                if stats.frames > stats.peak_frames:
+                    stats.peak_frames = stats.frames
+            elif block.returns:
+                stats.frames -= 1
+        
+        return count
+    
+    
+    def get_stats_block(self, address: int) -> StatsBlock:
+        """
+        Discover the stats block that starts at an address and count its
+        static calls, returns, characters, and stack depth.
+        """
+        
+        start: int = address
+        ops: list[Opcode] = []
+        
+        while True:
+            instruction: Instruction = self.decode(address)
+            
+            if instruction is None:
+                # Illegal instructions crash, so they end blocks.
+                ops.append(None)
+                break
+            
+            ops.append(instruction.opcode)
+            
+            if instruction.opcode in self.BLOCK_ENDS:
+                break
+            
+            address += instruction.size
+        
+        block: StatsBlock = self.add_stats_block(ops)
+        self.stats_starts[start] = block
+        return block
+    
+    
+    def add_stats_block(self, ops: list[Opcode]) -> StatsBlock:
+        """
+        Add a stats block of opcodes with a new counter slot and count
+        its static calls, returns, characters, and stack depth.
+        """
+        
+        block: StatsBlock = StatsBlock(len(self.stats_blocks), ops)
+        depth: int = 0
+        
+        for op in ops:
+            if op == Opcode.CALL:
+                block.calls += 1
+            elif op == Opcode.RETURN:
+                block.returns += 1
+            elif op == Opcode.PUT_CHR:
+                block.chars += 1
+            
+            depth += self.STACK_EFFECTS.get(op, 0)
+            block.rise = max(block.rise, depth)
+        
+        self.stats_blocks.append(block)
+        
+        if self.stats.blocks is not None:
+            self.stats.blocks.append(0)
+        
+        return block
+    
+    
+    def count_block(
+            self, block: StatsBlock, executed: int, depth: int) -> None:
+        """
+        Count an execution of a stats block with the number of its
+        instructions that were executed and its entry stack depth. The
+        last executed instruction is not counted if it crashed the FVM.
+        Interrupted executions are counted as executions of a prefix of
+        the block.
+        """
+        
+        stats: FVMStats = self.stats
+        
+        if self.cr != CrashReason.NONE:
+            executed -= 1
+        
+        if executed != block.size:
+            if not executed in block.prefixes:
+                block.prefixes[executed] = self.add_stats_block(
+                        block.ops[:executed])
+            
+            block = block.prefixes[executed]
+        
+        stats.blocks[block.slot] += 1
+        stats.peak_stack = max(stats.peak_stack, depth + block.rise)
+        
+        if block.calls:
+            stats.frames += 1
+            stats.peak_frames = max(stats.peak_frames, stats.frames)
+        elif block.returns:
+            stats.frames -= 1
+    
+    
+    def update_stats(self) -> None:
+        """
+        Derive the calls, returns, and characters in the FVM's stats from
+        the number of executions of each stats block.
+        """
+        
+        stats: FVMStats = self.stats
+        stats.calls = 0
+        stats.returns = 0
+        stats.chars = 0
+        
+        for block, count in zip(self.stats_blocks, stats.blocks):
+            if count:
+                stats.calls += block.calls * count
+                stats.returns += block.returns * count
+                stats.chars += block.chars * count
+    
+    
+    def run_instrumented(self, steps: int) -> int:
+        """
+        Step the FVM like `run` while tracing instructions, counting
+        blocks, and calling hooks. Return the amount of steps executed.
+        """
+        
+        # Instrumentation is inlined because it runs for every instruction.
+        count: int = 0
+        trace: Trace = self.trace
+        entries: array = None
+        end: int = 0
+        index: int = 0
+        
+        if trace is not None:
+            entries = trace.entries
+            end = len(entries)
+            index = trace.get_index()
+        
+        counters: array = self.counters
+        starts: bytearray = self.starts
+        size: int = len(starts)
+        instruction_hooks: list[Callable[[FVM, Instruction], bool]] = (
+                self.hooks[HookEvent.INSTRUCTION])
+        call_hooks: list[Callable[[FVM, Instruction], bool]] = (
+                self.hooks[HookEvent.CALL])
+        return_hooks: list[Callable[[FVM, Instruction], bool]] = (
+                self.hooks[HookEvent.RETURN])
+        is_hooked: bool = self.has_hooks()
+        is_counting: bool = self.is_counting
+        block: StatsBlock = None
+        executed: int = 0
+        depth: int = 0
+        
+        while self.ef and count != steps:
+            ip: int = self.ip
+            
+            if is_hooked:
+                if not self.is_paused and self.call_hooks(
+                        ip, instruction_hooks, call_hooks, return_hooks):
+                    self.is_paused = True
+                    break
+                
+                # Resuming executes the instruction that was paused on.
+                self.is_paused = False
+            
+            if entries is not None:
+                entries[index] = ip
+                entries[index + 1] = (
+                        self.pm[ip] if 0 <= ip < len(self.pm) else -1)
+                
+                try:
+                    entries[index + 2] = self.sm[-1] if self.sm else 0
+                except OverflowError:
+                    entries[index + 2] = trace.wrap(self.sm[-1])
+                
+                index += Trace.ENTRY_SIZE
+                
+                if index == end:
+                    index = 0
+            
+            if 0 <= ip < size and starts[ip]:
+                counters[self.slots[ip]] += 1
+            
+            if is_counting and block is None:
+                block = self.stats_starts.get(ip)
+                
+                if block is None:
+                    block = self.get_stats_block(ip)
+                
+                executed = 0
+                depth = len(self.sm)
+            
+            self.step()
+            count += 1
+            
+            if block is not None:
+                executed += 1
+                
+                if executed == block.size or not self.ef:
+                    self.count_block(block, executed, depth)
+                    block = None
+        
+        # Blocks that were interrupted by a step limit or a hook are
+        # counted as prefixes, and execution resumes in a new block.
+        if block is not None:
+            self.count_block(block, executed, depth)
+        
+        if trace is not None:
+            trace.count += count
+        
+        return count
+    
+    
+    def call_hooks(
+            self, address: int,
+            instruction_hooks: list[Callable[["FVM", Instruction], bool]],
+            call_hooks: list[Callable[["FVM", Instruction], bool]],
+            return_hooks: list[Callable[["FVM", Instruction], bool]]
+            ) -> bool:
+        """
+        Call the hooks for the instruction at an address and return
+        whether any hook paused execution.
+        """
+        
+        opcode_value: int = -1
+        
+        if 0 <= address < len(self.pm):
+            opcode_value = self.pm[address]
+        
+        if(
+                not instruction_hooks
+                and not (call_hooks and opcode_value == Opcode.CALL.value)
+                and not (return_hooks
+                        and opcode_value == Opcode.RETURN.value)):
+            return False
+        
+        instruction: Instruction = self.decode(address)
+        
+        if instruction is None:
+            return False
+        
+        is_paused: bool = False
+        
+        for hook in instruction_hooks:
+            is_paused = bool(hook(self, instruction)) or is_paused
+        
+        if instruction.opcode == Opcode.CALL:
+            for hook in call_hooks:
+                is_paused = bool(hook(self, instruction)) or is_paused
+        elif instruction.opcode == Opcode.RETURN:
+            for hook in return_hooks:
+                is_paused = bool(hook(self, instruction)) or is_paused
+        
+        return is_paused
+    
+    
+    def get_frames(self) -> list[tuple[int, int]]:
+        """
+        Get the frame chain as pairs of frame pointers and return
+        addresses from the innermost frame to the outermost frame.
+        """
+        
+        frames: list[tuple[int, int]] = []
+        fp: int = self.fp
+        
+        while fp >= 0 and fp + 1 < len(self.sm):
+            frames.append((fp, self.sm[fp + 1]))
+            
+            if self.sm[fp] >= fp:
+                break
+            
+            fp = self.sm[fp]
+        
+        return frames
+    
+    
+    def get_crash_report(self) -> str:
+        """
+        Get a report of the FVM's crash reason, frame chain, and traced
+        instructions. Return an empty string if the FVM did not crash.
+        """
+        
+        if self.sr != StopReason.CRASH:
+            return ""
+        
+        lines: list[str] = [f"FVM crashed: {self.cr.name}"]
+        
+        for i, (fp, return_ip) in enumerate(self.get_frames()):
+            lines.append(f"  Frame {i}: fp {fp}, returns to 0x{return_ip:08x}")
+        
+        if self.trace is not None:
+            entries: list[tuple[int, int, int]] = self.trace.get_entries()
+            lines.append(f"  Last {len(entries)} instructions:")
+            
+            for ip, opcode_value, tos in entries:
+                if opcode_value in self.LEGAL_OPCODES:
+                    name: str = Opcode(opcode_value).name
+                else:
+                    name: str = f"<0x{opcode_value & 0xff:02x}>"
+                
+                lines.append(f"    0x{ip:08x}: {name} (top {tos})")
+        
+        return "\n".join(lines)
+    
+    
     def step(self) -> None:
         """ Step the FVM. """
         
         if not self.ef or not self.validate_fetch(1):
             return
         
-        opcode_value: int = self.fetch_int(1, False)
-        
-        if not opcode_value in self.LEGAL_OPCODES:
-            self.crash()
-            return
-        
-        opcode: Opcode = Opcode(opcode_value)
+        if self.ops is None:
+            opcode_value: int = self.fetch_int(1, False)
+            
+            if not opcode_value in self.LEGAL_OPCODES:
+                self.crash(CrashReason.ILLEGAL_OPCODE)
+                return
+            
+            opcode: Opcode = Opcode(opcode_value)
+        else:
+            opcode: Opcode = self.ops[self.ip]
+            self.ip += 1
+            
+            if opcode is None:
+                self.crash(CrashReason.ILLEGAL_OPCODE)
+                return
         
         if opcode == Opcode.HALT and self.validate_pop(1):
             self.ec = self.sm.pop()
+            self.sr = StopReason.HALT
             self.ef = False
+            self.flush()
         elif opcode == Opcode.NO_OPERATION:
             pass
         elif opcode == Opcode.JUMP and self.validate_pop(1):
@@ -202,7 +1097,7 @@ class FVM:
             address: int = self.sm.pop()
             
             if address < 0 or address >= len(self.pm):
-                self.crash()
+                self.crash(CrashReason.ILLEGAL_DEREFERENCE)
                 return
             
             self.sm.append(self.pm[address])
@@ -226,7 +1121,7 @@ class FVM:
             y: int = self.sm.pop()
             
             if y == 0:
-                self.crash()
+                self.crash(CrashReason.DIVIDE_BY_ZERO)
                 return
             
             x: int = self.sm.pop()
@@ -235,7 +1130,7 @@ class FVM:
             y: int = self.sm.pop()
             
             if y == 0:
-                self.crash()
+                self.crash(CrashReason.DIVIDE_BY_ZERO)
                 return
             
             x: int = self.sm.pop()
@@ -273,23 +1168,86 @@ class FVM:
             x: int = self.sm.pop()
             self.sm.append(int(x != 0 or y != 0))
         elif opcode == Opcode.PUT_CHR and self.validate_pop(1):
-            sys.stdout.write(chr(self.sm[-1]))
+            if self.ob is not None:
+                self.put_chr(self.sm[-1])
+            else:
+                self.write_chr(self.sm[-1])
+        elif self.ef:
+            # Failed validations have already crashed the FVM.
+            self.crash(CrashReason.ILLEGAL_OPCODE)
+    
+    
+    def put_chr(self, value: int) -> None:
+        """ Put a character to the output buffer. """
+        
+        if self.oc + 4 > len(self.ob):
+            self.ob.extend(bytes(len(self.ob) + 4))
+        
+        if value >= 0 and value < 0x80:
+            self.ob[self.oc] = value
+            self.oc += 1
+        elif value >= 0 and value <= 0x10ffff:
+            encoded: bytes = chr(value).encode("utf-8", "surrogatepass")
+            self.ob[self.oc:self.oc + len(encoded)] = encoded
+            self.oc += len(encoded)
         else:
-            self.crash()
+            self.crash(CrashReason.ILLEGAL_CHARACTER)
+    
+    
+    def write_chr(self, value: int) -> None:
+        """
+        Write a character to the output stream. If output is line
+        buffered, the character is pending until its line is finished or
+        execution stops.
+        """
+        
+        if self.ol is None:
+            (sys.stdout if self.out is None else self.out).write(chr(value))
+            return
+        
+        self.ol.append(chr(value))
+        
+        if value == 0x0a:
+            self.flush()
+    
+    
+    def flush(self) -> None:
+        """
+        Write the pending output line to the output stream if output is
+        line buffered. Unbuffered output is already written.
+        """
+        
+        if not self.ol:
+            return
+        
+        (sys.stdout if self.out is None else self.out).write("".join(self.ol))
+        self.ol.clear()
+    
+    
+    def stop(self) -> None:
+        """ Stop the FVM after reaching a step limit. """
+        
+        self.ec = 1
+        self.sr = StopReason.LIMIT
+        self.ef = False
+        self.flush()
     
     
-    def crash(self) -> None:
-        """ Crash the FVM. """
+    def crash(self, reason: CrashReason) -> None:
+        """ Crash the FVM with a crash reason. """
         
         self.ec = 1
+        self.sr = StopReason.CRASH
+        self.cr = reason
         self.ef = False
+        self.flush()
     
     
     def validate_fetch(self, amount: int) -> bool:
         """ Validate whether a fetch operation can be performed. """
         
         if self.ip < 0 or self.ip + amount > len(self.pm):
-            self.crash()
+            self.crash(CrashReason.ILLEGAL_FETCH)
             return False
         
         return True
@@ -299,7 +1257,7 @@ class FVM:
         """ Validate whether a pop operation can be performed. """
         
         if len(self.sm) < amount:
-            self.crash()
+            self.crash(CrashReason.STACK_UNDERFLOW)
             return False
         
         return True
@@ -1,4 +1,7 @@
+import locale
+
 from ..fvm import FVM
+from ..runtime import map_file
 
 class InputWrapper:
     """ Wraps code input to the Funcy SDK. """
@@ -15,8 +18,11 @@ class InputWrapper:
     source: str
     """ The input's source code. """
     
-    bytecode: bytes
-    """ The input's bytecode. """
+    bytecode: bytes | memoryview
+    """
+    The input's bytecode. Bytecode read from a path is a view of the
+    memory-mapped file.
+    """
     
     def __init__(self) -> None:
         """ Initialize the input wrapper's data. """
@@ -49,18 +55,23 @@ class InputWrapper:
         
         try:
             with open(path, "rb") as file:
-                self.bytecode = file.read(len(FVM.HEADER))
-                
-                if self.bytecode == FVM.HEADER:
-                    self.is_binary = True
-                    self.bytecode = self.bytecode + file.read()
-            
-            if self.is_binary:
-                return
-            
-            self.bytecode = bytes([])
-            
-            with open(path, "rt") as file:
-                self.source = file.read()
+                data: bytes | memoryview = map_file(file)
         except IOError:
             self.is_ok = False
+            return
+        
+        if data[:len(FVM.HEADER)] == FVM.HEADER:
+            self.is_binary = True
+            self.bytecode = data
+        else:
+            self.source = self.decode(data)
+    
+    
+    def decode(self, data: bytes | memoryview) -> str:
+        """
+        Decode source code from a file's data like a file read in text
+        mode.
+        """
+        
+        source: str = str(data, locale.getpreferredencoding(False))
+        return source.replace("\r\n", "\n").replace("\r", "\n")
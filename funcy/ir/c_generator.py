@@ -0,0 +1,235 @@
+from collections.abc import Callable
+
+from .code import Code, Op, OpType
+from .serializer import Serializer
+
+class CGenerator:
+    """
+    Generates a C translation unit from IR code. The translation unit
+    exports a `funcy_run` function that executes the program with the
+    same semantics as the FVM.
+    """
+    
+    STATUS_OK: int = 0
+    """ The status returned when the program finished. """
+    
+    STATUS_BAIL: int = 1
+    """
+    The status returned when the program reached a state that can only
+    be reproduced exactly by the FVM.
+    """
+    
+    STATUS_OUTPUT_FULL: int = 2
+    """ The status returned when the output buffer was exhausted. """
+    
+    BINARY_OPERATORS: dict[OpType, str] = {
+        OpType.BINARY_EQUALS: "==",
+        OpType.BINARY_NOT_EQUALS: "!=",
+        OpType.BINARY_GREATER: ">",
+        OpType.BINARY_GREATER_EQUALS: ">=",
+        OpType.BINARY_LESS: "<",
+        OpType.BINARY_LESS_EQUALS: "<=",
+    }
+    """ Comparison IR operation types and their C operators. """
+    
+    OVERFLOW_BUILTINS: dict[OpType, str] = {
+        OpType.BINARY_ADD: "__builtin_add_overflow",
+        OpType.BINARY_SUBTRACT: "__builtin_sub_overflow",
+        OpType.BINARY_MULTIPLY: "__builtin_mul_overflow",
+    }
+    """ Arithmetic IR operation types and their checked C builtins. """
+    
+    PRELUDE: str = """#include <stdint.h>
+#include <string.h>
+
+#define NEED(n) if (sp < (n)) goto crash
+#define ROOM(n) if (sp + (n) > sm_size) goto bail
+#define PUSH(v) do { ROOM(1); sm[sp++] = (v); } while (0)
+
+"""
+    """ The translation unit's includes and macros. """
+    
+    serializer: Serializer
+    """ The C generator's serializer for resolving addresses. """
+    
+    lines: list[str]
+    """ The C generator's generated lines. """
+    
+    def __init__(self) -> None:
+        """ Initialize the C generator's serializer and lines. """
+        
+        self.serializer = Serializer()
+        self.lines = []
+    
+    
+    def generate(self, code: Code) -> str:
+        """ Generate a C translation unit from IR code. """
+        
+        self.lines = []
+        labels: dict[str, int] = self.serializer.get_labels(code)
+        strings: list[str] = self.serializer.get_string_table(code)
+        strings_pos: int = labels.get(".end", 0)
+        pm: bytes = self.serializer.serialize(code, True)
+        
+        self.emit(f"#define PM_SIZE {len(pm)}")
+        self.emit(f"static const unsigned char pm[{max(len(pm), 1)}] = {{")
+        
+        for i in range(0, len(pm), 16):
+            self.emit("    " + ", ".join(str(b) for b in pm[i:i + 16]) + ",")
+        
+        if not pm:
+            self.emit("    0,")
+        
+        self.emit("};\n")
+        self.emit(
+                "int funcy_run(int64_t *sm, int64_t sm_size, uint32_t *ob, "
+                "int64_t ob_size, int64_t *oc_out, int64_t *ec_out) {")
+        self.emit("    int64_t sp = 0, fp = 0, ip = 0, oc = 0, x, y;")
+        self.emit("    *oc_out = 0;")
+        self.emit("    *ec_out = 0;")
+        self.emit("dispatch:")
+        self.emit("    switch (ip) {")
+        
+        addresses: set[int] = set()
+        address: int = 0
+        
+        for block in code.blocks:
+            self.emit_address(labels[block.label], addresses)
+            
+            for op in block.ops:
+                address += self.serializer.get_op_size(op)
+                
+                for line in self.get_op_lines(
+                        op, address, labels, strings, strings_pos):
+                    self.emit(f"        {line}")
+                
+                if op.type == OpType.CALL_PARAMC:
+                    self.emit_address(address, addresses)
+        
+        # Falling into or jumping to the string table executes data.
+        self.emit_address(strings_pos, addresses)
+        self.emit("        goto bail;")
+        self.emit("    default:")
+        self.emit("        goto bail;")
+        self.emit("    }")
+        self.emit("crash:")
+        self.emit("    *oc_out = oc;")
+        self.emit("    *ec_out = 1;")
+        self.emit(f"    return {self.STATUS_OK};")
+        self.emit("bail:")
+        self.emit(f"    return {self.STATUS_BAIL};")
+        self.emit("}")
+        return self.PRELUDE + "\n".join(self.lines) + "\n"
+    
+    
+    def emit(self, line: str) -> None:
+        """ Emit a line of C source code. """
+        
+        self.lines.append(line)
+    
+    
+    def emit_address(self, address: int, addresses: set[int]) -> None:
+        """ Emit a dispatch target for an address if it is new. """
+        
+        if address in addresses:
+            return
+        
+        addresses.add(address)
+        self.emit(f"    case {address}: L{address}:")
+    
+    
+    def get_op_lines(
+            self, op: Op, next_address: int, labels: dict[str, int],
+            strings: list[str], strings_pos: int) -> list[str]:
+        """ Get the lines of C source code for an IR operation. """
+        
+        lines: list[str] = []
+        emit: Callable[[str], None] = lines.append
+        
+        if op.type == OpType.HALT:
+            emit("NEED(1); *ec_out = sm[--sp]; *oc_out = oc;")
+            emit(f"return {self.STATUS_OK};")
+        elif op.type == OpType.JUMP_LABEL:
+            emit(f"goto L{labels.get(op.str_value, 0)};")
+        elif op.type == OpType.JUMP_NOT_ZERO_LABEL:
+            emit(f"NEED(1); if (sm[--sp] != 0) "
+                    f"goto L{labels.get(op.str_value, 0)};")
+        elif op.type == OpType.JUMP_ZERO_LABEL:
+            emit(f"NEED(1); if (sm[--sp] == 0) "
+                    f"goto L{labels.get(op.str_value, 0)};")
+        elif op.type == OpType.CALL_PARAMC:
+            count: int = op.int_value
+            emit(f"NEED(1); x = sm[--sp]; NEED({count}); ROOM(2);")
+            emit(f"memmove(&sm[sp - {count} + 2], &sm[sp - {count}], "
+                    f"{count} * sizeof(int64_t));")
+            emit(f"sm[sp - {count}] = fp; fp = sp - {count};")
+            emit(f"sm[fp + 1] = {next_address}; sp += 2;")
+            emit("ip = x; goto dispatch;")
+        elif op.type == OpType.RETURN:
+            emit("NEED(1); if (fp + 1 >= sp) goto bail;")
+            emit("ip = sm[fp + 1]; x = sm[fp]; sm[fp] = sm[sp - 1];")
+            emit("sp = fp + 1; fp = x; goto dispatch;")
+        elif op.type == OpType.DROP:
+            emit("NEED(1); sp--;")
+        elif op.type == OpType.DUPLICATE:
+            emit("NEED(1); PUSH(sm[sp - 1]);")
+        elif op.type == OpType.PUSH_LABEL:
+            emit(f"PUSH({labels.get(op.str_value, 0)});")
+        elif op.type == OpType.PUSH_INT:
+            emit(f"PUSH({op.int_value}LL);")
+        elif op.type == OpType.PUSH_CHR:
+            emit(f"PUSH({ord(op.str_value) % 0xff});")
+        elif op.type == OpType.PUSH_STR:
+            offset: int = self.serializer.get_string_offset(
+                    op.str_value, strings)
+            emit(f"PUSH({offset + strings_pos});")
+        elif op.type == OpType.LOAD_LOCAL_OFFSET:
+            emit(f"x = fp + {op.int_value + Serializer.FRAME_HEADER_SIZE};")
+            emit("if (x >= sp) goto bail; PUSH(sm[x]);")
+        elif op.type == OpType.STORE_LOCAL_OFFSET:
+            emit(f"x = fp + {op.int_value + Serializer.FRAME_HEADER_SIZE};")
+            emit("NEED(1); if (x >= sp) goto bail; sm[x] = sm[sp - 1];")
+        elif op.type == OpType.UNARY_DEREFERENCE:
+            emit("NEED(1); x = sm[sp - 1];")
+            emit("if (x < 0 || x >= PM_SIZE) goto crash;")
+            emit("sm[sp - 1] = pm[x];")
+        elif op.type == OpType.UNARY_NEGATE:
+            emit("NEED(1); if (sm[sp - 1] == INT64_MIN) goto bail;")
+            emit("sm[sp - 1] = -sm[sp - 1];")
+        elif op.type == OpType.UNARY_NOT:
+            emit("NEED(1); sm[sp - 1] = sm[sp - 1] == 0;")
+        elif op.type in self.OVERFLOW_BUILTINS:
+            builtin: str = self.OVERFLOW_BUILTINS[op.type]
+            emit("NEED(2); y = sm[--sp];")
+            emit(f"if ({builtin}(sm[sp - 1], y, &sm[sp - 1])) goto bail;")
+        elif op.type == OpType.BINARY_DIVIDE:
+            emit("NEED(2); y = sm[--sp]; x = sm[sp - 1];")
+            emit("if (y == 0) goto crash;")
+            emit("if (y == -1 && x == INT64_MIN) goto bail;")
+            emit("sm[sp - 1] = x / y - (x % y != 0 && (x < 0) != (y < 0));")
+        elif op.type == OpType.BINARY_MODULO:
+            emit("NEED(2); y = sm[--sp]; x = sm[sp - 1];")
+            emit("if (y == 0) goto crash;")
+            emit("x = y == -1 ? 0 : x % y;")
+            emit("sm[sp - 1] = x != 0 && (x < 0) != (y < 0) ? x + y : x;")
+        elif op.type in self.BINARY_OPERATORS:
+            operator: str = self.BINARY_OPERATORS[op.type]
+            emit("NEED(2); y = sm[--sp];")
+            emit(f"sm[sp - 1] = sm[sp - 1] {operator} y;")
+        elif op.type == OpType.BINARY_AND:
+            emit("NEED(2); y = sm[--sp];")
+            emit("sm[sp - 1] = sm[sp - 1] != 0 && y != 0;")
+        elif op.type == OpType.BINARY_OR:
+            emit("NEED(2); y = sm[--sp];")
+            emit("sm[sp - 1] = sm[sp - 1] != 0 || y != 0;")
+        elif op.type == OpType.PUT_CHR:
+            emit("NEED(1); x = sm[sp - 1];")
+            emit("if (x < 0 || x > 0x10ffff || (x >= 0xd800 && x < 0xe000)) "
+                    "goto bail;")
+            emit(f"if (oc >= ob_size) return {self.STATUS_OUTPUT_FULL};")
+            emit("ob[oc++] = (uint32_t)x;")
+        else:
+            # The serializer emits a no operation for unimplemented types.
+            emit(";")
+        
+        return lines
@@ -1,5 +1,7 @@
 from enum import Enum, auto
 
+from ..parser.position import Span
+
 class OpType(Enum):
     """ The type of an IR operation. """
     
@@ -109,6 +111,9 @@ class Op:
     str_value: str = ""
     """ The IR operation's string value. """
     
+    span: Span = None
+    """ The IR operation's source span. None if it has no source. """
+    
     def __init__(self, type: OpType) -> None:
         """ Initialize the IR operation's type. """
         
@@ -139,6 +144,9 @@ class Block:
     ops: list[Op]
     """ The IR block's IR operations. """
     
+    span: Span = None
+    """ The IR block's source span. None if it has no source. """
+    
     def __init__(self, label: str) -> None:
         """ Initialize the IR block's label and IR operations. """
         
@@ -161,9 +169,18 @@ class Code:
     blocks: list[Block]
     """ The IR code's blocks. """
     
+    labels: dict[str, Block]
+    """ The IR code's labeled blocks by label. """
+    
     current: Block
     """ The IR code's current block. """
     
+    span: Span
+    """
+    The IR code's current source span. Appended IR operations are given
+    the current span.
+    """
+    
     def __init__(self) -> None:
         """ Initialize the IR code. """
         
@@ -175,7 +192,9 @@ class Code:
         
         self.current = Block(".main")
         self.blocks = [self.current]
+        self.labels = {self.current.label: self.current}
         self.label_count = 0
+        self.span = None
     
     
     def get_label(self) -> str:
@@ -187,6 +206,13 @@ class Code:
     def set_label(self, label: str) -> None:
         """ Set the current label. """
         
+        block: Block = self.labels.get(label)
+        
+        if block is not None:
+            self.current = block
+            return
+        
+        # Blocks may also be added to the IR code's blocks directly.
         for block in self.blocks:
             if block.label == label:
                 self.current = block
@@ -199,22 +225,24 @@ class Code:
         self.label_count += 1
         label: str = f".L{self.label_count}_{name}"
         self.blocks.append(Block(label))
+        self.blocks[-1].span = self.span
+        self.labels[label] = self.blocks[-1]
         return label
     
     
     def insert_label(self, name: str) -> str:
         """ Insert a label after the current label. """
         
-        index: int = len(self.blocks)
-        
-        for i in range(index):
-            if self.current == self.blocks[i]:
-                index = i + 1
-                break
+        try:
+            index: int = self.blocks.index(self.current) + 1
+        except ValueError:
+            index: int = len(self.blocks)
         
         self.label_count += 1
         label: str = f".L{self.label_count}_{name}"
         self.blocks.insert(index, Block(label))
+        self.blocks[index].span = self.span
+        self.labels[label] = self.blocks[index]
         return label
     
     
@@ -407,6 +435,7 @@ class Code:
     def append_op(self, op: Op) -> None:
         """ Append an IR operation. """
         
+        op.span = self.span
         self.current.ops.append(op)
     
     
@@ -1,6 +1,8 @@
+import json
 import struct
 
 from ..fvm import FVM, Opcode
+from ..library import Library
 from .code import Code, Op, OpType
 
 class Serializer:
@@ -209,6 +211,77 @@ class Serializer:
         return bytes(header + bytecode)
     
     
+    def get_link_offsets(
+            self, code: Code) -> tuple[list[int], dict[str, list[int]]]:
+        """
+        Get the offsets of the addresses in serialized IR code that must
+        be relocated, and the offsets of the addresses of each imported
+        function by name. Imported functions are labeled '@name'.
+        """
+        
+        offset: int = 0
+        relocations: list[int] = []
+        imports: dict[str, list[int]] = {}
+        
+        for block in code.blocks:
+            for op in block.ops:
+                # Addresses are pushed as the operand of the first opcode.
+                if op.type == OpType.PUSH_STR:
+                    relocations.append(offset + 1)
+                elif not op.type in (
+                        OpType.JUMP_LABEL, OpType.JUMP_NOT_ZERO_LABEL,
+                        OpType.JUMP_ZERO_LABEL, OpType.PUSH_LABEL):
+                    pass
+                elif op.str_value.startswith("@"):
+                    imports.setdefault(op.str_value[1:], []).append(offset + 1)
+                else:
+                    relocations.append(offset + 1)
+                
+                offset += self.get_op_size(op)
+        
+        return relocations, imports
+    
+    
+    def serialize_linked(
+            self, code: Code, library_path: str, library: Library) -> bytes:
+        """
+        Serialize FVM bytecode that is linked to a shared library from IR
+        code, the library's path, and the library.
+        """
+        
+        bytecode: bytearray = bytearray(self.serialize(code, False))
+        relocations, imports = self.get_link_offsets(code)
+        table: dict = {
+            "library": library_path,
+            "relocations": relocations,
+            "imports": {
+                name: [library.symbols[name].arity, offsets]
+                for name, offsets in imports.items()},
+        }
+        struct.pack_into("<I", bytecode, 8, FVM.LINK_FORMAT_VERSION)
+        return bytes(bytecode) + json.dumps(table).encode()
+    
+    
+    def serialize_library(self, code: Code, table: dict) -> bytes:
+        """
+        Serialize a shared library from IR code and its module table. The
+        labels of the table's exported functions are replaced with their
+        addresses.
+        """
+        
+        labels: dict[str, int] = self.get_labels(code)
+        bytecode: bytes = self.serialize(code, True)
+        table = dict(table)
+        table["exports"] = [
+            [name, module, is_intrinsic, labels.get(label, 0), arity]
+            for name, module, is_intrinsic, label, arity in table["exports"]]
+        header: bytearray = bytearray([0] * 16)
+        struct.pack_into("8s", header, 0, Library.HEADER)
+        struct.pack_into("<I", header, 8, Library.FORMAT_VERSION)
+        struct.pack_into("<I", header, 12, len(bytecode))
+        return bytes(header + bytecode) + json.dumps(table).encode()
+    
+    
     def append_int_struct(
             self, bytecode: bytearray, format: str, size: int,
             value: int) -> None:
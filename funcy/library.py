@@ -0,0 +1,314 @@
+import json
+import os
+import threading
+
+from collections.abc import Iterator
+
+from .runtime import map_file
+
+class LibraryExport:
+    """ A function exported by a shared library. """
+    
+    name: str
+    """ The library export's function name. """
+    
+    is_intrinsic: bool
+    """ Whether the library export is an intrinsic function. """
+    
+    address: int
+    """ The library export's function address. """
+    
+    arity: int
+    """ The library export's number of parameters. """
+    
+    def __init__(
+            self, name: str, is_intrinsic: bool, address: int,
+            arity: int) -> None:
+        """
+        Initialize the library export's name, intrinsic flag, address,
+        and number of parameters.
+        """
+        
+        self.name = name
+        self.is_intrinsic = is_intrinsic
+        self.address = address
+        self.arity = arity
+
+
+class Library:
+    """
+    A shared library of precompiled FVM bytecode functions. A library's
+    code section is always placed at address 0 of program memory, so it
+    can be mapped read-only and shared by every process that runs a
+    program linked to it.
+    """
+    
+    HEADER: bytes = bytes([0x83, 0x46, 0x59, 0x4c, 0x0d, 0x0a, 0x1a, 0x0a])
+    """ A shared library file's header. """
+    
+    FORMAT_VERSION: int = 1
+    """ The shared library format version. """
+    
+    code: bytes | memoryview
+    """ The library's code section. """
+    
+    modules: list[str]
+    """ The library's module keys in resolution order. """
+    
+    deps: dict[str, list[str]]
+    """
+    The library's module keys by module key of every module that each
+    module depends on, including itself, in resolution order.
+    """
+    
+    exports: dict[str, list[LibraryExport]]
+    """ The library's exported functions by module key. """
+    
+    symbols: dict[str, LibraryExport]
+    """ The library's exported functions by name. """
+    
+    def __init__(self) -> None:
+        """ Initialize the library's code, modules, and exports. """
+        
+        self.code = bytes()
+        self.modules = []
+        self.deps = {}
+        self.exports = {}
+        self.symbols = {}
+    
+    
+    def load(self, data: bytes | memoryview) -> bool:
+        """ Load a shared library file's data. """
+        
+        if len(data) < 16 or data[0:8] != self.HEADER:
+            return False
+        elif(
+                int.from_bytes(data[8:12], "little", signed=False)
+                != self.FORMAT_VERSION):
+            return False
+        
+        size: int = int.from_bytes(data[12:16], "little", signed=False)
+        
+        if len(data) < 16 + size:
+            return False
+        
+        try:
+            table: dict = json.loads(bytes(data[16 + size:]))
+            self.modules = [str(key) for key in table["modules"]]
+            self.deps = {
+                str(key): [str(dep) for dep in deps]
+                for key, deps in table["deps"].items()}
+            self.exports = {key: [] for key in self.modules}
+            self.symbols = {}
+            
+            for name, module, is_intrinsic, address, arity in table[
+                    "exports"]:
+                export: LibraryExport = LibraryExport(
+                        str(name), bool(is_intrinsic), int(address),
+                        int(arity))
+                self.exports[str(module)].append(export)
+                self.symbols[export.name] = export
+        except (ValueError, KeyError, TypeError):
+            return False
+        
+        # A view of the code section shares the library's mapped pages.
+        self.code = memoryview(data)[16:16 + size]
+        return True
+
+
+class LinkTable:
+    """
+    The link table of FVM bytecode that calls functions in a shared
+    library. The program's code is placed after the library's code, so
+    its own addresses are relocated by the library's code size.
+    """
+    
+    library: str
+    """ The path to the link table's shared library. """
+    
+    relocations: list[int]
+    """ The offsets of the program's own addresses. """
+    
+    imports: dict[str, tuple[int, list[int]]]
+    """
+    The number of parameters and the offsets of the addresses of each
+    imported function by name.
+    """
+    
+    def __init__(self) -> None:
+        """ Initialize the link table's library, relocations, and imports. """
+        
+        self.library = ""
+        self.relocations = []
+        self.imports = {}
+    
+    
+    def load(self, data: bytes | memoryview) -> bool:
+        """ Load a link table's data. """
+        
+        try:
+            table: dict = json.loads(bytes(data))
+            self.library = str(table["library"])
+            self.relocations = [int(offset) for offset in table["relocations"]]
+            self.imports = {
+                str(name): (int(arity), [int(offset) for offset in offsets])
+                for name, (arity, offsets) in table["imports"].items()}
+        except (ValueError, KeyError, TypeError):
+            return False
+        
+        return True
+    
+    
+    def link(self, code: bytes | memoryview, library: Library) -> bytes:
+        """
+        Link FVM code to a shared library by relocating its addresses and
+        resolving its imported functions. Return None if the code could
+        not be linked.
+        """
+        
+        linked: bytearray = bytearray(code)
+        base: int = len(library.code)
+        
+        for name, (arity, offsets) in self.imports.items():
+            export: LibraryExport = library.symbols.get(name)
+            
+            if export is None or export.arity != arity:
+                return None
+            
+            for offset in offsets:
+                if offset < 0 or offset + 4 > len(linked):
+                    return None
+                
+                linked[offset:offset + 4] = export.address.to_bytes(
+                        4, "little", signed=False)
+        
+        for offset in self.relocations:
+            if offset < 0 or offset + 4 > len(linked):
+                return None
+            
+            address: int = int.from_bytes(
+                    linked[offset:offset + 4], "little", signed=False)
+            linked[offset:offset + 4] = (address + base).to_bytes(
+                    4, "little", signed=False)
+        
+        return bytes(linked)
+
+
+class LinkedMemory:
+    """
+    Program memory made of a shared library's code followed by a linked
+    program's code. The library's code is not copied.
+    """
+    
+    library: bytes | memoryview
+    """ The linked memory's library code. """
+    
+    program: bytes
+    """ The linked memory's program code. """
+    
+    base: int
+    """ The address of the linked memory's program code. """
+    
+    size: int
+    """ The linked memory's size in bytes. """
+    
+    def __init__(self, library: bytes | memoryview, program: bytes) -> None:
+        """ Initialize the linked memory's library and program code. """
+        
+        self.library = library
+        self.program = program
+        self.base = len(library)
+        self.size = self.base + len(program)
+    
+    
+    def __len__(self) -> int:
+        """ Return the linked memory's size in bytes. """
+        
+        return self.size
+    
+    
+    def __getitem__(self, key: int | slice) -> int | bytes:
+        """ Return a byte or a slice of bytes from the linked memory. """
+        
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.size)
+            
+            if step != 1:
+                return bytes(self)[key]
+            elif start >= self.base:
+                return self.program[start - self.base:stop - self.base]
+            elif stop <= self.base:
+                return bytes(self.library[start:stop])
+            
+            return bytes(self.library[start:]) + self.program[
+                    :stop - self.base]
+        
+        if key < 0:
+            key += self.size
+        
+        if key < self.base:
+            return self.library[key]
+        
+        return self.program[key - self.base]
+    
+    
+    def __iter__(self) -> Iterator[int]:
+        """ Iterate over the linked memory's bytes. """
+        
+        yield from self.library
+        yield from self.program
+    
+    
+    def __bytes__(self) -> bytes:
+        """ Return a copy of the linked memory's bytes. """
+        
+        return bytes(self.library) + self.program
+
+
+LIBRARIES: dict[tuple[str, int, int, int], Library] = {}
+"""
+The shared libraries that have been loaded by path, inode, modification
+time, and size.
+"""
+
+LIBRARIES_LOCK: threading.Lock = threading.Lock()
+""" The lock held while a shared library is loaded. """
+
+def load_library_path(path: str) -> Library:
+    """
+    Load a shared library from a path. Each library is only mapped once
+    per process, even if it is loaded by several threads at once, and is
+    loaded again if its file is replaced. Return None if the library
+    could not be loaded.
+    """
+    
+    try:
+        with open(path, "rb") as file:
+            stat: os.stat_result = os.fstat(file.fileno())
+            key: tuple[str, int, int, int] = (
+                    path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            library: Library = LIBRARIES.get(key)
+            
+            if library is not None:
+                return library
+            
+            with LIBRARIES_LOCK:
+                if key in LIBRARIES:
+                    return LIBRARIES[key]
+                
+                data: bytes | memoryview = map_file(file)
+                library = Library()
+                
+                if not library.load(data):
+                    return None
+                
+                # Programs that are running keep the libraries they
+                # loaded, so replaced libraries are no longer cached.
+                for old_key in list(LIBRARIES):
+                    if old_key[0] == path:
+                        del LIBRARIES[old_key]
+                
+                LIBRARIES[key] = library
+                return library
+    except IOError:
+        return None
@@ -0,0 +1,638 @@
+import hashlib
+import json
+import os
+import threading
+
+from .ast.nodes import InclNode, ModuleNode, RootNode
+from .ast.scope import Symbol, SymbolAccess
+from .ast.visitor import Visitor
+from .io.input_wrapper import InputWrapper
+from .io.log import Log
+from .ir.code import Block, Code, Op, OpType
+from .ir.optimizer import (
+        is_op_label, optimize_code, optimizer_eliminate_unreachable_ops)
+from .library import Library, load_library_path
+from .parser.resolver import Resolver, ResolverModule, ResolverModuleState
+from .version import get_compiler_version
+
+class ObjectFile:
+    """
+    A module compiled to unlinked IR code. Object files export their
+    module's functions and import functions from the modules that were
+    resolved before them by labels of the form '@name'.
+    """
+    
+    name: str
+    """ The object file's module name. """
+    
+    digest: str
+    """ The object file's module source code hash. """
+    
+    env: str
+    """
+    The object file's environment hash of the compiler version and the
+    functions that the module was compiled with.
+    """
+    
+    uses: list[str]
+    """
+    The names of the functions that the object file's environment hash
+    depends on. These are the module's used imported functions and its
+    exported functions.
+    """
+    
+    includes: list[str]
+    """ The object file's module include paths. """
+    
+    exports: list[Symbol]
+    """ The object file's exported function symbols. """
+    
+    code: Code
+    """ The object file's unlinked IR code. """
+    
+    is_library: bool
+    """
+    Whether the object file's module is provided by a shared library.
+    Library object files have no code, and their exported functions are
+    imported when the program is loaded.
+    """
+    
+    def __init__(self) -> None:
+        """ Initialize the object file's data. """
+        
+        self.name = ""
+        self.digest = ""
+        self.env = ""
+        self.uses = []
+        self.includes = []
+        self.exports = []
+        self.code = Code()
+        self.is_library = False
+    
+    
+    def save(self, path: str) -> bool:
+        """ Save the object file to a path. """
+        
+        data: dict = {
+            "name": self.name,
+            "digest": self.digest,
+            "env": self.env,
+            "uses": self.uses,
+            "includes": self.includes,
+            "exports": [
+                [symbol.name, symbol.access.name, symbol.int_value,
+                symbol.str_value] for symbol in self.exports],
+            "blocks": [
+                [block.label, [
+                    [op.type.name, op.int_value, op.str_value]
+                    for op in block.ops]] for block in self.code.blocks],
+        }
+        temp_path: str = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        
+        try:
+            with open(temp_path, "wt") as file:
+                json.dump(data, file)
+            
+            os.replace(temp_path, path)
+        except IOError:
+            return False
+        
+        return True
+    
+    
+    def load(self, path: str) -> bool:
+        """ Load the object file from a path. """
+        
+        try:
+            with open(path, "rt") as file:
+                data: dict = json.load(file)
+            
+            self.name = str(data["name"])
+            self.digest = str(data["digest"])
+            self.env = str(data["env"])
+            self.uses = [str(name) for name in data["uses"]]
+            self.includes = [str(include) for include in data["includes"]]
+            self.exports = []
+            
+            for name, access, arity, label in data["exports"]:
+                symbol: Symbol = Symbol(str(name), SymbolAccess[access])
+                symbol.int_value = int(arity)
+                symbol.str_value = str(label)
+                self.exports.append(symbol)
+            
+            self.code = Code()
+            self.code.blocks = []
+            
+            for label, ops in data["blocks"]:
+                self.code.blocks.append(Block(str(label)))
+                
+                for op_type, int_value, str_value in ops:
+                    op: Op = Op(OpType[op_type])
+                    op.int_value = int(int_value)
+                    op.str_value = str(str_value)
+                    self.code.blocks[-1].ops.append(op)
+        except (IOError, ValueError, KeyError, TypeError):
+            return False
+        
+        return True
+
+
+class ObjectResolver(Resolver):
+    """
+    Resolves a Funcy program's dependencies from source code, object
+    files, and a shared library. Modules with an up to date object file
+    or that are provided by the library are not parsed.
+    """
+    
+    object_dir: str
+    """
+    The object resolver's object file directory path. Object files are
+    not used if the path is empty.
+    """
+    
+    library: Library
+    """
+    The object resolver's shared library. No modules are provided by a
+    library if the library is None.
+    """
+    
+    objects: dict[str, ObjectFile]
+    """ The object resolver's up to date object files by module name. """
+    
+    digests: dict[str, str]
+    """ The object resolver's module source code hashes. """
+    
+    order: list[str]
+    """ The object resolver's module names in resolution order. """
+    
+    def __init__(
+            self, log: Log, object_dir: str, library: Library = None) -> None:
+        """
+        Initialize the object resolver's log, object file directory path,
+        shared library, object files, and module order.
+        """
+        
+        super().__init__(log)
+        self.object_dir = object_dir
+        self.library = library
+        self.objects = {}
+        self.digests = {}
+        self.order = []
+    
+    
+    def get_object_path(self, name: str) -> str:
+        """ Get the path to a module's object file from its name. """
+        
+        digest: str = hashlib.sha256(name.encode()).hexdigest()[:16]
+        return os.path.join(
+                self.object_dir, f"{os.path.basename(name)}.{digest}.fyo")
+    
+    
+    def get_module_key(self, name: str) -> str:
+        """
+        Get a module's key in a shared library from its name. Intrinsic
+        modules are keyed by name, and other modules by absolute path.
+        """
+        
+        if name.startswith("intrinsics:"):
+            return name
+        
+        return self.get_module_path(name)
+    
+    
+    def is_library_module(self, name: str) -> bool:
+        """ Return whether a module is provided by the shared library. """
+        
+        return(
+                self.library is not None
+                and self.get_module_key(name) in self.library.deps)
+    
+    
+    def declare_module(self, name: str) -> None:
+        """
+        Declare a module from its name if it is not available. Modules
+        with an up to date object file are declared from the object file
+        instead of being parsed, and modules provided by the shared
+        library are declared without including any modules.
+        """
+        
+        if name in self.modules:
+            return
+        elif self.is_library_module(name):
+            # The library already includes the module's dependencies.
+            self.modules[name] = ResolverModule()
+            self.modules[name].state = ResolverModuleState.PARSED
+            return
+        elif name.startswith("intrinsics:") or not self.object_dir:
+            super().declare_module(name)
+            return
+        
+        wrapper: InputWrapper = InputWrapper()
+        wrapper.from_path(self.get_module_path(name))
+        
+        if not wrapper.is_ok or wrapper.is_binary:
+            super().declare_module(name)
+            return
+        
+        module: ResolverModule = ResolverModule()
+        self.modules[name] = module
+        self.digests[name] = hashlib.sha256(
+                wrapper.source.encode(errors="surrogatepass")).hexdigest()
+        object_file: ObjectFile = ObjectFile()
+        
+        if(
+                object_file.load(self.get_object_path(name))
+                and object_file.name == name
+                and object_file.digest == self.digests[name]):
+            self.objects[name] = object_file
+            
+            # Only the includes are needed to resolve the module.
+            for include in object_file.includes:
+                module.ast.incls.append(InclNode(include))
+        else:
+            module.ast = self.parse_module(name, wrapper.source)
+        
+        module.state = ResolverModuleState.PARSED
+    
+    
+    def visit_module(self, name: str, root_node: RootNode) -> None:
+        """ Visit and resolve a module from its name. """
+        
+        super().visit_module(name, root_node)
+        
+        if(
+                self.get_module_state(name) == ResolverModuleState.RESOLVED
+                and not name in self.order):
+            self.order.append(name)
+    
+    
+    def get_source_ast(self, name: str) -> ModuleNode:
+        """
+        Get a module's parsed AST from its name. Modules that were
+        declared from an object file are parsed.
+        """
+        
+        if not name in self.objects:
+            return self.get_module_ast(name)
+        
+        wrapper: InputWrapper = InputWrapper()
+        wrapper.from_path(self.get_module_path(name))
+        
+        if not wrapper.is_ok or wrapper.is_binary:
+            self.log.log(f"Failed to load module '{name}'!")
+            return ModuleNode()
+        
+        return self.parse_module(name, wrapper.source)
+
+
+class Linker:
+    """ Links object files to IR code. """
+    
+    log: Log
+    """ The linker's log. """
+    
+    def __init__(self, log: Log) -> None:
+        """ Initialize the linker's log. """
+        
+        self.log = log
+    
+    
+    def link(self, object_files: list[ObjectFile]) -> Code:
+        """
+        Link object files to optimized IR code. The program's entry point
+        calls the exported `main` function. Functions exported by library
+        object files are left as labels of the form '@name' to be
+        imported when the program is loaded.
+        """
+        
+        code: Code = Code()
+        labels: dict[str, str] = self.link_blocks(object_files, code)
+        code.set_label(".main")
+        main_symbol: Symbol = None
+        
+        for object_file in object_files:
+            for symbol in object_file.exports:
+                if symbol.name == "main":
+                    main_symbol = symbol
+        
+        if main_symbol is not None and main_symbol.access == SymbolAccess.FUNC:
+            # Default arguments. These must be the first operations of the
+            # entry point so that 'FVM.begin' can replace them.
+            for i in range(main_symbol.int_value):
+                code.make_push_int(0)
+            
+            code.make_push_label(labels["@main"])
+            code.make_call_paramc(main_symbol.int_value)
+        else:
+            code.make_push_int(0)
+        
+        code.make_halt()
+        optimize_code(code)
+        return code
+    
+    
+    def link_library(self, object_files: list[ObjectFile]) -> Code:
+        """
+        Link object files to IR code for a shared library. Every function
+        is kept, and the library has no entry point. Exported functions
+        are labeled '@name'.
+        """
+        
+        code: Code = Code()
+        code.blocks = []
+        labels: dict[str, str] = self.link_blocks(object_files, code)
+        
+        for name, label in labels.items():
+            for block in code.blocks:
+                if block.label == label:
+                    code.blocks.insert(code.blocks.index(block), Block(name))
+                    break
+        
+        optimizer_eliminate_unreachable_ops(code)
+        return code
+    
+    
+    def link_blocks(
+            self, object_files: list[ObjectFile],
+            code: Code) -> dict[str, str]:
+        """
+        Link the blocks of object files into IR code and return the
+        linked labels of their exported functions by '@name' label.
+        """
+        
+        labels: dict[str, str] = {}
+        
+        for index, object_file in enumerate(object_files):
+            for symbol in object_file.exports:
+                if object_file.is_library:
+                    labels[f"@{symbol.name}"] = f"@{symbol.name}"
+                else:
+                    labels[f"@{symbol.name}"] = f".M{index}{symbol.str_value}"
+        
+        for index, object_file in enumerate(object_files):
+            for block in object_file.code.blocks:
+                if block.label == ".main":
+                    continue # Modules have no code in their entry point.
+                
+                code.blocks.append(Block(f".M{index}{block.label}"))
+                
+                for op in block.ops:
+                    linked_op: Op = Op(op.type)
+                    linked_op.int_value = op.int_value
+                    linked_op.str_value = op.str_value
+                    
+                    if not is_op_label(op):
+                        pass
+                    elif op.str_value.startswith("@"):
+                        if not op.str_value in labels:
+                            self.log.log(
+                                    "Unresolved function "
+                                    f"'{op.str_value[1:]}' in module "
+                                    f"'{object_file.name}'!")
+                        
+                        linked_op.str_value = labels.get(op.str_value, "")
+                    else:
+                        linked_op.str_value = f".M{index}{op.str_value}"
+                    
+                    code.blocks[-1].ops.append(linked_op)
+        
+        return labels
+
+
+class ObjectBuilder:
+    """
+    Builds a Funcy program by compiling each module to an object file and
+    linking the object files. Object files may be kept in a directory, so
+    that only modules that have changed, or that import functions that
+    have changed, are compiled again. Modules that are provided by a
+    shared library are not compiled.
+    """
+    
+    log: Log
+    """ The object builder's log. """
+    
+    object_dir: str
+    """
+    The object builder's object file directory path. Object files are
+    not kept if the path is empty.
+    """
+    
+    library: Library
+    """
+    The object builder's shared library. Programs are not linked to a
+    library if the library is None.
+    """
+    
+    compiled: list[str]
+    """ The names of the modules compiled by the last build. """
+    
+    def __init__(
+            self, log: Log, object_dir: str = "",
+            library: Library = None) -> None:
+        """
+        Initialize the object builder's log, object file directory path,
+        shared library, and compiled modules.
+        """
+        
+        self.log = log
+        self.object_dir = object_dir
+        self.library = library
+        self.compiled = []
+    
+    
+    def get_env(self, imports: dict[str, Symbol], uses: list[str]) -> str:
+        """
+        Get an environment hash from the compiler version, the available
+        imported function symbols by name, and the names of the functions
+        that the hash depends on.
+        """
+        
+        hasher = hashlib.sha256(get_compiler_version().encode())
+        
+        for name in sorted(uses):
+            symbol: Symbol = imports.get(name)
+            
+            if symbol is None:
+                hasher.update(f"\0{name}\0UNDEFINED".encode())
+            else:
+                hasher.update(
+                        f"\0{name}\0{symbol.access.name}"
+                        f"\0{symbol.int_value}".encode())
+        
+        return hasher.hexdigest()
+    
+    
+    def build(self, path: str) -> Code:
+        """
+        Build IR code from a Funcy program's main module path. Return
+        None if the program could not be built.
+        """
+        
+        resolver: ObjectResolver = ObjectResolver(
+                self.log, self.object_dir, self.library)
+        object_files: list[ObjectFile] = self.build_objects(resolver, path)
+        
+        if object_files is None:
+            return None
+        
+        code: Code = Linker(self.log).link(object_files)
+        
+        if self.log.has_records():
+            return None
+        
+        return code
+    
+    
+    def build_library(self, path: str) -> tuple[Code, dict]:
+        """
+        Build IR code and a module table for a shared library from the
+        path of a module that includes the library's modules. Return None
+        if the library could not be built.
+        """
+        
+        resolver: ObjectResolver = ObjectResolver(self.log, self.object_dir)
+        object_files: list[ObjectFile] = self.build_objects(resolver, path)
+        
+        if object_files is None:
+            return None
+        
+        code: Code = Linker(self.log).link_library(object_files)
+        
+        if self.log.has_records():
+            return None
+        
+        keys: list[str] = [
+            resolver.get_module_key(object_file.name)
+            for object_file in object_files]
+        deps: dict[str, list[str]] = {}
+        exports: list[list] = []
+        
+        for object_file, key in zip(object_files, keys):
+            dep_keys: set[str] = {key}
+            
+            for child in resolver.get_module_children(object_file.name):
+                dep_keys.update(deps[resolver.get_module_key(child)])
+            
+            deps[key] = [dep_key for dep_key in keys if dep_key in dep_keys]
+            
+            for symbol in object_file.exports:
+                exports.append([
+                        symbol.name, key,
+                        symbol.access == SymbolAccess.INTRINSIC,
+                        f"@{symbol.name}", symbol.int_value])
+        
+        return code, {"modules": keys, "deps": deps, "exports": exports}
+    
+    
+    def build_objects(
+            self, resolver: ObjectResolver, path: str) -> list[ObjectFile]:
+        """
+        Build object files in resolution order from an object resolver
+        and a Funcy program's main module path. Return None if the object
+        files could not be built.
+        """
+        
+        self.compiled = []
+        
+        if self.object_dir:
+            try:
+                os.makedirs(self.object_dir, exist_ok=True)
+            except OSError:
+                self.log.log(
+                        "Failed to create object directory "
+                        f"'{self.object_dir}'!")
+                return None
+        
+        resolver.resolve_path(path)
+        
+        if self.log.has_records():
+            return None
+        
+        imports: dict[str, Symbol] = {}
+        object_files: list[ObjectFile] = []
+        library_keys: set[str] = set()
+        
+        for name in resolver.order:
+            if resolver.is_library_module(name):
+                for key in self.library.deps[resolver.get_module_key(name)]:
+                    if key in library_keys:
+                        continue
+                    
+                    library_keys.add(key)
+                    object_files.append(self.get_library_object(key))
+                    
+                    for symbol in object_files[-1].exports:
+                        imports[symbol.name] = symbol
+                
+                continue
+            
+            object_file: ObjectFile = resolver.objects.get(name)
+            
+            if(
+                    object_file is None
+                    or object_file.env != self.get_env(
+                            imports, object_file.uses)):
+                object_file = self.compile_module(resolver, name, imports)
+            
+            object_files.append(object_file)
+            
+            for symbol in object_file.exports:
+                imports[symbol.name] = symbol
+        
+        if self.log.has_records():
+            return None
+        
+        return object_files
+    
+    
+    def get_library_object(self, key: str) -> ObjectFile:
+        """
+        Get an object file for a module that is provided by the shared
+        library from its key.
+        """
+        
+        object_file: ObjectFile = ObjectFile()
+        object_file.name = key
+        object_file.is_library = True
+        
+        for export in self.library.exports.get(key, []):
+            symbol: Symbol = Symbol(export.name, (
+                    SymbolAccess.INTRINSIC if export.is_intrinsic
+                    else SymbolAccess.FUNC))
+            symbol.int_value = export.arity
+            symbol.str_value = f"@{export.name}"
+            object_file.exports.append(symbol)
+        
+        return object_file
+    
+    
+    def compile_module(
+            self, resolver: ObjectResolver, name: str,
+            imports: dict[str, Symbol]) -> ObjectFile:
+        """
+        Compile a module to an object file from its name and the
+        available imported function symbols by name. The object file is
+        saved if the module compiled without errors.
+        """
+        
+        ast: ModuleNode = resolver.get_source_ast(name)
+        record_count: int = len(self.log.records)
+        object_file: ObjectFile = ObjectFile()
+        object_file.name = name
+        object_file.digest = resolver.digests.get(name, "")
+        object_file.includes = [include.name for include in ast.incls]
+        object_file.code, object_file.exports, uses = Visitor(
+                self.log).generate_module(ast, list(imports.values()))
+        object_file.uses = sorted(
+                set(uses) | {symbol.name for symbol in object_file.exports})
+        object_file.env = self.get_env(imports, object_file.uses)
+        
+        if name.startswith("intrinsics:"):
+            return object_file # Intrinsics are always compiled.
+        
+        self.compiled.append(name)
+        
+        if self.object_dir and len(self.log.records) == record_count:
+            object_file.save(resolver.get_object_path(name))
+        
+        return object_file
@@ -0,0 +1,332 @@
+import sys
+import tracemalloc
+
+from collections.abc import Callable
+
+from .ast import visitor
+from .ast.visitor import Visitor
+from .core import compile_path
+from .fvm import FVM
+from .io.input_wrapper import InputWrapper
+from .ir.serializer import Serializer
+from .parser.module_cache import ModuleCache
+from .parser.parser import Parser
+from .parser.resolver import Resolver
+from .runtime import save_bytecode_path
+
+class StageMemory:
+    """ The memory usage of a profiled stage. """
+    
+    name: str
+    """ The stage's name. """
+    
+    calls: int = 0
+    """ The stage's number of outermost calls. """
+    
+    peak: int = 0
+    """ The stage's peak allocated bytes above its starting usage. """
+    
+    retained: int = 0
+    """ The stage's total bytes still allocated after it returned. """
+    
+    sites: dict[str, int]
+    """ The stage's retained bytes by allocation site. """
+    
+    def __init__(self, name: str) -> None:
+        """ Initialize the stage's name and allocation sites. """
+        
+        self.name = name
+        self.sites = {}
+
+
+class ProfileFrame:
+    """ A stage that is being profiled. """
+    
+    stage: StageMemory
+    """ The frame's stage. """
+    
+    start: int
+    """ The frame's allocated bytes when the stage began. """
+    
+    peak: int
+    """ The frame's peak allocated bytes. """
+    
+    snapshot: tracemalloc.Snapshot
+    """
+    The frame's snapshot when the stage began. None if the stage is
+    nested in itself.
+    """
+    
+    def __init__(
+            self, stage: StageMemory, start: int,
+            snapshot: tracemalloc.Snapshot) -> None:
+        """ Initialize the frame's stage, allocations, and snapshot. """
+        
+        self.stage = stage
+        self.start = start
+        self.peak = start
+        self.snapshot = snapshot
+
+
+class MemoryProfiler:
+    """
+    Profiles the memory usage of compiler stages and FVM runs with
+    `tracemalloc`. Stages are measured by temporarily wrapping the
+    methods that implement them, so stages include their nested stages.
+    """
+    
+    SITE_COUNT: int = 5
+    """ The number of top allocation sites to report for each stage. """
+    
+    stages: dict[str, StageMemory]
+    """ The profiler's stages in the order they were first entered. """
+    
+    frames: list[ProfileFrame]
+    """ The profiler's stack of stages that are being profiled. """
+    
+    patches: list[tuple[object, str, object]]
+    """ The profiler's wrapped attributes and their original values. """
+    
+    peak_stack: int = 0
+    """ The peak operand stack depth of profiled FVM runs in words. """
+    
+    is_tracing: bool = False
+    """ Whether the profiler started tracing allocations. """
+    
+    def __init__(self) -> None:
+        """ Initialize the profiler's stages, frames, and patches. """
+        
+        self.stages = {}
+        self.frames = []
+        self.patches = []
+    
+    
+    def install(self) -> None:
+        """ Start tracing allocations and wrap the compiler's stages. """
+        
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.is_tracing = True
+        
+        self.patch(Parser, "parse_module", "Parsing")
+        self.patch(Resolver, "visit_module", "Resolution")
+        self.patch(Visitor, "generate", "Code generation")
+        self.patch(visitor, "optimize_code", "Optimization")
+        self.patch(Serializer, "serialize", "Serialization")
+        
+        # Use an empty module cache so that every module is parsed.
+        self.patches.append((Resolver, "module_cache", Resolver.module_cache))
+        Resolver.module_cache = ModuleCache()
+    
+    
+    def uninstall(self) -> None:
+        """ Unwrap the compiler's stages and stop tracing allocations. """
+        
+        while self.patches:
+            owner, name, value = self.patches.pop()
+            setattr(owner, name, value)
+        
+        if self.is_tracing:
+            tracemalloc.stop()
+            self.is_tracing = False
+    
+    
+    def patch(self, owner: object, name: str, stage: str) -> None:
+        """ Wrap an attribute to profile it as a stage. """
+        
+        function: Callable = getattr(owner, name)
+        self.patches.append((owner, name, function))
+        setattr(owner, name, self.wrap(function, stage))
+    
+    
+    def wrap(self, function: Callable, stage: str) -> Callable:
+        """ Wrap a function to profile it as a stage. """
+        
+        profiler: MemoryProfiler = self
+        
+        def wrapper(*args, **kwargs):
+            profiler.enter(stage)
+            
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.exit()
+        
+        return wrapper
+    
+    
+    def enter(self, name: str) -> None:
+        """ Begin profiling a stage. """
+        
+        if not name in self.stages:
+            self.stages[name] = StageMemory(name)
+        
+        stage: StageMemory = self.stages[name]
+        snapshot: tracemalloc.Snapshot = None
+        
+        if not any(frame.stage is stage for frame in self.frames):
+            snapshot = self.take_snapshot()
+        
+        current, peak = tracemalloc.get_traced_memory()
+        
+        # Resetting the peak for this stage must not lose the peak of the
+        # stages that contain it.
+        for frame in self.frames:
+            frame.peak = max(frame.peak, peak)
+        
+        tracemalloc.reset_peak()
+        self.frames.append(ProfileFrame(stage, current, snapshot))
+    
+    
+    def exit(self) -> None:
+        """ End profiling the innermost stage. """
+        
+        current, peak = tracemalloc.get_traced_memory()
+        frame: ProfileFrame = self.frames.pop()
+        frame.peak = max(frame.peak, peak)
+        
+        for parent in self.frames:
+            parent.peak = max(parent.peak, peak)
+        
+        if frame.snapshot is None:
+            return
+        
+        stage: StageMemory = frame.stage
+        stage.calls += 1
+        stage.peak = max(stage.peak, frame.peak - frame.start)
+        stage.retained += current - frame.start
+        snapshot: tracemalloc.Snapshot = self.take_snapshot()
+        
+        for diff in snapshot.compare_to(frame.snapshot, "lineno"):
+            if diff.size_diff <= 0:
+                continue
+            
+            site: str = str(diff.traceback[0])
+            stage.sites[site] = stage.sites.get(site, 0) + diff.size_diff
+    
+    
+    def take_snapshot(self) -> tracemalloc.Snapshot:
+        """ Take a snapshot of allocations made outside of profiling. """
+        
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+    
+    
+    def run_fvm(self, fvm: FVM) -> None:
+        """ Run an FVM as a profiled stage. """
+        
+        self.enter("Execution")
+        fvm.enable_stats()
+        
+        try:
+            fvm.run()
+        finally:
+            self.exit()
+        
+        self.peak_stack = max(self.peak_stack, fvm.stats.peak_stack)
+    
+    
+    def get_report(self) -> str:
+        """ Get a report of the profiled stages. """
+        
+        lines: list[str] = [
+            "Memory profile:",
+            f"  {'Stage':<16} {'Calls':>6} {'Peak':>12} {'Retained':>12}",
+        ]
+        
+        for stage in self.stages.values():
+            lines.append(
+                    f"  {stage.name:<16} {stage.calls:>6} "
+                    f"{format_size(stage.peak):>12} "
+                    f"{format_size(stage.retained):>12}")
+        
+        if "Execution" in self.stages:
+            lines.append(
+                    f"  Peak operand stack depth: {self.peak_stack} words")
+        
+        lines.append("Top allocation sites:")
+        
+        for stage in self.stages.values():
+            lines.append(f"  {stage.name}:")
+            
+            sites: list[tuple[str, int]] = sorted(
+                    stage.sites.items(), key=lambda site: site[1],
+                    reverse=True)
+            
+            for site, size in sites[:self.SITE_COUNT]:
+                lines.append(f"    {format_size(size):>12} {site}")
+        
+        return "\n".join(lines)
+
+
+def format_size(size: int) -> str:
+    """ Format a size in bytes. """
+    
+    if abs(size) < 1024:
+        return f"{size} B"
+    elif abs(size) < 1024 * 1024:
+        return f"{size / 1024:.1f} KiB"
+    
+    return f"{size / (1024 * 1024):.1f} MiB"
+
+
+def profile_build(in_path: str, out_path: str) -> None:
+    """
+    Build Funcy source code from an input path to FVM bytecode at an
+    output path and report its memory profile to standard error.
+    """
+    
+    profiler: MemoryProfiler = MemoryProfiler()
+    profiler.install()
+    
+    try:
+        bytecode: bytes = compile_path(in_path)
+    finally:
+        profiler.uninstall()
+    
+    if not save_bytecode_path(out_path, bytecode):
+        print(f"Failed to build to '{out_path}'!")
+    
+    print(profiler.get_report(), file=sys.stderr)
+
+
+def profile_exec_path(path: str) -> int:
+    """
+    Execute Funcy source code or FVM bytecode from a path, report its
+    memory profile to standard error, and return an exit code.
+    """
+    
+    input_wrapper: InputWrapper = InputWrapper()
+    input_wrapper.from_path(path)
+    
+    if not input_wrapper.is_ok:
+        print(f"Failed to execute from '{path}'!")
+        return 1
+    
+    profiler: MemoryProfiler = MemoryProfiler()
+    profiler.install()
+    
+    try:
+        if input_wrapper.is_binary:
+            bytecode: bytes = input_wrapper.bytecode
+        else:
+            bytecode: bytes = compile_path(path)
+        
+        fvm: FVM = FVM()
+        
+        if not fvm.load(bytecode):
+            print("Failed to load bytecode!")
+            return 1
+        
+        if not fvm.begin():
+            print("Failed to start FVM!")
+            return 1
+        
+        profiler.run_fvm(fvm)
+    finally:
+        profiler.uninstall()
+    
+    print(profiler.get_report(), file=sys.stderr)
+    return fvm.ec
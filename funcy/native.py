@@ -0,0 +1,130 @@
+import ctypes
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import threading
+
+from .ir.c_generator import CGenerator
+from .ir.code import Code
+from .user_cache import get_cache_dir, make_private_dir
+
+class NativeProgram:
+    """
+    An IR code program compiled to a shared library with the system C
+    compiler.
+    """
+    
+    STACK_SIZE: int = 1 << 20
+    """ The native program's stack size in words. """
+    
+    OUTPUT_SIZE: int = 1 << 16
+    """ The native program's initial output buffer size in characters. """
+    
+    MAX_OUTPUT_SIZE: int = 1 << 26
+    """ The native program's maximum output buffer size in characters. """
+    
+    library: ctypes.CDLL
+    """ The native program's shared library. """
+    
+    def __init__(self, path: str) -> None:
+        """ Initialize the native program's shared library. """
+        
+        self.library = ctypes.CDLL(path)
+        self.library.funcy_run.restype = ctypes.c_int
+        self.library.funcy_run.argtypes = [
+            ctypes.POINTER(ctypes.c_int64), ctypes.c_int64,
+            ctypes.POINTER(ctypes.c_uint32), ctypes.c_int64,
+            ctypes.POINTER(ctypes.c_int64), ctypes.POINTER(ctypes.c_int64),
+        ]
+    
+    
+    def run(self) -> int:
+        """
+        Run the native program and return an exit code. Return None if
+        the program must be run by the FVM instead.
+        """
+        
+        stack = (ctypes.c_int64 * self.STACK_SIZE)()
+        output_size: int = self.OUTPUT_SIZE
+        output_count: ctypes.c_int64 = ctypes.c_int64()
+        exit_code: ctypes.c_int64 = ctypes.c_int64()
+        
+        while output_size <= self.MAX_OUTPUT_SIZE:
+            output = (ctypes.c_uint32 * output_size)()
+            status: int = self.library.funcy_run(
+                    stack, self.STACK_SIZE, output, output_size,
+                    ctypes.byref(output_count), ctypes.byref(exit_code))
+            
+            if status == CGenerator.STATUS_OK:
+                size: int = output_count.value * 4
+                sys.stdout.write(bytes(output)[:size].decode("utf-32-le"))
+                return exit_code.value
+            elif status == CGenerator.STATUS_OUTPUT_FULL:
+                # Programs are deterministic, so rerun with more output.
+                output_size *= 4
+            else:
+                break
+        
+        return None
+
+
+def get_compiler() -> str:
+    """
+    Get the path to the system C compiler. Return an empty string if no
+    compiler is available.
+    """
+    
+    return shutil.which(os.environ.get("CC", "cc")) or ""
+
+
+def build_native(code: Code) -> NativeProgram:
+    """
+    Build a native program from IR code. Return None if the program
+    could not be built. Built libraries are cached in a directory that
+    is private to the current user.
+    """
+    
+    compiler: str = get_compiler()
+    
+    if not compiler:
+        return None
+    
+    source: str = CGenerator().generate(code)
+    digest: str = hashlib.sha256(source.encode()).hexdigest()[:32]
+    cache_dir: str = get_cache_dir("native")
+    library_path: str = os.path.join(cache_dir, f"{digest}.so")
+    
+    try:
+        make_private_dir(cache_dir)
+        
+        if not os.path.isfile(library_path):
+            # Concurrent builds use their own source and library names,
+            # and the library is replaced atomically so that it is never
+            # loaded while it is partially written.
+            temp_path: str = os.path.join(
+                    cache_dir,
+                    f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+            
+            try:
+                with open(f"{temp_path}.c", "wt") as file:
+                    file.write(source)
+                
+                result: subprocess.CompletedProcess = subprocess.run(
+                        [compiler, "-O2", "-shared", "-fPIC", "-o",
+                        f"{temp_path}.so", f"{temp_path}.c"],
+                        capture_output=True)
+                
+                if result.returncode != 0:
+                    return None
+                
+                os.replace(f"{temp_path}.so", library_path)
+            finally:
+                for path in (f"{temp_path}.c", f"{temp_path}.so"):
+                    if os.path.exists(path):
+                        os.remove(path)
+        
+        return NativeProgram(library_path)
+    except (OSError, subprocess.SubprocessError):
+        return None
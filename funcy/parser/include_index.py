@@ -0,0 +1,240 @@
+import json
+import os
+import threading
+import time
+
+from ..version import get_compiler_version
+
+class IndexModule:
+    """ A module file recorded in an include index. """
+    
+    size: int
+    """ The index module's file size in bytes. """
+    
+    mtime: int
+    """ The index module's modification time in nanoseconds. """
+    
+    digest: str
+    """ The index module's source code hash. """
+    
+    def __init__(self, size: int, mtime: int, digest: str) -> None:
+        """
+        Initialize the index module's file size, modification time, and
+        source code hash.
+        """
+        
+        self.size = size
+        self.mtime = mtime
+        self.digest = digest
+
+
+class IncludeIndex:
+    """
+    An index of module files by absolute path. Each module's file size
+    and modification time are recorded with its source code hash, so
+    unchanged modules can be revalidated with a single stat call instead
+    of being read. Resolved paths are also cached in memory, so symbolic
+    links that change while a process is running are not followed.
+    Include indices may be shared between threads.
+    """
+    
+    RACY_TIME: int = 2_000_000_000
+    """
+    The time in nanoseconds since a file was modified before it may be
+    indexed. Files modified more recently may be modified again without
+    changing their size or modification time.
+    """
+    
+    path: str
+    """
+    The include index's directory path. Modules are only indexed in
+    memory if the path is empty.
+    """
+    
+    modules: dict[str, IndexModule]
+    """ The include index's modules by absolute path. """
+    
+    paths: dict[str, str]
+    """ The include index's resolved absolute paths by unresolved path. """
+    
+    is_loaded: bool
+    """ Whether the include index has been loaded from disk. """
+    
+    is_changed: bool
+    """ Whether the include index has changed since it was saved. """
+    
+    lock: threading.Lock
+    """
+    The lock held while the include index's modules or resolved paths
+    are changed.
+    """
+    
+    def __init__(self, path: str = "") -> None:
+        """
+        Initialize the include index's directory path, modules, resolved
+        paths, and lock.
+        """
+        
+        self.path = path
+        self.lock = threading.Lock()
+        self.clear()
+    
+    
+    def clear(self) -> None:
+        """ Clear the include index's modules and resolved paths. """
+        
+        with self.lock:
+            self.modules = {}
+            self.paths = {}
+            self.is_loaded = not self.path
+            self.is_changed = False
+    
+    
+    def resolve(self, path: str) -> str:
+        """ Resolve an absolute path from a path. """
+        
+        resolved: str = self.paths.get(path)
+        
+        if resolved is None:
+            resolved = os.path.realpath(path)
+            
+            # A path resolved by another thread is kept so that every
+            # thread resolves a path to the same absolute path.
+            with self.lock:
+                resolved = self.paths.setdefault(path, resolved)
+        
+        return resolved
+    
+    
+    def stat(self, path: str) -> os.stat_result:
+        """
+        Get a module file's status from its absolute path. Return None if
+        the file does not exist.
+        """
+        
+        try:
+            return os.stat(path)
+        except OSError:
+            return None
+    
+    
+    def get(self, path: str) -> IndexModule:
+        """
+        Get an indexed module from its absolute path. Return None if the
+        module is not indexed or its file has changed.
+        """
+        
+        if not self.is_loaded:
+            self.load()
+        
+        module: IndexModule = self.modules.get(path)
+        
+        if module is None:
+            return None
+        
+        stat: os.stat_result = self.stat(path)
+        
+        if(
+                stat is None or stat.st_size != module.size
+                or stat.st_mtime_ns != module.mtime):
+            with self.lock:
+                self.modules.pop(path, None)
+                self.is_changed = True
+            
+            return None
+        
+        return module
+    
+    
+    def put(self, path: str, stat: os.stat_result, digest: str) -> None:
+        """
+        Put a module from its absolute path, its file's status from
+        before it was read, and its source code hash. Recently modified
+        files are not indexed.
+        """
+        
+        if time.time_ns() - stat.st_mtime_ns < self.RACY_TIME:
+            return
+        
+        if not self.is_loaded:
+            self.load()
+        
+        with self.lock:
+            self.modules[path] = IndexModule(
+                    stat.st_size, stat.st_mtime_ns, digest)
+            self.is_changed = True
+    
+    
+    def get_file_path(self) -> str:
+        """ Get the include index's file path. """
+        
+        return os.path.join(self.path, "index.json")
+    
+    
+    def load(self) -> bool:
+        """ Load the include index's modules from disk. """
+        
+        with self.lock:
+            if self.is_loaded:
+                return False
+            
+            self.is_loaded = True
+            return self.load_file()
+    
+    
+    def load_file(self) -> bool:
+        """
+        Load the include index's modules from its file while its lock is
+        held.
+        """
+        
+        try:
+            with open(self.get_file_path(), "rt") as file:
+                data: dict = json.load(file)
+            
+            if data["version"] != get_compiler_version():
+                return False
+            
+            modules: dict[str, IndexModule] = {
+                str(path): IndexModule(int(size), int(mtime), str(digest))
+                for path, (size, mtime, digest) in data["modules"].items()}
+        except (IOError, ValueError, KeyError, TypeError):
+            return False
+        
+        # Modules indexed in memory are newer than modules on disk.
+        modules.update(self.modules)
+        self.modules = modules
+        return True
+    
+    
+    def save(self) -> bool:
+        """ Save the include index's modules to disk if they have changed. """
+        
+        if not self.path or not self.is_changed:
+            return False
+        
+        with self.lock:
+            data: dict = {
+                "version": get_compiler_version(),
+                "modules": {
+                    path: [module.size, module.mtime, module.digest]
+                    for path, module in self.modules.items()},
+            }
+            
+            self.is_changed = False
+        
+        file_path: str = self.get_file_path()
+        temp_path: str = (
+                f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp")
+        
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            
+            with open(temp_path, "wt") as file:
+                json.dump(data, file)
+            
+            os.replace(temp_path, file_path)
+        except OSError:
+            return False
+        
+        return True
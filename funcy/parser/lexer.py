@@ -69,18 +69,30 @@ class Lexer:
     }
     """ Token types with fixed lexemes and no value. """
     
-    source: str = ""
+    source: str
     """ The source code to read. """
     
-    character: str = ""
+    character: str
     """ The next character to accept. """
     
-    span: Span = Span()
+    span: Span
     """ The next token's span. """
     
-    lexeme: str = ""
+    lexeme: str
     """ The next token's lexeme. """
     
+    def __init__(self) -> None:
+        """
+        Initialize the lexer's source code, next character, span, and
+        lexeme.
+        """
+        
+        self.source = ""
+        self.character = ""
+        self.span = Span()
+        self.lexeme = ""
+    
+    
     def get_token(self) -> Token:
         """ Get the next token from the token stream. """
         
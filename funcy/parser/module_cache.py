@@ -0,0 +1,189 @@
+import hashlib
+import io
+import os
+import pickle
+import threading
+
+from ..ast.nodes import ModuleNode
+from ..version import get_compiler_version
+from .position import Span
+
+class ModuleUnpickler(pickle.Unpickler):
+    """
+    Unpickles module ASTs. Only AST node and position objects may be
+    loaded, so cached files can't run arbitrary code.
+    """
+    
+    MODULES: tuple[str, str] = (ModuleNode.__module__, Span.__module__)
+    """ The modules that classes may be loaded from. """
+    
+    def find_class(self, module: str, name: str) -> type:
+        """ Find a class from its module and name. """
+        
+        if not module in self.MODULES:
+            raise pickle.UnpicklingError(f"Illegal class '{module}.{name}'!")
+        
+        return super().find_class(module, name)
+
+
+class ModuleCache:
+    """
+    A cache of parsed module ASTs keyed by a hash of the compiler version
+    and each module's name and source code. Modules are kept in memory,
+    and may also be stored on disk. Cached ASTs are shared, so they must
+    not be modified. Module caches may be shared between threads.
+    """
+    
+    MAX_MODULES: int = 256
+    """ The module cache's maximum number of modules in memory. """
+    
+    path: str
+    """
+    The module cache's directory path. Modules are only cached in memory
+    if the path is empty.
+    """
+    
+    modules: dict[str, ModuleNode]
+    """ The module cache's modules in least recently used order. """
+    
+    hits: int
+    """ The module cache's number of modules found. """
+    
+    misses: int
+    """ The module cache's number of modules not found. """
+    
+    lock: threading.Lock
+    """ The lock held while the module cache's modules are accessed. """
+    
+    def __init__(self, path: str = "") -> None:
+        """
+        Initialize the module cache's directory path, modules, counters,
+        and lock.
+        """
+        
+        self.path = path
+        self.modules = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    
+    def clear(self) -> None:
+        """ Clear the module cache's modules from memory. """
+        
+        with self.lock:
+            self.modules = {}
+    
+    
+    def get_key(self, name: str, digest: str) -> str:
+        """ Get a module's key from its name and source code hash. """
+        
+        key: str = f"{get_compiler_version()}\0{name}\0{digest}"
+        return hashlib.sha256(
+                key.encode(errors="surrogatepass")).hexdigest()[:32]
+    
+    
+    def get(self, name: str, source: str) -> ModuleNode:
+        """
+        Get a module's AST from its name and source code. Return None if
+        the module is not cached.
+        """
+        
+        return self.get_digest(name, get_source_digest(source))
+    
+    
+    def get_digest(self, name: str, digest: str) -> ModuleNode:
+        """
+        Get a module's AST from its name and source code hash. Return
+        None if the module is not cached.
+        """
+        
+        key: str = self.get_key(name, digest)
+        
+        with self.lock:
+            ast: ModuleNode = self.modules.pop(key, None)
+            
+            if ast is not None:
+                self.modules[key] = ast
+                self.hits += 1
+                return ast
+        
+        if self.path:
+            ast = self.load(key)
+        
+        if ast is not None:
+            self.insert(key, ast)
+        
+        with self.lock:
+            if ast is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        
+        return ast
+    
+    
+    def put(self, name: str, source: str, ast: ModuleNode) -> None:
+        """ Put a module's AST from its name and source code. """
+        
+        key: str = self.get_key(name, get_source_digest(source))
+        self.insert(key, ast)
+        
+        if self.path:
+            self.save(key, ast)
+    
+    
+    def insert(self, key: str, ast: ModuleNode) -> None:
+        """
+        Insert a module's AST into memory from its key as the most
+        recently used module.
+        """
+        
+        with self.lock:
+            self.modules.pop(key, None)
+            self.modules[key] = ast
+            
+            while len(self.modules) > self.MAX_MODULES:
+                self.modules.pop(next(iter(self.modules)))
+    
+    
+    def load(self, key: str) -> ModuleNode:
+        """
+        Load a module's AST from disk from its key. Return None if the
+        module could not be loaded.
+        """
+        
+        try:
+            with open(os.path.join(self.path, f"{key}.ast"), "rb") as file:
+                ast: object = ModuleUnpickler(io.BytesIO(file.read())).load()
+        except Exception:
+            # Corrupt files may raise many kinds of errors.
+            return None
+        
+        if not isinstance(ast, ModuleNode):
+            return None
+        
+        return ast
+    
+    
+    def save(self, key: str, ast: ModuleNode) -> None:
+        """ Save a module's AST to disk from its key. """
+        
+        path: str = os.path.join(self.path, f"{key}.ast")
+        temp_path: str = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            
+            with open(temp_path, "wb") as file:
+                pickle.dump(ast, file, pickle.HIGHEST_PROTOCOL)
+            
+            os.replace(temp_path, path)
+        except (OSError, pickle.PicklingError, RecursionError):
+            pass
+
+
+def get_source_digest(source: str) -> str:
+    """ Get a hash of a module's source code. """
+    
+    return hashlib.sha256(source.encode(errors="surrogatepass")).hexdigest()
@@ -1,7 +1,7 @@
 class Position:
     """ A position in text. """
     
-    name: str = ""
+    name: str
     """ The position's module name. """
     
     offset: int
@@ -14,8 +14,9 @@ class Position:
     """ The position's column in the text. """
     
     def __init__(self) -> None:
-        """ Initialize the position's position. """
+        """ Initialize the position's module name and position. """
         
+        self.name = ""
         self.reset()
     
     
@@ -133,3 +134,36 @@ class Span:
         result: Span = Span()
         result.replicate(self)
         return result
+    
+    
+    def __reduce__(self) -> tuple:
+        """
+        Reduce the span to its positions' values for pickling. Every AST
+        node has a span, so spans are pickled compactly to make parsed
+        modules faster to load.
+        """
+        
+        return (make_span, (
+                self.start.name, self.start.offset, self.start.line,
+                self.start.column, self.end.name, self.end.offset,
+                self.end.line, self.end.column))
+
+
+def make_span(
+        start_name: str, start_offset: int, start_line: int,
+        start_column: int, end_name: str, end_offset: int, end_line: int,
+        end_column: int) -> Span:
+    """ Make a span from its positions' values. """
+    
+    span: Span = Span.__new__(Span)
+    span.start = Position.__new__(Position)
+    span.start.name = start_name
+    span.start.offset = start_offset
+    span.start.line = start_line
+    span.start.column = start_column
+    span.end = Position.__new__(Position)
+    span.end.name = end_name
+    span.end.offset = end_offset
+    span.end.line = end_line
+    span.end.column = end_column
+    return span
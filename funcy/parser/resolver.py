@@ -1,9 +1,15 @@
+import os
+
+from concurrent.futures import (
+        FIRST_COMPLETED, Future, ProcessPoolExecutor, wait)
 from enum import Enum, auto
 from pathlib import Path
 
 from ..ast.nodes import *
 from ..io.input_wrapper import InputWrapper
-from ..io.log import Log
+from ..io.log import Log, LogRecord
+from .include_index import IncludeIndex, IndexModule
+from .module_cache import ModuleCache, get_source_digest
 from .parser import Parser
 
 class ResolverModuleState(Enum):
@@ -25,15 +31,16 @@ class ResolverModuleState(Enum):
 class ResolverModule:
     """ A module to be resolved by the resolver. """
     
-    state: ResolverModuleState = ResolverModuleState.UNPARSED
+    state: ResolverModuleState
     """ The resolver module's state. """
     
     ast: ModuleNode
     """ The resolver module's AST. """
     
     def __init__(self) -> None:
-        """ Initialize the resolver module's AST. """
+        """ Initialize the resolver module's state and AST. """
         
+        self.state = ResolverModuleState.UNPARSED
         self.ast = ModuleNode()
 
 
@@ -43,24 +50,59 @@ class Resolver:
     BAD_PATH_CHARS: str = '"*/:<>?\\|'
     """ Characters not allowed in paths. """
     
+    STD_DIR: str = str(Path(__file__).parent.parent.joinpath("std"))
+    """ The path to the standard library's directory. """
+    
     log: Log
     """ The resolver's log. """
     
     parser: Parser
     """ The resolver's parser. """
     
-    root_dir: str = ""
+    root_dir: str
     """ The absolute path of the Funcy program's root directory. """
     
     modules: dict[str, ResolverModule]
     """ The Funcy program's modules. """
     
-    def __init__(self, log: Log) -> None:
-        """ Initialize the resolver's log, parser, and modules. """
+    module_stats: dict[str, tuple[int, int]]
+    """
+    The sizes and modification times of the Funcy program's module files
+    when they were read by absolute path.
+    """
+    
+    jobs: int
+    """
+    The number of processes used to parse modules. Modules are parsed
+    serially while they are visited if there is only 1 job.
+    """
+    
+    module_cache: ModuleCache = ModuleCache(
+            os.environ.get("FUNCY_AST_CACHE_DIR", ""))
+    """
+    The module cache shared by every resolver. Modules are also cached on
+    disk if the `FUNCY_AST_CACHE_DIR` environment variable is set.
+    """
+    
+    include_index: IncludeIndex = IncludeIndex(
+            os.environ.get("FUNCY_AST_CACHE_DIR", ""))
+    """
+    The include index shared by every resolver. Modules are also indexed
+    on disk with the module cache.
+    """
+    
+    def __init__(self, log: Log, jobs: int = 1) -> None:
+        """
+        Initialize the resolver's log, parser, root directory, modules,
+        and number of jobs.
+        """
         
         self.log = log
         self.parser = Parser(self.log)
+        self.root_dir = ""
         self.modules = {}
+        self.module_stats = {}
+        self.jobs = jobs
     
     
     def get_module_name(self, name: str, path: str):
@@ -121,10 +163,24 @@ class Resolver:
         """ Get a module's absolute path from its name. """
         
         if name.startswith("//"):
-            return str(Path(__file__).parent.joinpath(
-                    f"../std/{name[2:]}").resolve())
+            return self.include_index.resolve(
+                    os.path.join(self.STD_DIR, name[2:]))
         
-        return str(Path(self.root_dir).joinpath(name).resolve())
+        return self.include_index.resolve(os.path.join(self.root_dir, name))
+    
+    
+    def get_module_names(self) -> list[str]:
+        """ Get the names of the Funcy program's module files. """
+        
+        return [
+            name for name in self.modules
+            if not name.startswith("intrinsics:") and name != "<source>"]
+    
+    
+    def get_module_paths(self) -> list[str]:
+        """ Get the absolute paths of the Funcy program's module files. """
+        
+        return [self.get_module_path(name) for name in self.get_module_names()]
     
     
     def set_module_state(self, name: str, state: ResolverModuleState) -> None:
@@ -196,6 +252,166 @@ class Resolver:
         return module_node
     
     
+    def parse_module(self, name: str, source: str) -> ModuleNode:
+        """
+        Parse a module from its name and source code through the module
+        cache.
+        """
+        
+        ast: ModuleNode = self.module_cache.get(name, source)
+        
+        if ast is not None:
+            return ast
+        
+        record_count: int = len(self.log.records)
+        ast = self.parser.parse_module(name, source)
+        
+        # Don't cache modules with syntax errors so they are logged again.
+        if len(self.log.records) == record_count:
+            self.module_cache.put(name, source, ast)
+        
+        return ast
+    
+    
+    def get_include_names(self, name: str, ast: ModuleNode) -> list[str]:
+        """
+        Get the names of the modules included by a module from its name
+        and AST. Illegal include paths are ignored.
+        """
+        
+        names: list[str] = []
+        
+        for include_node in ast.incls:
+            child: str = self.get_module_name(name, include_node.name)
+            
+            if child:
+                names.append(child)
+        
+        return names
+    
+    
+    def get_indexed_module(self, name: str) -> ModuleNode:
+        """
+        Get a module's AST from its name without reading its file if the
+        file has not changed since the module was indexed. Return None if
+        the module must be read.
+        """
+        
+        path: str = self.get_module_path(name)
+        module: IndexModule = self.include_index.get(path)
+        
+        if module is None:
+            return None
+        
+        self.module_stats[path] = (module.size, module.mtime)
+        return self.module_cache.get_digest(name, module.digest)
+    
+    
+    def index_module(
+            self, name: str, stat: os.stat_result, source: str) -> None:
+        """
+        Index a module from its name, its file's status from before it
+        was read, and its source code.
+        """
+        
+        if stat is None:
+            return
+        
+        path: str = self.get_module_path(name)
+        self.module_stats[path] = (stat.st_size, stat.st_mtime_ns)
+        self.include_index.put(path, stat, get_source_digest(source))
+    
+    
+    def parse_modules(self, names: list[str]) -> None:
+        """
+        Read and parse modules and every module that they include from
+        their names before they are visited. Modules are parsed in
+        parallel by a process pool. Modules that can't be read are left
+        undeclared so they are reported when they are visited.
+        """
+        
+        queue: list[str] = list(names)
+        futures: dict[Future, tuple[str, os.stat_result, str]] = {}
+        
+        with ProcessPoolExecutor(self.jobs) as executor:
+            while queue or futures:
+                while queue:
+                    name: str = queue.pop()
+                    
+                    if name in self.modules or name.startswith("intrinsics:"):
+                        continue
+                    
+                    ast: ModuleNode = self.get_indexed_module(name)
+                    
+                    if ast is None:
+                        path: str = self.get_module_path(name)
+                        stat: os.stat_result = self.include_index.stat(path)
+                        wrapper: InputWrapper = InputWrapper()
+                        wrapper.from_path(path)
+                        
+                        if not wrapper.is_ok or wrapper.is_binary:
+                            continue
+                        
+                        ast = self.module_cache.get(name, wrapper.source)
+                        
+                        if ast is not None:
+                            self.index_module(name, stat, wrapper.source)
+                    
+                    self.modules[name] = ResolverModule()
+                    
+                    if ast is None:
+                        future: Future = executor.submit(
+                                parse_module_source, name, wrapper.source)
+                        futures[future] = (name, stat, wrapper.source)
+                    else:
+                        self.modules[name].ast = ast
+                        self.modules[name].state = ResolverModuleState.PARSED
+                        queue.extend(self.get_include_names(name, ast))
+                
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    name, stat, source = futures.pop(future)
+                    ast, records = future.result()
+                    
+                    for record in records:
+                        self.log.log(record.message, record.span)
+                    
+                    # Don't cache modules with syntax errors.
+                    if not records:
+                        self.module_cache.put(name, source, ast)
+                    
+                    self.index_module(name, stat, source)
+                    self.modules[name].ast = ast
+                    self.modules[name].state = ResolverModuleState.PARSED
+                    queue.extend(self.get_include_names(name, ast))
+    
+    
+    def load_module(self, name: str) -> ModuleNode:
+        """
+        Load a module's AST from its name. Modules are only read and
+        parsed if they have changed since they were indexed.
+        """
+        
+        ast: ModuleNode = self.get_indexed_module(name)
+        
+        if ast is not None:
+            return ast
+        
+        path: str = self.get_module_path(name)
+        stat: os.stat_result = self.include_index.stat(path)
+        wrapper: InputWrapper = InputWrapper()
+        wrapper.from_path(path)
+        
+        if not wrapper.is_ok or wrapper.is_binary:
+            self.log.log(f"Failed to load module '{name}'!")
+            return ModuleNode()
+        
+        ast = self.parse_module(name, wrapper.source)
+        self.index_module(name, stat, wrapper.source)
+        return ast
+    
+    
     def declare_module(self, name: str) -> None:
         """
         Declare and parse a module from its name if it is not available.
@@ -212,13 +428,7 @@ class Resolver:
         if name.startswith("intrinsics:"):
             module.ast = self.parse_intrinsic(name[11:])
         else:
-            wrapper: InputWrapper = InputWrapper()
-            wrapper.from_path(self.get_module_path(name))
-            
-            if wrapper.is_ok and not wrapper.is_binary:
-                module.ast = self.parser.parse_module(name, wrapper.source)
-            else:
-                self.log.log(f"Failed to load module '{name}'!")
+            module.ast = self.load_module(name)
         
         module.state = ResolverModuleState.PARSED
     
@@ -237,7 +447,7 @@ class Resolver:
         if module.state != ResolverModuleState.UNPARSED:
             return
         
-        module.ast = self.parser.parse_module(name, source)
+        module.ast = self.parse_module(name, source)
         module.state = ResolverModuleState.PARSED
     
     
@@ -263,7 +473,11 @@ class Resolver:
             self.log.log("Illegal name for main module file!")
             return root_node
         
+        if self.jobs > 1:
+            self.parse_modules([main_module_name])
+        
         self.visit_module(main_module_name, root_node)
+        self.include_index.save()
         return root_node
     
     
@@ -274,7 +488,13 @@ class Resolver:
         self.root_dir = str(Path().resolve())
         self.modules = {}
         self.declare_module_source("<source>", source)
+        
+        if self.jobs > 1:
+            self.parse_modules(self.get_include_names(
+                    "<source>", self.get_module_ast("<source>")))
+        
         self.visit_module("<source>", root_node)
+        self.include_index.save()
         return root_node
     
     
@@ -294,3 +514,14 @@ class Resolver:
         
         root_node.modules.append(self.get_module_ast(name))
         self.set_module_state(name, ResolverModuleState.RESOLVED)
+
+
+def parse_module_source(
+        name: str, source: str) -> tuple[ModuleNode, list[LogRecord]]:
+    """
+    Parse a module from its name and source code in a worker process.
+    Return the module's AST and the records that were logged.
+    """
+    
+    log: Log = Log()
+    return Parser(log).parse_module(name, source), log.records
@@ -0,0 +1,132 @@
+import functools
+
+from collections.abc import Callable
+from concurrent.futures import Executor
+
+from .fvm import FVM, Opcode, StopReason, predecode
+from .result import ExecResult
+
+class Program:
+    """
+    FVM bytecode that is loaded and predecoded once and may be run many
+    times with arguments for `main`. Runs reuse pooled FVM instances.
+    Programs may be run concurrently in threads, and each concurrent run
+    takes its own FVM from the pool. Programs are pickled with a copy of
+    their bytecode and without their pool so that they may be run in
+    other processes.
+    """
+    
+    pm: bytes
+    """ The program's flat bytecode. """
+    
+    entry: int
+    """ The program's entry point address. """
+    
+    ops: list[Opcode]
+    """ The program's predecoded opcodes. """
+    
+    pool: list[FVM]
+    """ The program's idle FVM instances. """
+    
+    def __init__(self) -> None:
+        """
+        Initialize the program's bytecode, entry point, and FVM pool.
+        """
+        
+        self.pm = bytes()
+        self.entry = 0
+        self.ops = []
+        self.pool = []
+    
+    
+    def __getstate__(self) -> dict:
+        """
+        Return the program's state for pickling with a copy of its
+        bytecode, which may be a view or linked memory, and without its
+        pool.
+        """
+        
+        return {**self.__dict__, "pm": bytes(self.pm), "pool": []}
+    
+    
+    def load(self, bytecode: bytes) -> bool:
+        """ Load and predecode an FVM bytecode file's data. """
+        
+        fvm: FVM = FVM()
+        
+        if not fvm.load(bytecode):
+            return False
+        
+        self.pm = fvm.pm
+        self.entry = fvm.entry
+        self.ops = predecode(self.pm)
+        self.pool = []
+        return True
+    
+    
+    def run(self, *args: int, step_limit: int = -1) -> ExecResult:
+        """
+        Run the program with arguments for `main` and an optional step
+        limit. Capture the output and return the result.
+        """
+        
+        fvm: FVM = self.acquire()
+        
+        try:
+            if not fvm.begin(list(args)):
+                print("Failed to start FVM!")
+                return ExecResult(1, bytes(), 0, StopReason.NONE)
+            
+            steps: int = fvm.run(step_limit)
+            
+            if fvm.ef:
+                fvm.stop()
+            
+            return ExecResult(
+                    fvm.ec, fvm.get_output(), steps, fvm.sr,
+                    fvm.get_crash_report(), fvm.stats)
+        finally:
+            self.pool.append(fvm)
+    
+    
+    def run_many(
+            self, args: list[list[int]], executor: Executor = None,
+            step_limit: int = -1) -> list[ExecResult]:
+        """
+        Run the program with many lists of arguments for `main` with an
+        optional executor and an optional step limit, and return a result
+        for each list of arguments. The runs may be executed in a thread
+        or process pool, and are executed serially if no executor is
+        given.
+        """
+        
+        function: Callable[[list[int]], ExecResult] = functools.partial(
+                run_program, self, step_limit=step_limit)
+        
+        if executor is None:
+            return [function(values) for values in args]
+        
+        return list(executor.map(function, args))
+    
+    
+    def acquire(self) -> FVM:
+        """ Take an idle FVM from the pool or create a new FVM. """
+        
+        try:
+            return self.pool.pop()
+        except IndexError:
+            fvm: FVM = FVM()
+            fvm.load_decoded(self.pm, self.ops, self.entry)
+            fvm.capture()
+            return fvm
+
+
+def run_program(
+        program: Program, args: list[int], step_limit: int = -1) -> ExecResult:
+    """
+    Run a program with a list of arguments for `main` and an optional
+    step limit, and return the result. This is a module-level function
+    so that runs may be pickled for process pools.
+    """
+    
+    return program.run(*args, step_limit=step_limit)
@@ -1,16 +1,16 @@
-from .ast.utils import print_ast
-from .ast.visitor import Visitor
-from .fvm import FVM
-from .io.input_wrapper import InputWrapper
-from .io.log import Log
-from .ir.serializer import Serializer
-from .ir.utils import print_code
-from .parser.resolver import Resolver
-from .parser.token import Token, TokenType
-
 def repl() -> None:
     """ Run the Funcy REPL (Read-Evaluate-Print Loop). """
     
+    from .ast.utils import print_ast
+    from .ast.visitor import Visitor
+    from .fvm import FVM
+    from .io.input_wrapper import InputWrapper
+    from .io.log import Log
+    from .ir.serializer import Serializer
+    from .ir.utils import print_code
+    from .parser.resolver import Resolver
+    from .parser.token import Token, TokenType
+    
     print("Funcy REPL")
     print("  Enter 'exit' to exit.")
     print("  Enter 'mode (l|p|g|i)' to change mode.")
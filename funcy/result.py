@@ -0,0 +1,90 @@
+from .fvm import StopReason
+from .stats import FVMStats
+
+class CompileResult:
+    """ The result of compiling a program. """
+    
+    bytecode: bytes
+    """
+    The result's FVM bytecode. None if the program could not be
+    compiled.
+    """
+    
+    errors: list[str]
+    """ The result's error messages. """
+    
+    def __init__(self, bytecode: bytes, errors: list[str]) -> None:
+        """ Initialize the result's bytecode and error messages. """
+        
+        self.bytecode = bytecode
+        self.errors = errors
+    
+    
+    def print_errors(self) -> None:
+        """ Print the result's error messages like a log's records. """
+        
+        print("--------- Error Log ---------")
+        
+        for error in self.errors:
+            print(error)
+        
+        print("-----------------------------")
+    
+    
+    def __str__(self) -> str:
+        """ Return the result's string. """
+        
+        if self.bytecode is None:
+            return f"Failed to compile with {len(self.errors)} errors."
+        
+        return f"Compiled to {len(self.bytecode)} bytes of bytecode."
+
+
+class ExecResult:
+    """ The result of executing a program. """
+    
+    exit_code: int
+    """ The result's exit code. """
+    
+    output: bytes
+    """ The result's captured output as UTF-8. """
+    
+    steps: int
+    """ The result's number of executed instructions. """
+    
+    stop_reason: StopReason
+    """ The result's stop reason. """
+    
+    crash_report: str
+    """
+    The result's crash report. Empty if the program did not crash or
+    was not traced.
+    """
+    
+    stats: FVMStats
+    """ The result's runtime counters. None if they are unavailable. """
+    
+    def __init__(
+            self, exit_code: int, output: bytes, steps: int,
+            stop_reason: StopReason, crash_report: str = "",
+            stats: FVMStats = None) -> None:
+        """
+        Initialize the result's exit code, output, instruction count, stop
+        reason, crash report, and runtime counters.
+        """
+        
+        self.exit_code = exit_code
+        self.output = output
+        self.steps = steps
+        self.stop_reason = stop_reason
+        self.crash_report = crash_report
+        self.stats = stats
+    
+    
+    def __str__(self) -> str:
+        """ Return the result's string. """
+        
+        return (
+                f"Exited with code {self.exit_code} ({self.stop_reason.name}) "
+                f"after {self.steps} steps with {len(self.output)} bytes "
+                "of output.")
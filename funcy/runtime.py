@@ -0,0 +1,134 @@
+import mmap
+import os
+import sys
+import threading
+
+from typing import BinaryIO
+
+from .fvm import FVM, StopReason
+
+def map_file(file: BinaryIO) -> bytes | memoryview:
+    """
+    Map a file to memory and return a view of its data. Files that can't
+    be mapped are read instead.
+    """
+    
+    try:
+        return memoryview(
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+    except (ValueError, OSError):
+        # Empty files and some special files can't be mapped.
+        return file.read()
+
+
+def load_bytecode_path(path: str) -> bytes | memoryview:
+    """
+    Load FVM bytecode from a path. Return None if the path could not be
+    read or does not contain FVM bytecode.
+    """
+    
+    try:
+        with open(path, "rb") as file:
+            data: bytes | memoryview = map_file(file)
+    except IOError:
+        return None
+    
+    if data[:len(FVM.HEADER)] != FVM.HEADER:
+        return None
+    
+    return data
+
+
+def save_bytecode_path(path: str, bytecode: bytes) -> bool:
+    """
+    Save FVM bytecode to a path and return whether it was saved. Loaded
+    bytecode is mapped to memory, so the path is replaced atomically
+    instead of being rewritten while another process may be running it.
+    """
+    
+    temp_path: str = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    
+    try:
+        with open(temp_path, "wb") as file:
+            file.write(bytecode)
+        
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        
+        return False
+    
+    return True
+
+
+def exec_bytecode(
+        bytecode: bytes | memoryview, trace_size: int = 0,
+        stats: bool = False) -> int:
+    """
+    Execute FVM bytecode and return an exit code. If a trace size is
+    given, the last executed instructions are traced and reported to
+    standard error if the FVM crashes. If stats are requested, the FVM's
+    runtime counters are reported to standard error.
+    """
+    
+    fvm: FVM = FVM()
+    
+    if trace_size > 0:
+        fvm.enable_trace(trace_size)
+    
+    if stats:
+        fvm.enable_stats()
+    
+    if not fvm.load(bytecode):
+        print("Failed to load bytecode!")
+        return 1
+    
+    if not fvm.begin():
+        print("Failed to start FVM!")
+        return 1
+    
+    fvm.run()
+    
+    if trace_size > 0 and fvm.sr == StopReason.CRASH:
+        print(fvm.get_crash_report(), file=sys.stderr)
+    
+    if stats:
+        print(fvm.stats, file=sys.stderr)
+    
+    return fvm.ec
+
+
+def runtime(args: list[str]) -> int:
+    """
+    Run the Funcy runtime. The runtime only executes FVM bytecode, so the
+    compiler is never imported.
+    """
+    
+    if len(args) != 1:
+        print("Funcy Runtime Usage:")
+        print(
+                "  'python -m funcy.runtime <path>' - "
+                "Run the bytecode at <path>.")
+        return 1
+    
+    bytecode: bytes | memoryview = load_bytecode_path(args[0])
+    
+    if bytecode is None:
+        print(f"Failed to load bytecode from '{args[0]}'!")
+        return 1
+    
+    return exec_bytecode(bytecode)
+
+
+if __name__ == "__main__":
+    exit_code: int = 1
+    
+    if __package__:
+        exit_code = runtime(sys.argv[1:])
+    else:
+        print(
+                "The Funcy runtime must be run as a module! "
+                "Use 'python -m funcy.runtime'")
+    
+    sys.exit(exit_code)
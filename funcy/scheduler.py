@@ -0,0 +1,183 @@
+import time
+
+from collections import deque
+from enum import Enum, auto
+
+from .fvm import FVM
+from .result import ExecResult
+
+class TaskState(Enum):
+    """ The state of a scheduler task. """
+    
+    RUNNING = auto()
+    """ Task is waiting for or running in a quantum. """
+    
+    STOPPED = auto()
+    """ Task's FVM has halted or crashed. """
+    
+    TIMED_OUT = auto()
+    """ Task has exceeded its step limit or time limit. """
+
+
+class Task:
+    """ An FVM instance owned by a scheduler. """
+    
+    id: int
+    """ The task's ID. """
+    
+    fvm: FVM
+    """ The task's FVM. """
+    
+    priority: int
+    """ The task's priority as a number of quanta to run per turn. """
+    
+    step_limit: int
+    """ The task's maximum number of steps. -1 for no limit. """
+    
+    deadline: float
+    """ The task's monotonic clock deadline. -1.0 for no deadline. """
+    
+    steps: int = 0
+    """ The number of steps the task has executed. """
+    
+    state: TaskState = TaskState.RUNNING
+    """ The task's state. """
+    
+    def __init__(
+            self, id: int, fvm: FVM, priority: int, step_limit: int,
+            deadline: float) -> None:
+        """
+        Initialize the task's ID, FVM, priority, limits, and output
+        buffer.
+        """
+        
+        self.id = id
+        self.fvm = fvm
+        self.fvm.capture()
+        self.priority = max(priority, 1)
+        self.step_limit = step_limit
+        self.deadline = deadline
+    
+    
+    def get_output(self) -> bytes:
+        """ Get the task's captured output as UTF-8. """
+        
+        return self.fvm.get_output()
+    
+    
+    def get_exit_code(self) -> int:
+        """ Get the task's exit code. """
+        
+        return self.fvm.ec
+    
+    
+    def get_result(self) -> ExecResult:
+        """ Get the task's result. """
+        
+        return ExecResult(
+                self.fvm.ec, self.fvm.get_output(), self.steps, self.fvm.sr,
+                self.fvm.get_crash_report(), self.fvm.stats)
+
+
+class Scheduler:
+    """
+    Runs many FVM instances in one thread by stepping each instance for
+    a fixed amount of steps per turn. FVM instances keep their registers
+    between turns, so they resume where they left off.
+    """
+    
+    quantum: int
+    """ The scheduler's number of steps per quantum. """
+    
+    next_id: int
+    """ The scheduler's next task ID. """
+    
+    tasks: deque[Task]
+    """ The scheduler's running tasks in turn order. """
+    
+    finished: list[Task]
+    """ The scheduler's finished tasks that have not been collected. """
+    
+    def __init__(self, quantum: int = 1000) -> None:
+        """ Initialize the scheduler's quantum and tasks. """
+        
+        self.quantum = max(quantum, 1)
+        self.next_id = 0
+        self.tasks = deque()
+        self.finished = []
+    
+    
+    def add(
+            self, bytecode: bytes, priority: int = 1, step_limit: int = -1,
+            time_limit: float = -1.0, args: list[int] = None) -> Task:
+        """
+        Add a task from FVM bytecode with a priority, an optional step
+        limit, an optional time limit in seconds, and optional arguments
+        for `main`. Return None if the task could not be started.
+        """
+        
+        fvm: FVM = FVM()
+        
+        if not fvm.load(bytecode) or not fvm.begin(args):
+            return None
+        
+        deadline: float = -1.0
+        
+        if time_limit >= 0.0:
+            deadline = time.monotonic() + time_limit
+        
+        task: Task = Task(self.next_id, fvm, priority, step_limit, deadline)
+        self.next_id += 1
+        self.tasks.append(task)
+        return task
+    
+    
+    def has_tasks(self) -> bool:
+        """ Return whether the scheduler has running tasks. """
+        
+        return len(self.tasks) > 0
+    
+    
+    def step(self) -> None:
+        """ Run the next task's turn. """
+        
+        if not self.tasks:
+            return
+        
+        task: Task = self.tasks.popleft()
+        steps: int = self.quantum * task.priority
+        
+        if task.step_limit >= 0:
+            steps = min(steps, task.step_limit - task.steps)
+        
+        task.steps += task.fvm.run(steps)
+        
+        if not task.fvm.ef:
+            task.state = TaskState.STOPPED
+        elif task.step_limit >= 0 and task.steps >= task.step_limit:
+            task.state = TaskState.TIMED_OUT
+        elif task.deadline >= 0.0 and time.monotonic() >= task.deadline:
+            task.state = TaskState.TIMED_OUT
+        
+        if task.state == TaskState.RUNNING:
+            self.tasks.append(task)
+        else:
+            if task.fvm.ef:
+                task.fvm.stop()
+            
+            self.finished.append(task)
+    
+    
+    def run(self) -> None:
+        """ Run turns until every task has finished. """
+        
+        while self.tasks:
+            self.step()
+    
+    
+    def collect(self) -> list[Task]:
+        """ Collect and forget the finished tasks. """
+        
+        finished: list[Task] = self.finished
+        self.finished = []
+        return finished
@@ -0,0 +1,381 @@
+import contextlib
+import io
+import os
+import selectors
+import signal
+import socket
+import struct
+import time
+
+from collections import deque
+
+class JobKind:
+    """ The kinds of job that can be sent to an execution server. """
+    
+    PATH: bytes = b"P"
+    """ Run Funcy source code or FVM bytecode from a path. """
+    
+    SOURCE: bytes = b"S"
+    """ Run Funcy source code. """
+    
+    BYTECODE: bytes = b"B"
+    """ Run FVM bytecode. """
+
+
+def send_message(sock: socket.socket, data: bytes) -> None:
+    """ Send a length-prefixed message to a socket. """
+    
+    sock.sendall(struct.pack("<I", len(data)) + data)
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytes:
+    """ Receive an exact amount of bytes from a socket. """
+    
+    data: bytearray = bytearray()
+    
+    while len(data) < size:
+        chunk: bytes = sock.recv(size - len(data))
+        
+        if not chunk:
+            raise ConnectionError("Connection closed!")
+        
+        data.extend(chunk)
+    
+    return bytes(data)
+
+
+def recv_message(sock: socket.socket) -> bytes:
+    """ Receive a length-prefixed message from a socket. """
+    
+    size: int = struct.unpack("<I", recv_exact(sock, 4))[0]
+    return recv_exact(sock, size)
+
+
+def run_job(request: bytes) -> tuple[int, str]:
+    """
+    Run a job request and return its exit code and output. Jobs that
+    raise an exception fail with an exit code of 1 and the exception in
+    their output, so the worker that runs them survives.
+    """
+    
+    from .core import exec, exec_path
+    
+    kind: bytes = request[:1]
+    payload: bytes = request[1:]
+    output: io.StringIO = io.StringIO()
+    
+    with contextlib.redirect_stdout(output):
+        try:
+            if kind == JobKind.PATH:
+                exit_code: int = exec_path(payload.decode())
+            elif kind == JobKind.SOURCE:
+                exit_code: int = exec(payload.decode())
+            elif kind == JobKind.BYTECODE:
+                exit_code: int = exec(payload)
+            else:
+                print("Invalid job kind!")
+                exit_code: int = 1
+        except Exception as error:
+            print(f"Job failed with {type(error).__name__}: {error}")
+            exit_code: int = 1
+    
+    return exit_code, output.getvalue()
+
+
+def submit(path: str, kind: bytes, payload: bytes) -> tuple[int, str]:
+    """
+    Submit a job to the execution server listening at a socket path and
+    return its exit code and output. Return an exit code of 1 and an
+    error message if the job could not be submitted or its connection
+    was closed before it finished.
+    """
+    
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(path)
+            send_message(sock, kind + payload)
+            response: bytes = recv_message(sock)
+        
+        exit_code: int = struct.unpack("<i", response[:4])[0]
+    except OSError:
+        return 1, f"Failed to submit job to execution server at '{path}'!\n"
+    except struct.error:
+        return 1, f"Invalid response from execution server at '{path}'!\n"
+    
+    return exit_code, response[4:].decode(errors="replace")
+
+
+def submit_path(path: str, job_path: str) -> tuple[int, str]:
+    """
+    Submit a path to Funcy source code or FVM bytecode to the execution
+    server listening at a socket path and return its exit code and
+    output.
+    """
+    
+    return submit(path, JobKind.PATH, os.path.abspath(job_path).encode())
+
+
+class Worker:
+    """ A pre-warmed worker process of an execution server. """
+    
+    pid: int
+    """ The worker's process ID. """
+    
+    sock: socket.socket
+    """ The server's end of the worker's control socket. """
+    
+    job_start: float = 0.0
+    """ The accept time of the worker's current job. 0.0 if idle. """
+    
+    def __init__(self, pid: int, sock: socket.socket) -> None:
+        """ Initialize the worker's process ID and control socket. """
+        
+        self.pid = pid
+        self.sock = sock
+
+
+class Server:
+    """
+    An execution server that runs jobs in pre-forked worker processes.
+    The server accepts jobs over a Unix socket and hands each connection
+    to an idle worker. Workers are forked after the package has been
+    imported and the standard library has been compiled once.
+    """
+    
+    WARMUP_SOURCE: str = 'include "//std.fy"; func main() {}'
+    """ Source code compiled before forking workers. """
+    
+    path: str
+    """ The server's socket path. """
+    
+    worker_count: int
+    """ The server's number of worker processes. """
+    
+    listener: socket.socket
+    """ The server's listening socket. """
+    
+    selector: selectors.BaseSelector
+    """ The server's selector. """
+    
+    workers: list[Worker]
+    """ The server's workers. """
+    
+    idle: deque[Worker]
+    """ The server's idle workers. """
+    
+    pending: deque[tuple[socket.socket, float]]
+    """ The server's queued connections and their accept times. """
+    
+    job_count: int
+    """ The server's number of finished jobs. """
+    
+    def __init__(self, path: str, worker_count: int) -> None:
+        """ Initialize the server's socket path and worker count. """
+        
+        self.path = path
+        self.worker_count = max(worker_count, 1)
+        self.workers = []
+        self.idle = deque()
+        self.pending = deque()
+        self.job_count = 0
+    
+    
+    def serve(self) -> None:
+        """ Serve jobs until interrupted. """
+        
+        from .core import compile
+        
+        compile(self.WARMUP_SOURCE)
+        
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.path)
+        self.listener.listen(128)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        
+        for i in range(self.worker_count):
+            self.spawn_worker()
+        
+        print(
+                f"Serving on '{self.path}' with "
+                f"{self.worker_count} workers.", flush=True)
+        
+        try:
+            while True:
+                for key, events in self.selector.select():
+                    if key.fileobj is self.listener:
+                        connection, address = self.listener.accept()
+                        self.pending.append((connection, time.perf_counter()))
+                    else:
+                        self.finish_job(key.data)
+                
+                self.dispatch()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+    
+    
+    def spawn_worker(self) -> None:
+        """ Fork a worker process. """
+        
+        server_sock, worker_sock = socket.socketpair()
+        pid: int = os.fork()
+        
+        if pid == 0:
+            exit_code: int = 1
+            
+            try:
+                # Close inherited sockets so that workers see EOF when the
+                # server closes their control sockets.
+                server_sock.close()
+                self.selector.close()
+                self.listener.close()
+                
+                for worker in self.workers:
+                    worker.sock.close()
+                
+                exit_code = self.work(worker_sock)
+            finally:
+                os._exit(exit_code)
+        
+        worker_sock.close()
+        worker: Worker = Worker(pid, server_sock)
+        self.workers.append(worker)
+        self.idle.append(worker)
+        self.selector.register(server_sock, selectors.EVENT_READ, worker)
+    
+    
+    def work(self, sock: socket.socket) -> int:
+        """ Run a worker process's job loop and return its exit code. """
+        
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        
+        while True:
+            try:
+                message, fds, flags, address = socket.recv_fds(sock, 1, 1)
+            except OSError:
+                return 1
+            
+            if not fds:
+                return 0
+            
+            with socket.socket(fileno=fds[0]) as connection:
+                try:
+                    exit_code, output = run_job(recv_message(connection))
+                    send_message(
+                            connection, struct.pack("<i", exit_code)
+                            + output.encode(errors="replace"))
+                except (ConnectionError, OSError, struct.error):
+                    pass
+            
+            sock.sendall(b"D")
+    
+    
+    def dispatch(self) -> None:
+        """
+        Hand queued connections to idle workers. Workers that cannot be
+        handed a connection are replaced, and the connection is retried
+        once with another worker before its job fails.
+        """
+        
+        retried: set[socket.socket] = set()
+        
+        while self.pending and self.idle:
+            connection, start = self.pending.popleft()
+            worker: Worker = self.idle.popleft()
+            
+            try:
+                socket.send_fds(worker.sock, [b"J"], [connection.fileno()])
+            except OSError:
+                self.replace_worker(worker)
+                
+                if connection in retried:
+                    self.fail_job(connection)
+                else:
+                    retried.add(connection)
+                    self.pending.appendleft((connection, start))
+                
+                continue
+            
+            connection.close()
+            worker.job_start = start
+    
+    
+    def fail_job(self, connection: socket.socket) -> None:
+        """
+        Fail a queued connection's job because it could not be handed to
+        a worker. The job's request is not read so that the server never
+        waits for a client.
+        """
+        
+        with connection:
+            try:
+                send_message(
+                        connection, struct.pack("<i", 1)
+                        + b"Failed to hand job to a worker!\n")
+            except OSError:
+                pass
+    
+    
+    def finish_job(self, worker: Worker) -> None:
+        """ Handle a worker's job completion or exit. """
+        
+        if not worker.sock.recv(1):
+            # The worker exited, so replace it.
+            self.replace_worker(worker)
+            return
+        
+        latency: float = (time.perf_counter() - worker.job_start) * 1000.0
+        worker.job_start = 0.0
+        self.idle.append(worker)
+        self.job_count += 1
+        print(
+                f"Job {self.job_count}: {latency:.2f} ms, "
+                f"queue depth {len(self.pending)}.", flush=True)
+    
+    
+    def replace_worker(self, worker: Worker) -> None:
+        """ Stop a failed worker and fork a new worker to replace it. """
+        
+        self.selector.unregister(worker.sock)
+        worker.sock.close()
+        self.workers.remove(worker)
+        
+        if worker in self.idle:
+            self.idle.remove(worker)
+        
+        # The worker may still be running if only its socket failed.
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(worker.pid, signal.SIGKILL)
+        
+        os.waitpid(worker.pid, 0)
+        self.spawn_worker()
+    
+    
+    def close(self) -> None:
+        """ Stop the workers and close the server's sockets. """
+        
+        for worker in self.workers:
+            worker.sock.close()
+        
+        for worker in self.workers:
+            os.waitpid(worker.pid, 0)
+        
+        self.selector.close()
+        self.listener.close()
+        
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def serve(path: str, worker_count: int = os.cpu_count() or 1) -> None:
+    """
+    Serve jobs at a Unix socket path with a number of pre-forked worker
+    processes until interrupted.
+    """
+    
+    Server(path, worker_count).serve()
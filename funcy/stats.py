@@ -0,0 +1,132 @@
+from array import array
+
+class StatsBlock:
+    """
+    A straight-line block of FVM instructions with the static counts of
+    its instructions. Blocks end at the first jump, call, return, halt,
+    or illegal instruction, so they are always executed in full unless
+    execution is interrupted.
+    """
+    
+    slot: int
+    """ The block's counter slot. """
+    
+    ops: list
+    """ The block's opcodes. Illegal opcodes are None. """
+    
+    size: int
+    """ The block's number of instructions. """
+    
+    calls: int
+    """ The block's number of calls. """
+    
+    returns: int
+    """ The block's number of returns. """
+    
+    chars: int
+    """ The block's number of output characters. """
+    
+    rise: int
+    """ The block's peak stack depth relative to its entry depth. """
+    
+    prefixes: dict[int, "StatsBlock"]
+    """
+    The blocks of the block's first instructions by size. Interrupted
+    executions of the block are counted as executions of a prefix.
+    """
+    
+    def __init__(self, slot: int, ops: list) -> None:
+        """ Initialize the block's counter slot and opcodes. """
+        
+        self.slot = slot
+        self.ops = ops
+        self.size = len(ops)
+        self.calls = 0
+        self.returns = 0
+        self.chars = 0
+        self.rise = 0
+        self.prefixes = {}
+
+
+class FVMStats:
+    """
+    Aggregate runtime counters of an FVM. Instructions and wall time are
+    always counted. Calls, returns, characters, and peak depths are only
+    counted if the FVM's stats are enabled. Calls, returns, and
+    characters are derived from the number of executions of each block
+    and the block's static counts, and peak depths are sampled once per
+    block.
+    """
+    
+    steps: int
+    """ The number of executed instructions. """
+    
+    blocks: array
+    """
+    The number of executions of each block by slot. Calls, returns,
+    characters, and peak depths are not counted if the counts are None.
+    """
+    
+    calls: int
+    """ The number of executed calls. """
+    
+    returns: int
+    """ The number of executed returns. """
+    
+    frames: int
+    """ The current frame depth. """
+    
+    peak_stack: int
+    """ The peak stack depth in words. """
+    
+    peak_frames: int
+    """ The peak frame depth. """
+    
+    chars: int
+    """ The number of output characters. """
+    
+    time: float
+    """ The wall time spent running in seconds. """
+    
+    def __init__(self) -> None:
+        """ Initialize the stats' counters. """
+        
+        self.steps = 0
+        self.blocks = None
+        self.calls = 0
+        self.returns = 0
+        self.frames = 0
+        self.peak_stack = 0
+        self.peak_frames = 0
+        self.chars = 0
+        self.time = 0.0
+    
+    
+    def enable_counting(self, size: int = 0) -> None:
+        """
+        Count calls, returns, characters, and peak depths from the next
+        executed block with an initial number of block slots if they are
+        not already counted.
+        """
+        
+        if self.blocks is None:
+            self.blocks = array("Q", bytes(8 * size))
+    
+    
+    def __str__(self) -> str:
+        """ Return the stats' string. """
+        
+        lines: list[str] = [f"Instructions: {self.steps}"]
+        
+        if self.blocks is not None:
+            lines.extend([
+                f"Calls: {self.calls}",
+                f"Returns: {self.returns}",
+                f"Peak stack depth: {self.peak_stack}",
+                f"Peak frame depth: {self.peak_frames}",
+                f"Characters output: {self.chars}",
+            ])
+        
+        lines.append(f"Wall time: {self.time * 1000.0:.3f} ms")
+        return "\n".join(lines)
+
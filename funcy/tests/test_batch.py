@@ -0,0 +1,43 @@
+def test_batch() -> None:
+    """ Test the batch FVM against the FVM. """
+    
+    import contextlib
+    import io
+    
+    try:
+        from ..batch import BatchFVM
+    except ImportError:
+        return # The batch FVM requires NumPy.
+    
+    from ..core import compile
+    from ..fvm import FVM
+    
+    bytecode: bytes = compile(
+            'include "//std.fy";'
+            "func main(mut x, y) {"
+            "   while (x > 1) { if (x % 2) { x = 3 * x + 1; } else { x /= 2; }"
+            "   printInt(x); putChr(' '); }"
+            "   return x / y; }")
+    args: list[list[int]] = [[x, x % 3] for x in range(20)]
+    batch: BatchFVM = BatchFVM()
+    assert batch.load(bytecode)
+    assert batch.begin(args)
+    batch.run()
+    outputs: list[str] = batch.get_outputs()
+    
+    for lane, lane_args in enumerate(args):
+        fvm: FVM = FVM()
+        fvm.load(bytecode)
+        assert fvm.begin(lane_args)
+        output: io.StringIO = io.StringIO()
+        
+        with contextlib.redirect_stdout(output):
+            while fvm.ef:
+                fvm.step()
+        
+        assert batch.ec[lane] == fvm.ec
+        assert outputs[lane] == output.getvalue()
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_batch()
@@ -0,0 +1,70 @@
+def test_builder() -> None:
+    """ Test building many programs in a process pool. """
+    
+    import contextlib
+    import io
+    import os
+    import tempfile
+    
+    from .. import builder
+    from ..builder import build_many
+    from ..core import run
+    from ..result import CompileResult
+    
+    with tempfile.TemporaryDirectory() as dir_path:
+        out_dir: str = os.path.join(dir_path, "out")
+        in_paths: list[str] = []
+        
+        for name, source in (
+                ("lib.fy", "func twice(x) { return x * 2; }"),
+                ("a.fy", "func main() { printIntLn(twice(1)); }"),
+                ("b.fy", "func main() { printIntLn(twice(2)); }"),
+                ("c.fy", "func main() { printIntLn(twice()); }")):
+            in_paths.append(os.path.join(dir_path, name))
+            
+            with open(in_paths[-1], "wt") as file:
+                if name != "lib.fy":
+                    file.write('include "//std.fy"; include "lib.fy";')
+                
+                file.write(source)
+        
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            assert not build_many(in_paths[1:], out_dir, 2)
+        
+        assert f"Failed to build '{in_paths[3]}':" in output.getvalue()
+        assert "Built 2/3 programs" in output.getvalue()
+        assert sorted(os.listdir(out_dir)) == ["a.fvm", "b.fvm", "c.fvm"]
+        
+        for name, expected in (("a", b"2\n"), ("b", b"4\n"), ("c", b"")):
+            with open(os.path.join(out_dir, f"{name}.fvm"), "rb") as file:
+                assert run(file.read()).output == expected
+        
+        # Crashed builds only fail their own input.
+        compile_result_path = builder.compile_result_path
+        
+        def crash(path: str) -> CompileResult:
+            if path == in_paths[2]:
+                raise RuntimeError("Crashed!")
+            
+            return compile_result_path(path)
+        
+        try:
+            builder.compile_result_path = crash
+            
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                assert not build_many(in_paths[1:3], out_dir, 2)
+        finally:
+            builder.compile_result_path = compile_result_path
+        
+        assert "RuntimeError: Crashed!" in output.getvalue()
+        assert f"crashed  {in_paths[2]}" in output.getvalue()
+        assert "Built 1/2 programs" in output.getvalue()
+        
+        # Inputs with the same name can't be built to the same directory.
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert build_many(in_paths[1:3], out_dir)
+            assert not build_many([in_paths[1], in_paths[1]], out_dir)
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_builder()
@@ -0,0 +1,99 @@
+def test_cache() -> None:
+    """ Test caching compiled FVM bytecode by module content. """
+    
+    import os
+    import tempfile
+    
+    from .. import cache as cache_module
+    from ..cache import BytecodeCache
+    from ..core import compile_cached_path, compile_path, run, run_path
+    
+    with tempfile.TemporaryDirectory() as dir_path:
+        cache_path: str = os.path.join(dir_path, "cache")
+        os.environ["FUNCY_CACHE_DIR"] = cache_path
+        main_path: str = os.path.join(dir_path, "main.fy")
+        lib_path: str = os.path.join(dir_path, "lib.fy")
+        
+        with open(main_path, "wt") as file:
+            file.write(
+                    'include "lib.fy"; include "//print.fy";'
+                    "func main() { printIntLn(value()); }")
+        
+        with open(lib_path, "wt") as file:
+            file.write("func value() { return 1; }")
+        
+        try:
+            cache: BytecodeCache = BytecodeCache()
+            assert cache.load(main_path) is None
+            assert run(compile_cached_path(main_path)).output == b"1\n"
+            assert cache.load(main_path) == compile_path(main_path)
+            assert run_path(main_path, cache=True).output == b"1\n"
+            
+            # Changing an included module invalidates the cached program.
+            with open(lib_path, "wt") as file:
+                file.write("func value() { return 23; }")
+            
+            assert cache.load(main_path) is None
+            assert run_path(main_path, cache=True).output == b"23\n"
+            assert cache.load(main_path) is not None
+            
+            # Touched modules are hashed once and then trusted by status.
+            os.utime(lib_path, ns=(10 ** 18, 10 ** 18))
+            assert cache.load(main_path) is not None
+            get_digest_path = cache_module.get_digest_path
+            
+            try:
+                cache_module.get_digest_path = lambda path: ""
+                assert cache.load(main_path) is not None
+            finally:
+                cache_module.get_digest_path = get_digest_path
+            
+            # Failed compilations are not cached.
+            os.remove(lib_path)
+            assert run_path(main_path, cache=True).exit_code == 1
+            assert cache.load(main_path) is None
+            
+            # Least recently used entries are evicted first.
+            with open(lib_path, "wt") as file:
+                file.write("func value() { return 4; }")
+            
+            other_path: str = os.path.join(dir_path, "other.fy")
+            
+            with open(other_path, "wt") as file:
+                file.write("func main() { return 5; }")
+            
+            assert run_path(main_path, cache=True).output == b"4\n"
+            assert run_path(other_path, cache=True).exit_code == 5
+            
+            for name in os.listdir(cache_path):
+                os.utime(os.path.join(cache_path, name), ns=(0, 0))
+            
+            assert cache.load(main_path) is not None
+            size: int = sum(
+                    os.path.getsize(os.path.join(cache_path, name))
+                    for name in os.listdir(cache_path)
+                    if os.stat(os.path.join(cache_path, name)).st_mtime_ns)
+            BytecodeCache(cache_path, size).evict()
+            assert cache.load(main_path) is not None
+            assert cache.load(other_path) is None
+            
+            BytecodeCache(cache_path, 0).evict()
+            assert not os.listdir(cache_path)
+            
+            # Caches in directories of other users are not used.
+            assert run_path(main_path, cache=True).output == b"4\n"
+            
+            if hasattr(os, "getuid"):
+                assert os.stat(cache_path).st_mode & 0o777 == 0o700
+                
+                if os.getuid() == 0:
+                    os.chown(cache_path, 1, 1)
+                    assert cache.load(main_path) is None
+                    assert run_path(main_path, cache=True).output == b"4\n"
+                    assert not cache.save(main_path, [main_path], bytes())
+        finally:
+            del os.environ["FUNCY_CACHE_DIR"]
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_cache()
@@ -0,0 +1,56 @@
+def test_compile_many() -> None:
+    """ Test compiling many programs that share modules. """
+    
+    import os
+    import tempfile
+    
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    
+    from ..core import compile, compile_many, compile_many_paths, run
+    from ..result import CompileResult
+    
+    sources: list[str] = [
+        'include "//std.fy"; func main() { printIntLn(max(1, 2)); }',
+        'include "//std.fy"; func main() { printIntLn(max(3)); }',
+        'include "//std.fy"; func main() { printStrLn("ok"); }',
+        "func main() {",
+    ]
+    
+    assert compile_many([]) == []
+    
+    for executor in (None, ThreadPoolExecutor(4), ProcessPoolExecutor(2)):
+        results: list[CompileResult] = compile_many(sources, executor)
+        
+        if executor is not None:
+            executor.shutdown()
+        
+        assert len(results) == 4
+        assert results[0].bytecode == compile(sources[0])
+        assert run(results[2].bytecode).output == b"ok\n"
+        
+        # Errors are returned with each result instead of being printed.
+        assert not results[0].errors and not results[2].errors
+        assert results[1].bytecode is None and len(results[1].errors) == 1
+        assert "expected 2 parameters" in results[1].errors[0]
+        assert results[3].bytecode is None and results[3].errors
+    
+    with tempfile.TemporaryDirectory() as dir_path:
+        paths: list[str] = []
+        
+        for i, source in enumerate(sources[:3]):
+            paths.append(os.path.join(dir_path, f"{i}.fy"))
+            
+            with open(paths[-1], "wt") as file:
+                file.write(source)
+        
+        with ThreadPoolExecutor(2) as executor:
+            results: list[CompileResult] = compile_many_paths(
+                    paths + [os.path.join(dir_path, "missing.fy")], executor)
+        
+        assert [result.bytecode is None for result in results] == [
+                False, True, False, True]
+        assert run(results[0].bytecode).output == b"2\n"
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_compile_many()
@@ -0,0 +1,46 @@
+def test_coverage() -> None:
+    """ Test counting blocks and exporting coverage. """
+    
+    import os
+    import tempfile
+    
+    from ..core import compile_coverage_path
+    from ..coverage import CoverageMap
+    from ..fvm import FVM
+    
+    bytecode, coverage_map = compile_coverage_path(
+            "funcy/tests/data/fy/coverage/main.fy")
+    fvm: FVM = FVM()
+    fvm.enable_coverage(coverage_map.get_addresses())
+    fvm.capture()
+    assert fvm.load(bytecode)
+    assert fvm.begin()
+    fvm.run()
+    assert fvm.get_output() == b"1\n2\nFizz\n4\n"
+    
+    lines: dict[int, int] = [
+        counts for path, counts
+        in coverage_map.get_line_counts(fvm.counters).items()
+        if path.endswith("main.fy")][0]
+    assert lines[5] == 1
+    assert lines[7] == 3
+    assert lines[16] == 5
+    assert lines[17] == 4
+    
+    loaded_map: CoverageMap = CoverageMap()
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        map_path: str = os.path.join(temp_dir, "main.fyc.cov")
+        assert coverage_map.save(map_path)
+        assert loaded_map.load(map_path)
+    
+    lcov: str = loaded_map.get_lcov(fvm.counters)
+    assert lcov == coverage_map.get_lcov(fvm.counters)
+    assert "FN:3,fizz\n" in lcov
+    assert "FNDA:4,fizz\n" in lcov
+    assert "DA:5,1\n" in lcov
+    assert "SF:" in lcov and lcov.endswith("end_of_record\n")
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_coverage()
@@ -0,0 +1,89 @@
+def test_daemon() -> None:
+    """ Test building programs with a compile daemon. """
+    
+    import contextlib
+    import io
+    import os
+    import signal
+    import subprocess
+    import sys
+    import tempfile
+    import time
+    
+    from .. import core
+    from ..core import run
+    from ..daemon import (
+            Daemon, build_daemon, compile_daemon_path, get_daemon_stats)
+    from ..result import CompileResult
+    
+    with tempfile.TemporaryDirectory() as dir_path:
+        socket_path: str = os.path.join(dir_path, "daemon.sock")
+        main_path: str = os.path.join(dir_path, "main.fy")
+        out_path: str = os.path.join(dir_path, "main.fvm")
+        
+        assert not build_daemon(socket_path, main_path, out_path)
+        assert get_daemon_stats(socket_path) is None
+        
+        with open(main_path, "wt") as file:
+            file.write('include "//std.fy"; func main() { printIntLn(1); }')
+        
+        root_path: str = os.path.dirname(os.path.dirname(os.path.dirname(
+                os.path.abspath(__file__))))
+        process: subprocess.Popen = subprocess.Popen(
+                [sys.executable, "-m", "funcy", "daemon", socket_path],
+                cwd=root_path, stdout=subprocess.DEVNULL)
+        
+        try:
+            for _ in range(200):
+                if get_daemon_stats(socket_path) is not None:
+                    break
+                
+                time.sleep(0.05)
+            
+            assert build_daemon(socket_path, main_path, out_path)
+            
+            with open(out_path, "rb") as file:
+                assert run(file.read()).output == b"1\n"
+            
+            # Changed modules are compiled again.
+            with open(main_path, "wt") as file:
+                file.write("func main() { printIntLn(2); }")
+            
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                assert build_daemon(socket_path, main_path, out_path)
+            
+            assert "printIntLn" in output.getvalue()
+            assert compile_daemon_path(socket_path, main_path).errors
+            
+            stats: dict = get_daemon_stats(socket_path)
+            assert stats["builds"] == 3 and stats["failures"] == 2
+            assert stats["cache_hits"] > 0 and stats["cache_misses"] > 0
+        finally:
+            process.send_signal(signal.SIGINT)
+            process.wait(10)
+        
+        assert not os.path.exists(socket_path)
+        
+        # Builds that raise an exception are reported and counted.
+        daemon: Daemon = Daemon(socket_path)
+        compile_result_path = core.compile_result_path
+        
+        def crash(path: str) -> CompileResult:
+            raise RuntimeError("Crashed!")
+        
+        try:
+            core.compile_result_path = crash
+            
+            with contextlib.redirect_stdout(io.StringIO()):
+                header, bytecode = daemon.build(main_path)
+        finally:
+            core.compile_result_path = compile_result_path
+        
+        assert header["errors"] == [
+                "Build crashed with RuntimeError: Crashed!"]
+        assert bytecode == bytes()
+        assert daemon.get_stats()["failures"] == 1
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_daemon()
@@ -0,0 +1,59 @@
+def test_hooks() -> None:
+    """ Test calling FVM hooks and pausing from hooks. """
+    
+    from ..core import compile
+    from ..fvm import FVM, HookEvent, Instruction, Opcode
+    
+    bytecode: bytes = compile(
+            "func add(a, b) { return a + b; }"
+            "func main() { return add(add(1, 2), 3); }")
+    fvm: FVM = FVM()
+    assert fvm.load(bytecode)
+    assert fvm.begin()
+    steps: int = fvm.run()
+    
+    events: list[tuple[HookEvent, Instruction]] = []
+    
+    def on_instruction(fvm: FVM, instruction: Instruction) -> bool:
+        events.append((HookEvent.INSTRUCTION, instruction))
+        return False
+    
+    def on_call(fvm: FVM, instruction: Instruction) -> bool:
+        events.append((HookEvent.CALL, instruction))
+        return True
+    
+    def on_return(fvm: FVM, instruction: Instruction) -> bool:
+        events.append((HookEvent.RETURN, instruction))
+        return False
+    
+    fvm.add_hook(HookEvent.INSTRUCTION, on_instruction)
+    fvm.add_hook(HookEvent.CALL, on_call)
+    fvm.add_hook(HookEvent.RETURN, on_return)
+    assert fvm.begin()
+    
+    pauses: int = 0
+    hooked_steps: int = fvm.run()
+    
+    while fvm.ef:
+        assert fvm.is_paused
+        assert fvm.decode(fvm.ip).opcode == Opcode.CALL
+        pauses += 1
+        hooked_steps += fvm.run()
+    
+    assert fvm.ec == 6
+    assert pauses == 3
+    assert hooked_steps == steps
+    assert [e for e, i in events].count(HookEvent.INSTRUCTION) == steps
+    assert [e for e, i in events].count(HookEvent.RETURN) == 3
+    
+    for event, instruction in events:
+        assert instruction.opcode == fvm.decode(instruction.address).opcode
+    
+    fvm.remove_hook(HookEvent.INSTRUCTION, on_instruction)
+    fvm.remove_hook(HookEvent.CALL, on_call)
+    fvm.remove_hook(HookEvent.RETURN, on_return)
+    assert not fvm.has_hooks()
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_hooks()
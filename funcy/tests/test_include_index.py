@@ -0,0 +1,72 @@
+def test_include_index() -> None:
+    """ Test revalidating unchanged modules without reading them. """
+    
+    import os
+    import tempfile
+    import time
+    
+    from ..ast.nodes import ModuleNode, RootNode
+    from ..io.log import Log
+    from ..parser.include_index import IncludeIndex
+    from ..parser.module_cache import ModuleCache
+    from ..parser.resolver import Resolver
+    
+    def resolve(path: str) -> ModuleNode:
+        """ Resolve a program from its path and return its library module. """
+        
+        log: Log = Log()
+        root_node: RootNode = Resolver(log).resolve_path(path)
+        assert not log.has_records()
+        return root_node.modules[-2]
+    
+    include_index: IncludeIndex = Resolver.include_index
+    module_cache: ModuleCache = Resolver.module_cache
+    
+    try:
+        with tempfile.TemporaryDirectory() as dir_path:
+            main_path: str = os.path.join(dir_path, "main.fy")
+            lib_path: str = os.path.join(dir_path, "lib.fy")
+            index_dir: str = os.path.join(dir_path, "index")
+            old_time: int = time.time_ns() - 10_000_000_000
+            
+            with open(main_path, "wt") as file:
+                file.write('include "lib.fy"; func main() { lib(); }')
+            
+            with open(lib_path, "wt") as file:
+                file.write('include "//print.fy"; func lib() { return 1; }')
+            
+            Resolver.include_index = IncludeIndex(index_dir)
+            Resolver.module_cache = ModuleCache()
+            
+            # Recently modified files are not indexed.
+            first: ModuleNode = resolve(main_path)
+            assert Resolver.include_index.get(main_path) is None
+            
+            for path in (main_path, lib_path):
+                os.utime(path, ns=(old_time, old_time))
+            
+            assert resolve(main_path) is first
+            
+            # The index is loaded from disk by other processes.
+            index: IncludeIndex = IncludeIndex(index_dir)
+            
+            for path in (main_path, lib_path):
+                assert index.get(os.path.realpath(path)) is not None
+            
+            # Unchanged files are not read again.
+            with open(lib_path, "wt") as file:
+                file.write('include "//print.fy"; func lib() { return 2; }')
+            
+            os.utime(lib_path, ns=(old_time, old_time))
+            assert resolve(main_path) is first
+            
+            os.utime(lib_path, ns=(old_time + 1, old_time + 1))
+            assert resolve(main_path) is not first
+            assert index.get(os.path.realpath(lib_path)) is None
+    finally:
+        Resolver.include_index = include_index
+        Resolver.module_cache = module_cache
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_include_index()
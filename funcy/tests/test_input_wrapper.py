@@ -0,0 +1,26 @@
+def test_input_wrapper() -> None:
+    """ Test reading source code and memory-mapped bytecode from paths. """
+    
+    import os
+    
+    from ..core import compile, run
+    from ..io.input_wrapper import InputWrapper
+    
+    data_path: str = os.path.join(os.path.dirname(__file__), "data")
+    input_wrapper: InputWrapper = InputWrapper()
+    input_wrapper.from_path(os.path.join(data_path, "fvm", "hello_fvm.fvm"))
+    assert input_wrapper.is_ok and input_wrapper.is_binary
+    assert isinstance(input_wrapper.bytecode, memoryview)
+    assert run(input_wrapper.bytecode).output == b"Hello, FVM!\n"
+    
+    input_wrapper.from_path(os.path.join(data_path, "fy", "hello.fy"))
+    assert input_wrapper.is_ok and not input_wrapper.is_binary
+    assert "\r" not in input_wrapper.source
+    assert run(compile(input_wrapper.source)).exit_code == 0
+    
+    input_wrapper.from_path(os.path.join(data_path, "missing.fy"))
+    assert not input_wrapper.is_ok
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_input_wrapper()
@@ -0,0 +1,84 @@
+def test_library() -> None:
+    """ Test linking programs to shared libraries. """
+    
+    import os
+    import tempfile
+    
+    from ..core import (
+            build_library, compile_linked_path, compile_path, run)
+    from ..fvm import FVM
+    from ..library import LIBRARIES, LinkedMemory
+    from ..program import Program
+    
+    with tempfile.TemporaryDirectory() as dir_path:
+        lib_path: str = os.path.join(dir_path, "lib.fy")
+        library_path: str = os.path.join(dir_path, "lib.fyl")
+        main_path: str = os.path.join(dir_path, "main.fy")
+        
+        with open(lib_path, "wt") as file:
+            file.write('include "//std.fy"; func twice(x) { return x * 2; }')
+        
+        with open(main_path, "wt") as file:
+            file.write(
+                    'include "lib.fy";'
+                    "func main(n) {"
+                    "    printIntLn(max(twice(n), 3));"
+                    '    printStrLn("done");'
+                    "}")
+        
+        build_library(lib_path, library_path)
+        bytecode: bytes = compile_linked_path(main_path, library_path)
+        
+        # Linked programs only contain their own code.
+        assert len(bytecode) < len(compile_path(main_path))
+        assert run(bytecode).output == run(compile_path(main_path)).output
+        assert run(bytecode, args=[5]).output == b"10\ndone\n"
+        
+        fvm: FVM = FVM()
+        assert fvm.load(bytecode)
+        assert isinstance(fvm.pm, LinkedMemory)
+        assert fvm.entry == len(fvm.pm.library)
+        
+        program: Program = Program()
+        assert program.load(bytecode)
+        assert program.run(7).output == b"14\ndone\n"
+        assert program.run(1).output == b"3\ndone\n"
+        
+        # Programs are relocated when their library is rebuilt, and
+        # rebuilt libraries are loaded again. Libraries are replaced, so
+        # FVMs that loaded the old library can still run it.
+        old_fvm: FVM = FVM()
+        old_fvm.capture()
+        assert old_fvm.load(bytecode)
+        
+        with open(lib_path, "wt") as file:
+            file.write(
+                    'include "//std.fy"; func pad() { return 0; }'
+                    "func twice(x) { return x + x; }")
+        
+        build_library(lib_path, library_path)
+        assert run(bytecode, args=[4]).output == b"8\ndone\n"
+        assert old_fvm.begin([4])
+        old_fvm.run()
+        assert old_fvm.get_output() == b"8\ndone\n"
+        
+        # Programs can't be loaded if their imports have changed.
+        with open(lib_path, "wt") as file:
+            file.write('include "//std.fy"; func twice() { return 2; }')
+        
+        build_library(lib_path, library_path)
+        assert not FVM().load(bytecode)
+        assert len([key for key in LIBRARIES if key[0] == library_path]) == 1
+        
+        os.remove(library_path)
+        assert not FVM().load(bytecode)
+    
+    memory: LinkedMemory = LinkedMemory(memoryview(b"abc"), b"def")
+    assert len(memory) == 6
+    assert memory[2] == ord("c") and memory[-1] == ord("f")
+    assert memory[1:5] == b"bcde" and memory[4:] == b"ef"
+    assert bytes(memory) == b"abcdef" and list(memory) == list(b"abcdef")
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_library()
@@ -0,0 +1,77 @@
+def test_linker() -> None:
+    """ Test separate compilation to object files and linking. """
+    
+    import os
+    import tempfile
+    
+    from ..core import compile_objects_path, compile_path, run
+    from ..io.log import Log
+    from ..linker import ObjectBuilder
+    
+    with tempfile.TemporaryDirectory() as dir_path:
+        object_dir: str = os.path.join(dir_path, "objects")
+        main_path: str = os.path.join(dir_path, "main.fy")
+        lib_path: str = os.path.join(dir_path, "lib.fy")
+        
+        with open(main_path, "wt") as file:
+            file.write(
+                    'include "lib.fy"; include "//print.fy";'
+                    "func main() { printIntLn(value(2)); }")
+        
+        with open(lib_path, "wt") as file:
+            file.write("func value(x) { return x + 1; }")
+        
+        log: Log = Log()
+        builder: ObjectBuilder = ObjectBuilder(log, object_dir)
+        assert builder.build(main_path) is not None
+        assert sorted(builder.compiled) == ["//print.fy", "lib.fy", "main.fy"]
+        
+        # Linked programs are identical to programs built in one pass.
+        bytecode: bytes = compile_objects_path(main_path, object_dir)
+        assert bytecode == compile_path(main_path)
+        assert run(bytecode).output == b"3\n"
+        
+        # Unchanged modules are not compiled again.
+        assert builder.build(main_path) is not None
+        assert builder.compiled == []
+        
+        # Changing a function's body only compiles its module again.
+        with open(lib_path, "wt") as file:
+            file.write("func value(x) { return x * 10; }")
+        
+        assert builder.build(main_path) is not None
+        assert builder.compiled == ["lib.fy"]
+        assert run(compile_objects_path(main_path, object_dir)).output == (
+                b"20\n")
+        
+        # Changing a function's parameters also compiles its dependents.
+        with open(lib_path, "wt") as file:
+            file.write("func value() { return 5; }")
+        
+        assert builder.build(main_path) is None
+        assert log.has_records()
+        assert builder.compiled == ["lib.fy", "main.fy"]
+        
+        with open(main_path, "wt") as file:
+            file.write(
+                    'include "lib.fy"; include "//print.fy";'
+                    "func main() { printIntLn(value()); }")
+        
+        log.clear()
+        assert builder.build(main_path) is not None
+        assert builder.compiled == ["main.fy"]
+        assert run(compile_objects_path(main_path, object_dir)).output == (
+                b"5\n")
+        
+        # Object files with errors are not saved.
+        with open(lib_path, "wt") as file:
+            file.write("func value() { return 5 }")
+        
+        assert run(compile_objects_path(main_path, object_dir)).exit_code == 1
+        log.clear()
+        assert builder.build(main_path) is None
+        assert log.has_records()
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_linker()
@@ -0,0 +1,36 @@
+def test_memprofile() -> None:
+    """ Test profiling the memory usage of compiler stages. """
+    
+    from ..core import compile
+    from ..fvm import FVM
+    from ..memprofile import MemoryProfiler
+    from ..parser.parser import Parser
+    
+    parse_module = Parser.parse_module
+    profiler: MemoryProfiler = MemoryProfiler()
+    profiler.install()
+    
+    try:
+        fvm: FVM = FVM()
+        assert fvm.load(compile(
+                'include "//print.fy"; func main() { printIntLn(12); }'))
+        assert fvm.begin()
+        fvm.capture()
+        profiler.run_fvm(fvm)
+    finally:
+        profiler.uninstall()
+    
+    assert Parser.parse_module is parse_module
+    assert fvm.get_output() == b"12\n"
+    assert set(profiler.stages) == {
+        "Parsing", "Resolution", "Code generation", "Optimization",
+        "Serialization", "Execution"}
+    assert profiler.stages["Parsing"].calls == 2
+    assert profiler.stages["Resolution"].calls == 1
+    assert profiler.stages["Parsing"].peak > 0
+    assert profiler.peak_stack > 0
+    assert "Peak operand stack depth" in profiler.get_report()
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_memprofile()
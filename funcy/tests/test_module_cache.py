@@ -0,0 +1,51 @@
+def test_module_cache() -> None:
+    """ Test sharing parsed module ASTs between resolvers. """
+    
+    import os
+    import pickle
+    import tempfile
+    
+    from ..ast.nodes import ModuleNode, RootNode
+    from ..core import compile
+    from ..io.log import Log
+    from ..parser.module_cache import ModuleCache
+    from ..parser.resolver import Resolver
+    
+    source: str = 'include "//std.fy"; func main() { printIntLn(1); }'
+    first: RootNode = Resolver(Log()).resolve_source(source)
+    second: RootNode = Resolver(Log()).resolve_source(source)
+    assert len(first.modules) == len(second.modules) == 7
+    
+    for first_module, second_module in zip(first.modules, second.modules):
+        if not first_module.span.start.name.startswith("intrinsics:"):
+            assert first_module is second_module
+    
+    # Modules with syntax errors are parsed and logged every time.
+    for _ in range(2):
+        log: Log = Log()
+        Resolver(log).resolve_source("func main() {")
+        assert log.has_records()
+    
+    assert compile(source) == compile(source)
+    
+    with tempfile.TemporaryDirectory() as dir_path:
+        cache: ModuleCache = ModuleCache(dir_path)
+        ast: ModuleNode = Resolver(Log()).resolve_source(source).modules[-1]
+        cache.put("<source>", source, ast)
+        
+        loaded: ModuleNode = ModuleCache(dir_path).get("<source>", source)
+        assert isinstance(loaded, ModuleNode) and loaded is not ast
+        assert str(loaded.stmts[0]) == str(ast.stmts[0])
+        assert str(loaded.incls[0]) == str(ast.incls[0])
+        
+        # Cached files may only contain AST nodes.
+        ast_path: str = os.path.join(dir_path, os.listdir(dir_path)[0])
+        
+        with open(ast_path, "wb") as file:
+            pickle.dump(os.getcwd, file)
+        
+        assert ModuleCache(dir_path).get("<source>", source) is None
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_module_cache()
@@ -0,0 +1,48 @@
+def test_native() -> None:
+    """ Test native execution against the FVM. """
+    
+    import contextlib
+    import io
+    
+    from ..core import compile_code, exec
+    from ..ir.serializer import Serializer
+    from ..native import NativeProgram, build_native, get_compiler
+    
+    if not get_compiler():
+        return
+    
+    sources: list[str] = [
+        'include "//std.fy"; func main() { printIntLn(-1234); return 7; }',
+        "func main() { return 1 / 0; }",
+        "func main() { return -7 / 2 + -7 % 2 * 100; }",
+        "func f(n) { if (n) { return n + f(n - 1); } return 0; }"
+        "func main() { return f(1000); }",
+        'include "intrinsics:chrAt"; func main() { return chrAt("ab", 1); }',
+        "func main() { let f = 9; return f(); }",
+    ]
+    
+    for path in ("fizzbuzz.fy", "hello.fy", "intrinsics.fy"):
+        with open(f"funcy/tests/data/fy/{path}", "rt") as file:
+            sources.append(file.read())
+    
+    for source in sources:
+        expected_output: io.StringIO = io.StringIO()
+        native_output: io.StringIO = io.StringIO()
+        
+        with contextlib.redirect_stdout(expected_output):
+            expected_exit_code: int = exec(source)
+        
+        with contextlib.redirect_stdout(native_output):
+            exit_code: int = exec(source, True)
+        
+        assert exit_code == expected_exit_code
+        assert native_output.getvalue() == expected_output.getvalue()
+    
+    program: NativeProgram = build_native(compile_code(sources[0]))
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert program.run() == 7
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_native()
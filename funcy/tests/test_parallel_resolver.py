@@ -0,0 +1,64 @@
+def test_parallel_resolver() -> None:
+    """ Test parsing modules in parallel. """
+    
+    import os
+    import tempfile
+    
+    from ..ast.nodes import RootNode
+    from ..io.log import Log
+    from ..parser.module_cache import ModuleCache
+    from ..parser.resolver import Resolver
+    
+    def resolve(path: str, jobs: int) -> tuple[list[str], list[str]]:
+        """
+        Resolve a program from its path with a number of jobs and return
+        its module names and log records.
+        """
+        
+        Resolver.module_cache = ModuleCache()
+        log: Log = Log()
+        root_node: RootNode = Resolver(log, jobs).resolve_path(path)
+        return (
+                [module.span.start.name for module in root_node.modules],
+                [str(record) for record in log.records])
+    
+    module_cache: ModuleCache = Resolver.module_cache
+    
+    try:
+        with tempfile.TemporaryDirectory() as dir_path:
+            main_path: str = os.path.join(dir_path, "main.fy")
+            
+            with open(main_path, "wt") as file:
+                file.write(
+                        'include "a.fy"; include "b.fy"; include "a.fy";'
+                        'include "//print.fy"; func main() {}')
+            
+            for name, source in (
+                    ("a.fy", 'include "c.fy"; func a() {}'),
+                    ("b.fy", 'include "c.fy"; include "d.fy";'),
+                    ("c.fy", 'func c() { return 1 }'),
+                    ("d.fy", 'include "b.fy"; include "missing.fy";')):
+                with open(os.path.join(dir_path, name), "wt") as file:
+                    file.write(source)
+            
+            # Module order and diagnostics match serial resolution.
+            serial: tuple[list[str], list[str]] = resolve(main_path, 1)
+            assert serial[1]
+            assert resolve(main_path, 2) == serial
+            assert resolve(main_path, 4) == serial
+            
+            # Cached modules are not parsed again.
+            Resolver.module_cache = ModuleCache()
+            log: Log = Log()
+            Resolver(log).resolve_path(main_path)
+            records: list[str] = [str(record) for record in log.records]
+            log.clear()
+            Resolver(log, 2).resolve_path(main_path)
+            assert [str(record) for record in log.records] == records
+            assert len(Resolver.module_cache.modules) == 5
+    finally:
+        Resolver.module_cache = module_cache
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_parallel_resolver()
@@ -0,0 +1,35 @@
+def test_program() -> None:
+    """ Test running a compiled program many times with arguments. """
+    
+    from ..core import compile_program, run
+    from ..fvm import FVM, StopReason
+    from ..program import Program
+    from ..result import ExecResult
+    
+    source: str = (
+            'include "//print.fy";'
+            "func main(x, y) { printIntLn(x * y); return x - y; }")
+    program: Program = compile_program(source)
+    assert program is not None
+    
+    for i in range(50):
+        result: ExecResult = program.run(i, 3)
+        assert result.output == f"{i * 3}\n".encode()
+        assert result.exit_code == i - 3
+        assert result.output == run(source, args=[i, 3]).output
+    
+    assert len(program.pool) == 1
+    assert program.run(5).output == b"0\n"
+    assert program.run(1, 2, 3).stop_reason == StopReason.NONE
+    
+    looping: Program = compile_program("func main() { while (true) {} }")
+    assert looping.run(step_limit=100).stop_reason == StopReason.LIMIT
+    assert looping.run(step_limit=100).steps == 100
+    
+    crashing: Program = compile_program(
+            bytes(FVM.HEADER) + bytes([2, 0, 0, 0, 1, 0, 0, 0, 0xff]))
+    assert crashing.run().stop_reason == StopReason.CRASH
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_program()
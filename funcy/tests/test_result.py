@@ -0,0 +1,52 @@
+def test_run() -> None:
+    """ Test executing with captured output. """
+    
+    from ..core import run
+    from ..fvm import StopReason
+    from ..result import ExecResult
+    
+    result: ExecResult = run(
+            'include "//print.fy";'
+            'func main(x) { printStrLn("Hëllo!"); printIntLn(x); '
+            "return x; }",
+            args=[7], stats=True)
+    assert result.exit_code == 7
+    assert result.output == "Hëllo!\n7\n".encode()
+    assert result.stop_reason == StopReason.HALT
+    assert result.steps > 0
+    assert result.stats.steps == result.steps
+    assert result.stats.calls == result.stats.returns
+    assert result.stats.chars == 9
+    assert result.stats.peak_frames >= 3
+    assert result.stats.peak_stack >= result.stats.peak_frames * 2
+    
+    # The peak stack depth includes operands of nested expressions.
+    result = run(
+            "func f(x) { return x + (x + (x + (x + (x + (x + x))))); }"
+            "func main() { return f(1); }", stats=True)
+    assert result.exit_code == 7
+    assert result.stats.calls == result.stats.returns == 2
+    assert result.stats.peak_frames == 2
+    assert result.stats.peak_stack >= 12
+    assert "Calls: 2" in str(result.stats)
+    assert not "Calls" in str(run("func main() {}").stats)
+    
+    # Blocks that are interrupted by a step limit are counted in part.
+    result = run(
+            'include "//print.fy"; func main() { printStrLn("Hello!"); }',
+            step_limit=40, stats=True)
+    assert result.stop_reason == StopReason.LIMIT
+    assert result.stats.chars == len(result.output)
+    
+    result = run("func main() { while (true) {} }", step_limit=500)
+    assert result.exit_code == 1
+    assert result.steps == 500
+    assert result.stop_reason == StopReason.LIMIT
+    
+    result = run("func main() { return 1 / 0; }")
+    assert result.exit_code == 1
+    assert result.stop_reason == StopReason.CRASH
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_run()
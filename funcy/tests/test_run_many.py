@@ -0,0 +1,89 @@
+def test_run_many() -> None:
+    """ Test running programs concurrently in threads and processes. """
+    
+    import io
+    import sys
+    
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    
+    from ..core import compile, compile_program, run, run_many
+    from ..fvm import FVM, StopReason
+    from ..program import Program
+    from ..result import ExecResult
+    
+    source: str = (
+            'include "//print.fy";'
+            "func fib(n) { if (n < 2) { return n; }"
+            "    return fib(n - 1) + fib(n - 2); }"
+            "func main(x) { printIntLn(fib(x)); return x; }")
+    program: Program = compile_program(source)
+    args: list[list[int]] = [[i % 12] for i in range(48)]
+    expected: list[bytes] = [
+        result.output for result in program.run_many(args)]
+    switch_interval: float = sys.getswitchinterval()
+    
+    try:
+        # Switch threads often so that FVMs are likely to be run by
+        # several threads at once.
+        sys.setswitchinterval(1e-6)
+        
+        with ThreadPoolExecutor(8) as executor:
+            assert [
+                result.output
+                for result in program.run_many(args, executor)] == expected
+            
+            sources: list[str | bytes] = [
+                compile(
+                        'include "//print.fy";'
+                        f"func main() {{ printIntLn({i} * {i}); }}")
+                for i in range(16)]
+            sources.append("func main() { while (true) {} }")
+            results: list[ExecResult] = run_many(sources, executor, 1000)
+            
+            for i in range(16):
+                assert results[i].output == run(sources[i]).output
+            
+            assert results[16].stop_reason == StopReason.LIMIT
+            
+            # Line buffered output is written a line at a time.
+            out: io.StringIO = io.StringIO()
+            
+            def put_lines(value: int) -> None:
+                fvm: FVM = FVM()
+                fvm.out = out
+                fvm.buffer_lines()
+                fvm.load(compile(
+                        'include "//print.fy";'
+                        "func main() { let mut i = 0; while (i < 20) {"
+                        f"    printIntLn({value}); i = i + 1; }} }}"))
+                fvm.begin()
+                fvm.run()
+            
+            values: list[int] = [1234567 * i for i in range(1, 9)]
+            list(executor.map(put_lines, values))
+            lines: list[str] = out.getvalue().splitlines()
+            assert len(lines) == 20 * len(values)
+            
+            for value in values:
+                assert lines.count(str(value)) == 20
+    finally:
+        sys.setswitchinterval(switch_interval)
+    
+    assert len(program.pool) <= 8
+    
+    # Runs are pickled for process pools.
+    with ProcessPoolExecutor(2) as executor:
+        assert [
+            result.output
+            for result in program.run_many(args, executor)] == expected
+        
+        results = run_many(sources, executor, 1000)
+        
+        for i in range(16):
+            assert results[i].output == run(sources[i]).output
+        
+        assert results[16].stop_reason == StopReason.LIMIT
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_run_many()
@@ -0,0 +1,67 @@
+def test_runtime() -> None:
+    """ Test running FVM bytecode without importing the compiler. """
+    
+    import contextlib
+    import io
+    import os
+    import subprocess
+    import sys
+    import tempfile
+    
+    root_path: str = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))))
+    bytecode_path: str = os.path.join(
+            root_path, "funcy", "tests", "data", "fvm", "hello_fvm.fvm")
+    script: str = (
+            "import sys\n"
+            "from funcy.runtime import runtime\n"
+            f"exit_code = runtime([{bytecode_path!r}])\n"
+            "print(exit_code)\n"
+            "print(' '.join(sorted(sys.modules)))\n")
+    process: subprocess.CompletedProcess = subprocess.run(
+            [sys.executable, "-c", script], cwd=root_path,
+            capture_output=True, text=True)
+    lines: list[str] = process.stdout.splitlines()
+    assert lines[0] == "Hello, FVM!"
+    assert lines[1] == "0"
+    
+    modules: list[str] = [m for m in lines[2].split() if "funcy" in m]
+    assert "funcy.fvm" in modules
+    
+    for module in ("funcy.core", "funcy.parser", "funcy.ast", "funcy.ir"):
+        assert not module in modules
+    
+    import funcy
+    
+    assert callable(funcy.run) and callable(funcy.cli)
+    assert not hasattr(funcy, "missing")
+    
+    # Building over mapped bytecode replaces it instead of truncating it.
+    from ..core import build
+    from ..runtime import exec_bytecode, load_bytecode_path
+    
+    with tempfile.TemporaryDirectory() as dir_path:
+        source_path: str = os.path.join(dir_path, "main.fy")
+        out_path: str = os.path.join(dir_path, "main.fyc")
+        
+        with open(source_path, "wt") as file:
+            file.write('include "//print.fy"; func main() { printIntLn(5); }')
+        
+        build(source_path, out_path)
+        bytecode: bytes = load_bytecode_path(out_path)
+        
+        with open(source_path, "wt") as file:
+            file.write("func main() {}")
+        
+        build(source_path, out_path)
+        output: io.StringIO = io.StringIO()
+        
+        with contextlib.redirect_stdout(output):
+            assert exec_bytecode(bytecode) == 0
+        
+        assert output.getvalue() == "5\n"
+        assert sorted(os.listdir(dir_path)) == ["main.fy", "main.fyc"]
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_runtime()
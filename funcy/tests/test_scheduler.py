@@ -0,0 +1,33 @@
+def test_scheduler() -> None:
+    """ Test the scheduler. """
+    
+    from ..core import compile
+    from ..fvm import StopReason
+    from ..scheduler import Scheduler, Task, TaskState
+    
+    scheduler: Scheduler = Scheduler(50)
+    bytecode: bytes = compile(
+            'include "//print.fy"; func main(x) { printIntLn(x); return x; }')
+    tasks: list[Task] = [
+        scheduler.add(bytecode, priority=i % 3, args=[i]) for i in range(100)]
+    looping: Task = scheduler.add(
+            compile("func main() { while (true) {} }"), step_limit=1000)
+    assert scheduler.add(bytecode, args=[1, 2]) is None
+    scheduler.run()
+    
+    finished: list[Task] = scheduler.collect()
+    assert len(finished) == 101
+    assert not scheduler.collect()
+    
+    for i, task in enumerate(tasks):
+        assert task.state == TaskState.STOPPED
+        assert task.get_exit_code() == i
+        assert task.get_output() == f"{i}\n".encode()
+    
+    assert looping.state == TaskState.TIMED_OUT
+    assert looping.get_result().steps == 1000
+    assert looping.get_result().stop_reason == StopReason.LIMIT
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_scheduler()
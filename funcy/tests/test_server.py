@@ -0,0 +1,82 @@
+def test_server() -> None:
+    """ Test that failed jobs are reported by an execution server. """
+    
+    import os
+    import select
+    import selectors
+    import signal
+    import socket
+    import subprocess
+    import sys
+    import tempfile
+    import time
+    
+    from ..server import (
+            JobKind, Server, Worker, recv_message, run_job, send_message,
+            submit)
+    
+    exit_code, output = run_job(JobKind.SOURCE + b"\xff")
+    assert exit_code == 1 and "UnicodeDecodeError" in output
+    
+    with tempfile.TemporaryDirectory() as dir_path:
+        socket_path: str = os.path.join(dir_path, "server.sock")
+        exit_code, output = submit(socket_path, JobKind.SOURCE, b"")
+        assert exit_code == 1 and "Failed to submit job" in output
+        
+        root_path: str = os.path.dirname(os.path.dirname(os.path.dirname(
+                os.path.abspath(__file__))))
+        process: subprocess.Popen = subprocess.Popen(
+                [sys.executable, "-m", "funcy", "serve", "--workers", "1",
+                socket_path], cwd=root_path, stdout=subprocess.DEVNULL)
+        
+        try:
+            for _ in range(200):
+                exit_code, output = submit(
+                        socket_path, JobKind.SOURCE, b"func main() {}")
+                
+                if exit_code == 0:
+                    break
+                
+                time.sleep(0.05)
+            
+            exit_code, output = submit(socket_path, JobKind.PATH, b"\xff")
+            assert exit_code == 1 and "UnicodeDecodeError" in output
+            
+            # The worker survives the failed job.
+            exit_code, output = submit(
+                    socket_path, JobKind.SOURCE,
+                    b'include "//print.fy"; func main() { printIntLn(7); }')
+            assert exit_code == 0 and output == "7\n"
+        finally:
+            process.send_signal(signal.SIGINT)
+            process.wait(10)
+        
+        # Workers that die before they are handed a job are replaced.
+        server: Server = Server(socket_path, 1)
+        server.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.listener.bind(socket_path)
+        server.listener.listen(1)
+        server.selector = selectors.DefaultSelector()
+        server.spawn_worker()
+        worker: Worker = server.workers[0]
+        os.kill(worker.pid, signal.SIGKILL)
+        select.select([worker.sock], [], [], 10)
+        
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(socket_path)
+                server.pending.append((server.listener.accept()[0], 0.0))
+                server.dispatch()
+                assert worker not in server.workers
+                assert len(server.workers) == 1 and not server.idle
+                send_message(
+                        sock, JobKind.SOURCE + b'include "//print.fy";'
+                        b"func main() { printIntLn(8); }")
+                response: bytes = recv_message(sock)
+                assert response == bytes(4) + b"8\n"
+        finally:
+            server.close()
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_server()
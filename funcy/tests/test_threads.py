@@ -0,0 +1,35 @@
+def test_threads() -> None:
+    """ Test compiling programs concurrently in threads. """
+    
+    import sys
+    
+    from concurrent.futures import ThreadPoolExecutor
+    
+    from ..core import compile
+    from ..parser.module_cache import ModuleCache
+    from ..parser.resolver import Resolver
+    
+    sources: list[str] = [
+        'include "//std.fy"; func main() {'
+        f'    printIntLn({i} * {i}); printStrLn("{"x" * i}");'
+        "}" for i in range(24)]
+    
+    expected: list[bytes] = [compile(source) for source in sources]
+    module_cache: ModuleCache = Resolver.module_cache
+    switch_interval: float = sys.getswitchinterval()
+    
+    try:
+        # Switch threads often so that shared state is likely to be used
+        # by several threads at once.
+        Resolver.module_cache = ModuleCache()
+        sys.setswitchinterval(1e-6)
+        
+        with ThreadPoolExecutor(8) as executor:
+            assert list(executor.map(compile, sources * 4)) == expected * 4
+    finally:
+        Resolver.module_cache = module_cache
+        sys.setswitchinterval(switch_interval)
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_threads()
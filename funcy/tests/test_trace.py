@@ -0,0 +1,40 @@
+def test_trace() -> None:
+    """ Test tracing executed instructions and reporting crashes. """
+    
+    from ..core import compile, run
+    from ..fvm import FVM, CrashReason, Opcode, StopReason
+    from ..result import ExecResult
+    from ..trace import Trace
+    
+    trace: Trace = Trace(3)
+    
+    for i in range(5):
+        trace.record(i, i * 2, 1 << 70 if i == 4 else -i)
+    
+    assert trace.get_entries() == [(2, 4, -2), (3, 6, -3), (4, 8, 0)]
+    
+    fvm: FVM = FVM()
+    fvm.enable_trace(4)
+    assert fvm.load(compile(
+            "func div(a, b) { return a / b; }"
+            "func main() { return div(1, 0); }"))
+    assert fvm.begin()
+    fvm.run(5)
+    fvm.run()
+    assert fvm.sr == StopReason.CRASH
+    assert fvm.cr == CrashReason.DIVIDE_BY_ZERO
+    assert len(fvm.get_frames()) == 2
+    
+    ip, opcode, tos = fvm.trace.get_entries()[-1]
+    assert opcode == Opcode.BINARY_DIVIDE.value
+    assert tos == 0
+    assert fvm.pm[ip] == opcode
+    
+    result: ExecResult = run("func main() { return 1 % 0; }", trace_size=8)
+    assert "DIVIDE_BY_ZERO" in result.crash_report
+    assert "BINARY_MODULO" in result.crash_report
+    assert not run("func main() { return 0; }", trace_size=8).crash_report
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_trace()
@@ -0,0 +1,55 @@
+def test_user_cache() -> None:
+    """ Test that cache directories are private to the current user. """
+    
+    import os
+    import tempfile
+    
+    from ..user_cache import get_cache_dir, make_private_dir
+    
+    def is_rejected(path: str) -> bool:
+        """ Return whether a directory is rejected as a cache directory. """
+        
+        try:
+            make_private_dir(path)
+        except PermissionError:
+            return True
+        
+        return False
+    
+    with tempfile.TemporaryDirectory() as dir_path:
+        cache_home: str = os.environ.get("XDG_CACHE_HOME")
+        
+        try:
+            os.environ["XDG_CACHE_HOME"] = dir_path
+            assert get_cache_dir("native") == os.path.join(
+                    dir_path, "funcy", "native")
+        finally:
+            if cache_home is None:
+                del os.environ["XDG_CACHE_HOME"]
+            else:
+                os.environ["XDG_CACHE_HOME"] = cache_home
+        
+        if not hasattr(os, "getuid"):
+            return
+        
+        private_path: str = os.path.join(dir_path, "private")
+        make_private_dir(private_path)
+        assert os.stat(private_path).st_mode & 0o777 == 0o700
+        
+        # Existing directories are made private.
+        os.chmod(private_path, 0o777)
+        make_private_dir(private_path)
+        assert os.stat(private_path).st_mode & 0o777 == 0o700
+        
+        # Links and directories owned by other users are rejected.
+        link_path: str = os.path.join(dir_path, "link")
+        os.symlink(private_path, link_path)
+        assert is_rejected(link_path)
+        
+        if os.getuid() == 0:
+            os.chown(private_path, 1, 1)
+            assert is_rejected(private_path)
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_user_cache()
@@ -0,0 +1,52 @@
+def test_watch() -> None:
+    """ Test rebuilding programs when their modules change. """
+    
+    import contextlib
+    import io
+    import os
+    import tempfile
+    
+    from ..core import run
+    from ..watch import Watcher
+    
+    with tempfile.TemporaryDirectory() as dir_path:
+        main_path: str = os.path.join(dir_path, "main.fy")
+        lib_path: str = os.path.join(dir_path, "lib.fy")
+        out_path: str = os.path.join(dir_path, "main.fvm")
+        
+        with open(main_path, "wt") as file:
+            file.write(
+                    'include "//print.fy"; include "lib.fy";'
+                    "func main() { printIntLn(value()); }")
+        
+        watcher: Watcher = Watcher(main_path, out_path)
+        
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            # Missing modules are watched until they are created.
+            assert not watcher.build()
+            assert not watcher.poll()
+            
+            with open(lib_path, "wt") as file:
+                file.write("func value() { return 1; }")
+            
+            assert watcher.poll()
+            assert not watcher.poll()
+            
+            with open(out_path, "rb") as file:
+                assert run(file.read()).output == b"1\n"
+            
+            with open(lib_path, "wt") as file:
+                file.write("func value() { return 23; }")
+            
+            assert watcher.get_changes() == [os.path.realpath(lib_path)]
+            assert watcher.poll()
+        
+        assert "Build 3:" in output.getvalue()
+        assert len(watcher.stats) == 3
+        
+        with open(out_path, "rb") as file:
+            assert run(file.read()).output == b"23\n"
+
+
+if __name__ == "__main__" and __package__ == "funcy.tests":
+    test_watch()
@@ -0,0 +1,75 @@
+from array import array
+
+class Trace:
+    """
+    A fixed-size ring buffer of recently executed FVM instructions. Each
+    entry is an instruction address, an opcode, and the top of the stack
+    before the instruction was executed.
+    """
+    
+    ENTRY_SIZE: int = 3
+    """ The number of words in a trace entry. """
+    
+    size: int
+    """ The trace's maximum number of entries. """
+    
+    entries: array
+    """ The trace's entry words. """
+    
+    count: int
+    """ The trace's number of recorded entries. """
+    
+    def __init__(self, size: int) -> None:
+        """ Initialize the trace's size and entries. """
+        
+        self.size = max(size, 1)
+        self.entries = array("q", bytes(self.size * self.ENTRY_SIZE * 8))
+        self.count = 0
+    
+    
+    def clear(self) -> None:
+        """ Forget the trace's recorded entries. """
+        
+        self.count = 0
+    
+    
+    def get_index(self) -> int:
+        """ Get the index of the trace's next entry. """
+        
+        return (self.count % self.size) * self.ENTRY_SIZE
+    
+    
+    def wrap(self, value: int) -> int:
+        """ Wrap a value to a signed 64-bit word. """
+        
+        return (value + 0x8000000000000000) % (1 << 64) - 0x8000000000000000
+    
+    
+    def record(self, ip: int, opcode: int, tos: int) -> None:
+        """ Record an entry to the trace, replacing the oldest entry. """
+        
+        index: int = self.get_index()
+        self.entries[index] = ip
+        self.entries[index + 1] = opcode
+        
+        try:
+            self.entries[index + 2] = tos
+        except OverflowError:
+            self.entries[index + 2] = self.wrap(tos)
+        
+        self.count += 1
+    
+    
+    def get_entries(self) -> list[tuple[int, int, int]]:
+        """ Get the trace's entries from oldest to newest. """
+        
+        count: int = min(self.count, self.size)
+        start: int = self.count - count
+        entries: list[tuple[int, int, int]] = []
+        
+        for i in range(start, start + count):
+            index: int = (i % self.size) * self.ENTRY_SIZE
+            entries.append(
+                    tuple(self.entries[index:index + self.ENTRY_SIZE]))
+        
+        return entries
@@ -0,0 +1,39 @@
+import os
+import stat
+
+def get_cache_dir(name: str) -> str:
+    """
+    Get the path to a named directory in the current user's cache
+    directory. The cache directory is `funcy` in `$XDG_CACHE_HOME`, or
+    in `~/.cache` by default. The directory is not created.
+    """
+    
+    base_path: str = os.environ.get("XDG_CACHE_HOME", "") or os.path.join(
+            os.path.expanduser("~"), ".cache")
+    return os.path.join(base_path, "funcy", name)
+
+
+def make_private_dir(path: str) -> None:
+    """
+    Create a directory that is only accessible by the current user if it
+    does not exist. Raise a PermissionError if the path is not a
+    directory or is owned by another user, so that files planted by
+    other users are never loaded. Existing directories that are
+    accessible by other users are made private.
+    """
+    
+    os.makedirs(path, 0o700, exist_ok=True)
+    
+    if not hasattr(os, "getuid"):
+        return
+    
+    # Symbolic links are not followed so that a link to another user's
+    # directory is rejected.
+    result: os.stat_result = os.lstat(path)
+    
+    if not stat.S_ISDIR(result.st_mode) or result.st_uid != os.getuid():
+        raise PermissionError(
+                f"Cache directory '{path}' is not owned by the current user!")
+    
+    if result.st_mode & 0o077:
+        os.chmod(path, 0o700)
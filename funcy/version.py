@@ -0,0 +1,23 @@
+import functools
+import hashlib
+
+from pathlib import Path
+
+from .fvm import FVM
+
+@functools.cache
+def get_compiler_version() -> str:
+    """
+    Get the compiler version as a hash of the FVM format version and the
+    compiler's source code.
+    """
+    
+    package_path: Path = Path(__file__).parent
+    hasher = hashlib.sha256(str(FVM.FORMAT_VERSION).encode())
+    
+    for package in ("ast", "ir", "parser"):
+        for path in sorted(package_path.joinpath(package).glob("*.py")):
+            hasher.update(path.name.encode())
+            hasher.update(path.read_bytes())
+    
+    return hasher.hexdigest()
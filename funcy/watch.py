@@ -0,0 +1,161 @@
+import os
+import time
+
+from .ast.visitor import Visitor
+from .core import get_error_bytecode
+from .io.log import Log
+from .ir.code import Code
+from .ir.serializer import Serializer
+from .parser.resolver import Resolver
+
+class Watcher:
+    """
+    Rebuilds a Funcy program whenever any of its modules change. The
+    compiler stays loaded between builds, so unchanged modules are taken
+    from the resolver's module cache instead of being parsed again.
+    """
+    
+    INTERVAL: float = 0.25
+    """ The watcher's default polling interval in seconds. """
+    
+    in_path: str
+    """ The path to the watched program's main module. """
+    
+    out_path: str
+    """ The path that the watched program is built to. """
+    
+    interval: float
+    """ The watcher's polling interval in seconds. """
+    
+    stats: dict[str, tuple[int, int]]
+    """
+    The sizes and modification times of the watched program's modules
+    by absolute path. Missing modules have no size or modification time.
+    """
+    
+    build_count: int
+    """ The watcher's number of builds. """
+    
+    def __init__(
+            self, in_path: str, out_path: str,
+            interval: float = INTERVAL) -> None:
+        """
+        Initialize the watcher's input path, output path, and polling
+        interval.
+        """
+        
+        self.in_path = in_path
+        self.out_path = out_path
+        self.interval = interval
+        self.stats = {}
+        self.build_count = 0
+    
+    
+    def get_stat(self, path: str) -> tuple[int, int]:
+        """
+        Get a module file's size and modification time from its path.
+        Return None if the file does not exist.
+        """
+        
+        try:
+            stat: os.stat_result = os.stat(path)
+        except OSError:
+            return None
+        
+        return (stat.st_size, stat.st_mtime_ns)
+    
+    
+    def get_changes(self) -> list[str]:
+        """ Get the paths of the watched modules that have changed. """
+        
+        return [
+            path for path, stat in self.stats.items()
+            if self.get_stat(path) != stat]
+    
+    
+    def build(self) -> bool:
+        """
+        Build the watched program and record its modules. Return whether
+        the program was built without errors.
+        """
+        
+        start: float = time.perf_counter()
+        log: Log = Log()
+        resolver: Resolver = Resolver(log)
+        code: Code = Visitor(log).generate(resolver.resolve_path(self.in_path))
+        paths: list[str] = [os.path.realpath(self.in_path)]
+        paths.extend(resolver.get_module_paths())
+        
+        # Modules are recorded as they were read so that changes made
+        # during the build cause another build.
+        self.stats = {
+            path: resolver.module_stats.get(path, self.get_stat(path))
+            for path in paths}
+        
+        if log.has_records():
+            log.print_records()
+            bytecode: bytes = get_error_bytecode()
+        else:
+            bytecode: bytes = Serializer().serialize(code, False)
+        
+        temp_path: str = f"{self.out_path}.{os.getpid()}.tmp"
+        
+        try:
+            with open(temp_path, "wb") as file:
+                file.write(bytecode)
+            
+            # Replace the output atomically so it is never run half-built.
+            os.replace(temp_path, self.out_path)
+        except OSError:
+            print(f"Failed to build to '{self.out_path}'!")
+            return False
+        
+        latency: float = (time.perf_counter() - start) * 1000.0
+        self.build_count += 1
+        print(
+                f"Build {self.build_count}: {latency:.2f} ms, "
+                f"{len(self.stats)} modules"
+                f"{', failed' if log.has_records() else ''}.", flush=True)
+        return not log.has_records()
+    
+    
+    def poll(self) -> bool:
+        """
+        Rebuild the watched program if any of its modules have changed.
+        Return whether the program was rebuilt.
+        """
+        
+        changes: list[str] = self.get_changes()
+        
+        if not changes:
+            return False
+        
+        for path in changes:
+            print(f"Changed '{path}'.", flush=True)
+        
+        self.build()
+        return True
+    
+    
+    def watch(self) -> None:
+        """ Build the watched program and rebuild it until interrupted. """
+        
+        self.build()
+        print(f"Watching '{self.in_path}'.", flush=True)
+        
+        try:
+            while True:
+                time.sleep(self.interval)
+                self.poll()
+        except KeyboardInterrupt:
+            pass
+
+
+def watch(in_path: str, out_path: str) -> None:
+    """
+    Build Funcy source code from an input path to FVM bytecode at an
+    output path, and rebuild it whenever any of its modules change until
+    interrupted.
+    """
+    
+    Watcher(in_path, out_path).watch()